@@ -2,21 +2,31 @@
 
 import os
 import sys
+import json
+import time
+import itertools
 from pathlib import Path
 from datetime import datetime
 import click
 from rich.console import Console
 from rich.table import Table
-from rich.tree import Tree
 from rich.syntax import Syntax
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    Progress, SpinnerColumn, TextColumn, BarColumn, DownloadColumn, MofNCompleteColumn,
+    TimeElapsedColumn, TimeRemainingColumn, TransferSpeedColumn
+)
 from rich import print as rprint
-from rich.live import Live
 from rich.text import Text
+from rich.markup import escape
 
-from forge.core.filesystem import FileSystemTool
-from forge.core.llm import DeepSeekClient
+from forge.core.chunking import ChunkedAsk, INLINE_LIMIT, NOT_RELEVANT
+from forge.core.diff import ALGORITHMS, DEFAULT_ALGORITHM
+from forge.core.executor import CommandExecutor
+from forge.core.filesystem import FileSystemTool, LineIndexCache
+from forge.core.index import INDEX_DIR, WorkspaceIndex, TrigramIndex
+from forge.core.llm import get_client
+from forge.ui.output import StreamRenderer
 from forge.ui.styling import console
 
 console = Console()
@@ -36,101 +46,188 @@ def format_time(timestamp: float) -> str:
     return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
 
 
+def is_glob(path: str) -> bool:
+    """Whether a path argument is a glob pattern."""
+    return any(char in path for char in "*?[")
+
+
+def relative_name(path: Path) -> str:
+    """Path relative to the current directory, for display."""
+    return os.path.relpath(path, Path.cwd())
+
+
+def indexed_tool() -> FileSystemTool:
+    """Create a FileSystemTool backed by the workspace indexes, if they can be opened.
+    
+    Only a workspace that already has an index (built by ``fs index``) uses
+    one; commands never leave a ``.forge`` directory behind on their own.
+    """
+    workspace = Path.cwd()
+    if not (workspace / INDEX_DIR).is_dir():
+        return FileSystemTool(workspace)
+    try:
+        index = WorkspaceIndex(workspace)
+    except Exception:
+        # Read-only or otherwise unwritable workspace: walk the tree instead
+        return FileSystemTool(workspace)
+    return FileSystemTool(workspace, index=index, content_index=TrigramIndex(index))
+
+
 @click.group()
 def fs():
     """File system operations."""
     pass
 
 
+def tree_lines(items, limit=None):
+    """Render tree entries as markup lines, one per entry, as they arrive.
+    
+    Guides are drawn from the ``last`` flags of the entry's ancestors, so
+    only the current path is remembered.
+    """
+    guides = []
+    for count, item in enumerate(items):
+        if limit is not None and count == limit:
+            yield f"[dim]... stopped after {limit} entries (--limit)[/dim]"
+            return
+        
+        del guides[item.depth - 1:]
+        prefix = "".join("    " if last else "│   " for last in guides)
+        connector = "└── " if item.last else "├── "
+        guides.append(item.last)
+        
+        name = escape(item.entry.path.name)
+        if item.entry.is_dir:
+            yield f"[dim]{prefix}{connector}[/dim]📁 [cyan]{name}/[/cyan]"
+        else:
+            yield f"[dim]{prefix}{connector}[/dim]📄 [green]{name}[/green] [dim]({format_size(item.entry.size)})[/dim]"
+
+
+def batched_lines(lines, size=200, interval=0.05):
+    """Group lines into printable chunks, flushing early so output starts at once."""
+    chunk = []
+    flushed = time.monotonic()
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size or time.monotonic() - flushed >= interval:
+            yield "\n".join(chunk)
+            chunk = []
+            flushed = time.monotonic()
+    if chunk:
+        yield "\n".join(chunk)
+
+
+def render_markup(markup: str) -> str:
+    """Render markup to a string with ANSI styles (for output that bypasses the console)."""
+    with console.capture() as capture:
+        console.print(markup, highlight=False)
+    return capture.get()
+
+
 @fs.command()
 @click.argument('path', default='.')
 @click.option('--recursive', '-r', is_flag=True, help='Show recursively')
 @click.option('--all', '-a', 'show_all', is_flag=True, help='Show all files (including hidden)')
-def ls(path, recursive, show_all):
+@click.option('--no-ignore', is_flag=True, help='Include files excluded by .gitignore/.forgeignore')
+@click.option('--max-depth', '-L', type=int, help='Descend at most this many levels (implies --recursive)')
+@click.option('--limit', type=int, help='Stop after this many entries')
+@click.option('--pager', is_flag=True, help='Page the listing')
+def ls(path, recursive, show_all, no_ignore, max_depth, limit, pager):
     """List directory contents with beautiful tree view."""
     try:
-        fs_tool = FileSystemTool()
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Scanning directory...", total=None)
-            items = fs_tool.list_directory(path, recursive=recursive)
-        
-        if not items:
+        recursive = recursive or max_depth is not None
+        # A single directory is one scandir; the index only pays off for trees
+        fs_tool = indexed_tool() if recursive else FileSystemTool()
+        
+        items = fs_tool.tree(
+            path,
+            respect_ignore=recursive and not no_ignore,
+            show_hidden=show_all,
+            max_depth=max_depth if recursive else 1
+        )
+        first = next(items, None)
+        if first is None:
             console.print("[yellow]Directory is empty[/yellow]")
             return
         
-        # Create tree
-        tree = Tree(f"📁 [bold blue]{path}/[/bold blue]")
-        node_map = {Path(path).resolve(): tree}
-        
-        # Sort items: directories first, then files
-        items.sort(key=lambda p: (not p.is_dir(), p.name))
-        
-        for item in items:
-            if not show_all and item.name.startswith('.'):
-                continue
-            
-            parent = item.parent
-            if parent not in node_map:
-                # Create parent nodes if needed
-                parents = []
-                while parent not in node_map and parent != Path(path).resolve():
-                    parents.append(parent)
-                    parent = parent.parent
-                
-                for p in reversed(parents):
-                    node = Tree(f"📁 [cyan]{p.name}/[/cyan]")
-                    node_map[p] = node
-                    node_map[p.parent].add(node)
-            
-            # Add item to tree
-            if item.is_dir():
-                node = Tree(f"📁 [cyan]{item.name}/[/cyan]")
-                node_map[item] = node
-                node_map[item.parent].add(node)
-            else:
-                size = format_size(item.stat().st_size)
-                node_map[item.parent].add(f"📄 [green]{item.name}[/green] [dim]({size})[/dim]")
-        
-        console.print(tree)
+        lines = tree_lines(itertools.chain([first], items), limit)
+        chunks = itertools.chain([f"📁 [bold blue]{escape(path)}/[/bold blue]"], batched_lines(lines))
+        if pager:
+            click.echo_via_pager(render_markup(chunk) for chunk in chunks)
+        else:
+            for chunk in chunks:
+                console.print(chunk, highlight=False)
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
 
+def parse_line_range(spec: str) -> tuple:
+    """Parse ``A:B`` (1-based, inclusive, either end optional) into ``(start, count)``."""
+    start, sep, end = spec.partition(':')
+    if not sep:
+        raise click.BadParameter(f"Expected A:B, got '{spec}'", param_hint="'--range'")
+    try:
+        first = int(start) if start else 1
+        last = int(end) if end else None
+    except ValueError:
+        raise click.BadParameter(f"Line numbers must be integers: '{spec}'", param_hint="'--range'")
+    if first < 1 or (last is not None and last < first):
+        raise click.BadParameter(f"Invalid line range: '{spec}'", param_hint="'--range'")
+    return first, None if last is None else last - first + 1
+
+
 @fs.command()
 @click.argument('path')
 @click.option('--lines', '-n', type=int, help='Show only first N lines')
+@click.option('--tail', '-t', type=int, help='Show only last N lines')
+@click.option('--range', '-R', 'line_range', help='Show lines A:B (1-based, inclusive; A: or :B for open ranges)')
 @click.option('--language', '-l', help='Force syntax highlighting language')
-def cat(path, lines, language):
+def cat(path, lines, tail, line_range, language):
     """Display file contents with syntax highlighting."""
     try:
-        fs_tool = FileSystemTool()
-        content, ext = fs_tool.read_file(path)
+        if sum(option is not None for option in (lines, tail, line_range)) > 1:
+            raise click.UsageError("Use only one of --lines, --tail and --range")
         
-        # Truncate if lines specified
-        if lines:
-            content_lines = content.splitlines()
-            if len(content_lines) > lines:
-                content = '\n'.join(content_lines[:lines])
-                content += f"\n\n[dim]... and {len(content_lines) - lines} more lines[/dim]"
+        fs_tool = FileSystemTool()
+        info = fs_tool.get_file_info(path)
+        ext = info.get('extension', '')
+        
+        # Only the requested window is read and highlighted
+        with fs_tool.open_lines(path, cache=LineIndexCache()) as reader:
+            footer = None
+            if tail is not None:
+                window = reader.tail(tail)
+                total = reader.total_lines
+                start = total - len(window) + 1 if total is not None else 1
+                line_numbers = total is not None
+            else:
+                if line_range:
+                    start, count = parse_line_range(line_range)
+                else:
+                    start, count = 1, lines
+                window = reader.lines(start, count)
+                line_numbers = True
+                if count is not None:
+                    remaining = reader.remaining_bytes(start, count)
+                    if remaining:
+                        footer = f"[dim]... and {format_size(remaining)} more[/dim]"
         
         # Determine language for syntax highlighting
         lang = language or ext or 'text'
         
         # Create syntax highlighted output
-        syntax = Syntax(content, lang, theme="monokai", line_numbers=True)
+        syntax = Syntax('\n'.join(window), lang, theme="monokai", line_numbers=line_numbers, start_line=start)
         
         # Show file info
-        info = fs_tool.get_file_info(path)
         header = f"📄 [bold]{path}[/bold] - {format_size(info['size'])} - Modified: {format_time(info['modified'])}"
         
         console.print(Panel(syntax, title=header, border_style="green"))
+        if footer:
+            console.print(footer)
         
+    except click.UsageError:
+        raise
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
@@ -155,7 +252,7 @@ def write(path, content, edit, force, prompt):
             ) as progress:
                 progress.add_task(description="AI generating content...", total=None)
                 
-                client = DeepSeekClient()
+                client = get_client()
                 messages = [
                     {"role": "system", "content": "You are a helpful coding assistant. Generate the requested content."},
                     {"role": "user", "content": f"Generate content for a file. Request: {prompt}"}
@@ -182,14 +279,94 @@ def write(path, content, edit, force, prompt):
         console.print(f"[red]Error:[/red] {e}")
 
 
+def copy_progress():
+    """Progress bar with throughput for bulk copies."""
+    return Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+        transient=True
+    )
+
+
+def track_copy(progress):
+    """Return an ``on_progress`` callback that drives ``progress``, adding its task on first use."""
+    task = None
+    
+    def update(state):
+        nonlocal task
+        if task is None:
+            task = progress.add_task("Copying...", total=state.total_bytes)
+        progress.update(
+            task,
+            completed=state.bytes_done,
+            description=f"Copying {state.files_done}/{state.total_files} files"
+        )
+    return update
+
+
+def print_copy_summary(stats, elapsed):
+    """Print file counts and throughput of a bulk copy."""
+    rate = format_size(int(stats["bytes"] / elapsed)) if elapsed > 0 else "-"
+    summary = f"{stats['files']} file(s), {format_size(stats['bytes'])} in {elapsed:.2f}s ({rate}/s)"
+    if stats["skipped"]:
+        summary += f", {stats['skipped']} unchanged skipped"
+    console.print(f"[dim]{summary}[/dim]")
+
+
 @fs.command()
-@click.argument('source')
-@click.argument('destination', required=False)
+@click.argument('paths', nargs=-1, required=True)
 @click.option('--recursive', '-r', is_flag=True, help='Copy directories recursively')
-def cp(source, destination, recursive):
-    """Copy files or directories."""
+@click.option('--update', '-u', is_flag=True, help='Skip files whose size and mtime already match')
+@click.option('--checksum', '-c', is_flag=True, help='With --update, also compare content hashes')
+@click.option('--jobs', '-j', default=8, help='Files copied concurrently')
+def cp(paths, recursive, update, checksum, jobs):
+    """Copy files or directories.
+    
+    With one SOURCE, copies it to DESTINATION (default: SOURCE_copy). With
+    several sources or globs, the last argument is the directory to copy
+    them into.
+    """
     try:
         fs_tool = FileSystemTool()
+        source, destination = paths[0], paths[-1] if len(paths) > 1 else None
+        
+        if len(paths) > 2 or is_glob(source):
+            sources = fs_tool.expand_paths(paths[:-1])
+            if not sources:
+                console.print(f"[red]Error:[/red] no paths matched {' '.join(paths[:-1])}")
+                sys.exit(1)
+            skipped = [path for path in sources if path.is_dir() and not recursive]
+            for path in skipped:
+                console.print(f"[yellow]Skipping directory {relative_name(path)} (use -r to copy it)[/yellow]")
+            sources = [path for path in sources if path not in skipped]
+            
+            start = time.perf_counter()
+            totals = {"files": 0, "skipped": 0, "bytes": 0}
+            with Progress(
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TimeElapsedColumn(),
+                console=console,
+                transient=True
+            ) as progress:
+                task = progress.add_task("Copying...", total=len(sources))
+                for result in fs_tool.copy_many(sources, destination, threads=jobs,
+                                                skip_unchanged=update, checksum=checksum, stream=True):
+                    progress.advance(task)
+                    if not result.ok:
+                        progress.console.print(f"[red]✗[/red] {relative_name(result.path)}: {result.error}")
+                        continue
+                    for key in totals:
+                        totals[key] += result.value[key]
+            
+            console.print(f"[green]✓[/green] Copied {len(sources)} path(s) → [bold]{destination}[/bold]")
+            print_copy_summary(totals, time.perf_counter() - start)
+            return
         
         if not destination:
             # Generate default destination
@@ -197,8 +374,22 @@ def cp(source, destination, recursive):
             dest_path = src_path.parent / f"{src_path.stem}_copy{src_path.suffix}"
             destination = str(dest_path)
         
-        fs_tool.copy_file(source, destination)
+        if Path(source).is_dir() and not recursive:
+            console.print(f"[red]Error:[/red] {source} is a directory (use -r to copy it)")
+            return
+        
+        start = time.perf_counter()
+        with copy_progress() as progress:
+            stats = fs_tool.copy_tree(
+                source, destination,
+                threads=jobs,
+                skip_unchanged=update,
+                checksum=checksum,
+                on_progress=track_copy(progress)
+            )
         console.print(f"[green]✓[/green] Copied [bold]{source}[/bold] → [bold]{destination}[/bold]")
+        if recursive:
+            print_copy_summary(stats, time.perf_counter() - start)
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -207,11 +398,13 @@ def cp(source, destination, recursive):
 @fs.command()
 @click.argument('source')
 @click.argument('destination')
-def mv(source, destination):
+@click.option('--jobs', '-j', default=8, help='Files copied concurrently when moving across filesystems')
+def mv(source, destination, jobs):
     """Move or rename files/directories."""
     try:
         fs_tool = FileSystemTool()
-        fs_tool.move_file(source, destination)
+        with copy_progress() as progress:
+            fs_tool.move_file(source, destination, threads=jobs, on_progress=track_copy(progress))
         console.print(f"[green]✓[/green] Moved [bold]{source}[/bold] → [bold]{destination}[/bold]")
         
     except Exception as e:
@@ -219,93 +412,291 @@ def mv(source, destination):
 
 
 @fs.command()
-@click.argument('path')
+@click.argument('paths', nargs=-1, required=True)
 @click.option('--force', '-f', is_flag=True, help='Force delete (use with caution)')
-def rm(path, force):
-    """Delete files or empty directories."""
+@click.option('--jobs', '-j', default=8, help='Paths deleted concurrently')
+def rm(paths, force, jobs):
+    """Delete files or empty directories (paths or globs)."""
     try:
         fs_tool = FileSystemTool()
         
-        # Get info for confirmation
-        info = fs_tool.get_file_info(path)
+        if len(paths) == 1 and not is_glob(paths[0]):
+            path = paths[0]
+            
+            # Get info for confirmation
+            info = fs_tool.get_file_info(path)
+            
+            # Confirm deletion
+            if not force:
+                type_str = "directory" if info['type'] == 'directory' else "file"
+                console.print(f"[yellow]Warning:[/yellow] About to delete {type_str}: [bold]{path}[/bold]")
+                if not click.confirm("Continue?"):
+                    console.print("[yellow]Cancelled[/yellow]")
+                    return
+            
+            fs_tool.delete_file(path, force=force)
+            console.print(f"[green]✓[/green] Deleted [bold]{path}[/bold]")
+            return
+        
+        targets = fs_tool.expand_paths(paths)
+        if not targets:
+            console.print(f"[red]Error:[/red] no paths matched {' '.join(paths)}")
+            sys.exit(1)
         
-        # Confirm deletion
         if not force:
-            type_str = "directory" if info['type'] == 'directory' else "file"
-            console.print(f"[yellow]Warning:[/yellow] About to delete {type_str}: [bold]{path}[/bold]")
+            console.print(f"[yellow]Warning:[/yellow] About to delete {len(targets)} path(s):")
+            for target in targets[:10]:
+                console.print(f"  {relative_name(target)}")
+            if len(targets) > 10:
+                console.print(f"  [dim]... and {len(targets) - 10} more[/dim]")
             if not click.confirm("Continue?"):
                 console.print("[yellow]Cancelled[/yellow]")
                 return
         
-        fs_tool.delete_file(path, force=force)
-        console.print(f"[green]✓[/green] Deleted [bold]{path}[/bold]")
-        
+        for result in fs_tool.delete_many(targets, force=force, threads=jobs, stream=True):
+            if result.ok:
+                console.print(f"[green]✓[/green] Deleted [bold]{relative_name(result.path)}[/bold]")
+            else:
+                console.print(f"[red]✗[/red] {relative_name(result.path)}: {result.error}")
+    
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
 
+def print_match(match, previous=None) -> None:
+    """Print a content search match with its context, grep-style."""
+    if previous is None or previous.path != match.path:
+        if previous is not None:
+            console.print()
+        console.print(f"📄 [bold cyan]{os.path.relpath(match.path, Path.cwd())}[/bold cyan]")
+    else:
+        last_shown = previous.after[-1][0] if previous.after else previous.line_number
+        first = match.before[0][0] if match.before else match.line_number
+        if first > last_shown + 1:
+            console.print("[dim]  --[/dim]")
+    
+    for number, line in match.before:
+        console.print(Text(f"  {number:>5}-", style="dim") + Text(line, style="dim"), soft_wrap=True)
+    
+    text = Text(match.line)
+    for start, end in match.spans:
+        text.stylize("bold red", start, end)
+    console.print(Text(f"  {match.line_number:>5}:", style="green") + text, soft_wrap=True)
+    
+    for number, line in match.after:
+        console.print(Text(f"  {number:>5}-", style="dim") + Text(line, style="dim"), soft_wrap=True)
+
+
 @fs.command()
 @click.argument('pattern')
 @click.option('--path', '-p', default='.', help='Search path')
-@click.option('--content', '-c', is_flag=True, help='Search file contents (coming soon)')
-def search(pattern, path, content):
-    """Search for files matching pattern."""
+@click.option('--content', '-c', is_flag=True, help='Search file contents for PATTERN (a regex)')
+@click.option('--glob', '-g', default='*', help='With --content, only search files matching this glob')
+@click.option('--fixed-strings', '-F', is_flag=True, help='With --content, treat PATTERN as a literal string')
+@click.option('--ignore-case', '-i', is_flag=True, help='With --content, match case-insensitively')
+@click.option('--context', '-C', default=0, type=int, help='With --content, lines of context around matches')
+@click.option('--max-count', '-m', type=int, help='With --content, stop after N matching lines')
+@click.option('--no-ignore', is_flag=True, help='Include files excluded by .gitignore/.forgeignore')
+def search(pattern, path, content, glob, fixed_strings, ignore_case, context, max_count, no_ignore):
+    """Search for files matching pattern, or for PATTERN inside files with --content."""
     try:
-        fs_tool = FileSystemTool()
+        fs_tool = indexed_tool()
+        
+        if content:
+            previous = None
+            count = 0
+            files = 0
+            for match in fs_tool.search_content(
+                pattern,
+                path,
+                glob=glob,
+                literal=fixed_strings,
+                ignore_case=ignore_case,
+                context=context,
+                max_count=max_count,
+                respect_ignore=not no_ignore
+            ):
+                if previous is None or previous.path != match.path:
+                    files += 1
+                print_match(match, previous)
+                previous = match
+                count += 1
+            
+            if not count:
+                console.print(f"[yellow]No matches for '{pattern}'[/yellow]")
+                return
+            console.print(f"\n[green]Found {count} matching lines in {files} files[/green]")
+            return
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Searching...", total=None)
-            results = fs_tool.search_files(pattern, path)
+        # Results are printed as the walker finds them; the rest are only counted
+        count = 0
+        for file_path in fs_tool.iter_files(pattern, path, respect_ignore=not no_ignore):
+            count += 1
+            if count <= 20:  # Limit to 20 results
+                rel_path = os.path.relpath(file_path, Path.cwd())
+                size = format_size(file_path.stat().st_size)
+                console.print(f"  📄 [cyan]{rel_path}[/cyan] [dim]({size})[/dim]")
         
-        if not results:
+        if not count:
             console.print(f"[yellow]No files found matching '{pattern}'[/yellow]")
             return
         
-        # Display results
-        console.print(f"[green]Found {len(results)} files:[/green]\n")
-        for file_path in results[:20]:  # Limit to 20 results
-            rel_path = file_path.relative_to(Path.cwd())
-            size = format_size(file_path.stat().st_size)
-            console.print(f"  📄 [cyan]{rel_path}[/cyan] [dim]({size})[/dim]")
-        
-        if len(results) > 20:
-            console.print(f"\n[dim]... and {len(results) - 20} more files[/dim]")
-        
+        if count > 20:
+            console.print(f"\n[dim]... and {count - 20} more files[/dim]")
+        console.print(f"\n[green]Found {count} files[/green]")
+    
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
 
+CHANGE_MARKS = {
+    "created": "[green]+[/green]",
+    "modified": "[yellow]~[/yellow]",
+    "deleted": "[red]-[/red]",
+}
+
+
+@fs.command()
+@click.argument('path', default='.')
+@click.option('--run', '-r', 'command', help='Command to run after each batch of changes')
+@click.option('--debounce', '-d', default=0.2, type=float, help='Quiet period before a batch is reported (seconds)')
+@click.option('--poll', is_flag=True, help='Poll for changes instead of using inotify')
+@click.option('--no-ignore', is_flag=True, help='Include files excluded by .gitignore/.forgeignore')
+def watch(path, command, debounce, poll, no_ignore):
+    """Watch a directory and report (or react to) changes."""
+    # Imported here: forge.cli.run imports this module
+    from forge.cli.run import stream_output
+    
+    try:
+        fs_tool = FileSystemTool()
+        watcher = fs_tool.watch(
+            path,
+            respect_ignore=not no_ignore,
+            debounce=debounce,
+            backend="poll" if poll else "auto",
+            exclude=(".forge",)
+        )
+        executor = CommandExecutor(workspace=Path.cwd())
+        
+        console.print(f"[bold blue]👀 Watching[/bold blue] [cyan]{path}[/cyan] [dim]({watcher.backend}, Ctrl+C to stop)[/dim]")
+        if command:
+            console.print(f"[dim]On change: {command}[/dim]")
+        
+        with watcher:
+            for batch in watcher:
+                stamp = datetime.now().strftime("%H:%M:%S")
+                shown = ", ".join(
+                    f"{CHANGE_MARKS[event.kind]}{os.path.relpath(event.path, Path.cwd())}" for event in batch[:5]
+                )
+                more = f" [dim]and {len(batch) - 5} more[/dim]" if len(batch) > 5 else ""
+                console.print(f"\n[dim]{stamp}[/dim] {len(batch)} changed: {shown}{more}")
+                
+                if command:
+                    # Changed paths are passed on so the command can act on just those
+                    changed = "\n".join(str(event.path) for event in batch)
+                    result = stream_output(executor.run(command, stream=True, env={"FORGE_CHANGED_FILES": changed}))
+                    if result.get("success"):
+                        console.print(f"[green]✅ {command}[/green] [dim]({result['resources']['wall_time']:.2f}s)[/dim]")
+                    else:
+                        console.print(f"[red]❌ {command} exited with code {result.get('returncode')}[/red]")
+    
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopped watching[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+
+
+def print_hunk(lines):
+    """Print one unified diff hunk with diff highlighting."""
+    console.print(Syntax("\n".join(lines), "diff", theme="monokai"))
+
+
 @fs.command()
 @click.argument('file1')
 @click.argument('file2')
-def diff(file1, file2):
+@click.option('--stat', is_flag=True, help='Only count inserted and deleted lines')
+@click.option('--algorithm', '-a', type=click.Choice(list(ALGORITHMS)), default=DEFAULT_ALGORITHM,
+              help='Diff algorithm')
+@click.option('--context', '-U', default=3, help='Unchanged lines shown around changes')
+def diff(file1, file2, stat, algorithm, context):
     """Show differences between two files."""
     try:
-        fs_tool = FileSystemTool()
-        diff_text = fs_tool.diff_files(file1, file2)
+        fs_tool = indexed_tool()
         
-        if not diff_text:
-            console.print("[green]Files are identical[/green]")
+        if stat:
+            counts = fs_tool.diff_stat(file1, file2, algorithm)
+            insertions, deletions = counts["insertions"], counts["deletions"]
+            if not insertions and not deletions:
+                console.print("[green]Files are identical[/green]")
+                return
+            
+            # Scale the +/- bar like git --stat
+            changed = insertions + deletions
+            scale = min(1.0, 40 / changed)
+            plus = "+" * max(1 if insertions else 0, round(insertions * scale))
+            minus = "-" * max(1 if deletions else 0, round(deletions * scale))
+            console.print(f"{file1} ↔ {file2} | {changed} [green]{plus}[/green][red]{minus}[/red]")
+            console.print(f"[dim]{insertions} insertion(s)(+), {deletions} deletion(s)(-)[/dim]")
             return
         
-        # Colorize diff
-        syntax = Syntax(diff_text, "diff", theme="monokai")
-        console.print(Panel(syntax, title=f"Diff: {file1} ↔ {file2}", border_style="yellow"))
+        # Hunks are printed as the diff engine produces them
+        hunk = []
+        for line in fs_tool.iter_diff(file1, file2, algorithm, context):
+            if line.startswith("@@"):
+                if hunk:
+                    print_hunk(hunk)
+                else:
+                    console.print(f"[bold yellow]Diff: {file1} ↔ {file2}[/bold yellow]")
+                hunk = [line]
+            elif hunk:
+                hunk.append(line)
+        
+        if hunk:
+            print_hunk(hunk)
+        else:
+            console.print("[green]Files are identical[/green]")
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
 
 @fs.command()
-@click.argument('path', default='.')
-def info(path):
-    """Show detailed information about a file or directory."""
+@click.argument('paths', nargs=-1)
+@click.option('--json', 'as_json', is_flag=True, help='Print one JSON object per path')
+@click.option('--jobs', '-j', default=8, help='Paths stat\'ed concurrently')
+def info(paths, as_json, jobs):
+    """Show detailed information about files or directories (paths or globs)."""
+    paths = paths or ('.',)
     try:
-        fs_tool = FileSystemTool()
+        fs_tool = indexed_tool()
+        
+        if as_json:
+            for result in fs_tool.stat_many(paths, threads=jobs, stream=True):
+                record = result.value if result.ok else {"path": str(result.path), "error": str(result.error)}
+                click.echo(json.dumps(record))
+            return
+        
+        if len(paths) > 1 or is_glob(paths[0]):
+            table = Table(title="Info")
+            table.add_column("Path", style="cyan")
+            table.add_column("Type")
+            table.add_column("Size", justify="right")
+            table.add_column("Modified")
+            table.add_column("Hash", style="dim")
+            
+            for result in fs_tool.stat_many(paths, threads=jobs):
+                name = os.path.relpath(result.path, Path.cwd())
+                if not result.ok:
+                    table.add_row(name, "[red]error[/red]", "", "", f"[red]{result.error}[/red]")
+                    continue
+                data = result.value
+                size = format_size(data.get('total_size', data['size']))
+                table.add_row(name, data['type'], size, format_time(data['modified']), data.get('hash', ''))
+            
+            console.print(table)
+            return
+        
+        path = paths[0]
         info_data = fs_tool.get_file_info(path)
         
         # Create info table
@@ -322,28 +713,115 @@ def info(path):
         if 'extension' in info_data:
             table.add_row("Extension", info_data['extension'])
         
+        if 'hash' in info_data:
+            table.add_row("Hash", info_data['hash'])
+        
+        if 'files' in info_data:
+            table.add_row("Files", str(info_data['files']))
+            table.add_row("Total Size", format_size(info_data['total_size']))
+        
         console.print(table)
+    
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+
+
+@fs.command()
+@click.option('--rebuild', is_flag=True, help='Discard the index and build it from scratch')
+@click.option('--verify', is_flag=True, help='Re-stat files in unchanged directories too')
+@click.option('--hashes', is_flag=True, help='Compute content hashes for all files')
+@click.option('--content', is_flag=True, help='Build the trigram index used by fs search --content')
+def index(rebuild, verify, hashes, content):
+    """Build or refresh the workspace index in .forge/index."""
+    try:
+        workspace_index = WorkspaceIndex(Path.cwd())
+        if rebuild:
+            workspace_index.close()
+            workspace_index.path.unlink()
+            workspace_index = WorkspaceIndex(Path.cwd())
+        
+        start = time.perf_counter()
+        with workspace_index, Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            transient=True,
+        ) as progress:
+            progress.add_task(description="Indexing workspace...", total=None)
+            stats = workspace_index.refresh(verify=verify, hashes=hashes)
+            content_index = TrigramIndex(workspace_index)
+            trigram_stats = None
+            if content or content_index.enabled:
+                progress.add_task(description="Indexing file contents...", total=None)
+                trigram_stats = content_index.update()
+        elapsed = time.perf_counter() - start
+        
+        console.print(
+            f"[green]✅ Index refreshed in {elapsed:.2f}s[/green] [dim]"
+            f"({stats['dirs']} directories, {stats['rescanned']} rescanned; "
+            f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed)[/dim]"
+        )
+        if trigram_stats:
+            console.print(
+                f"[dim]Content index: {trigram_stats['indexed']} files indexed, "
+                f"{trigram_stats['removed']} removed, {trigram_stats['segments']} segments[/dim]"
+            )
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
 
 
+def stream_answer(stream) -> None:
+    """Render a streamed chat completion as it arrives."""
+    with StreamRenderer(console) as renderer:
+        renderer.feed(stream)
+
+
 @fs.command()
 @click.argument('path')
 @click.argument('question', nargs=-1, required=True)
-def ask(path, question):
+@click.option('--chunked/--whole', default=None,
+              help='Map-reduce over chunks of the file (default: only when it is too large to send whole)')
+@click.option('--top-k', default=8, help='Most relevant chunks queried in chunked mode')
+@click.option('--jobs', '-j', default=4, help='Chunk queries in flight at once')
+def ask(path, question, chunked, top_k, jobs):
     """Ask DeepSeek about a file's contents."""
     full_question = ' '.join(question)
     
     try:
         fs_tool = FileSystemTool()
         content, ext = fs_tool.read_file(path)
+        client = get_client()
+        
+        if chunked is None:
+            chunked = len(content) > INLINE_LIMIT
+        
+        if chunked:
+            console.print(f"\n[bold orange1]🔨 Analyzing {path} in chunks...[/bold orange1]\n")
+            asker = ChunkedAsk(client, top_k=top_k, workers=jobs)
+            answered = []
+            
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+                transient=True,
+            ) as progress:
+                task = progress.add_task(description="Ranking chunks...", total=None)
+                
+                def on_answer(chunk, answer):
+                    answered.append(answer)
+                    relevant = sum(1 for a in answered if a and not a.upper().startswith(NOT_RELEVANT))
+                    progress.update(task, description=f"Read {len(answered)} chunk(s), {relevant} relevant...")
+                
+                stream = asker.ask(path, content, full_question, ext, on_answer=on_answer)
+            
+            stream_answer(stream)
+            return
         
         # Prepare context
         context = f"File: {path}\nExtension: {ext}\n\nContent:\n```\n{content}\n```\n\nQuestion: {full_question}"
         
         # Ask DeepSeek
-        client = DeepSeekClient()
         messages = [
             {"role": "system", "content": "You are a helpful coding assistant. Answer questions about the provided file."},
             {"role": "user", "content": context}
@@ -352,18 +830,7 @@ def ask(path, question):
         console.print(f"\n[bold orange1]🔨 Analyzing {path}...[/bold orange1]\n")
         
         # Stream response
-        stream = client.stream_chat(messages)
-        
-        collected = []
-        with Live(console=console, refresh_per_second=10) as live:
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    token = chunk.choices[0].delta.content
-                    collected.append(token)
-                    text = Text("".join(collected), style="bold green")
-                    live.update(text)
-        
-        console.print()  # Newline
+        stream_answer(client.stream_chat(messages))
         
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -1,18 +1,16 @@
 #!/usr/bin/env python
 """FORGE CLI - Your DeepSeek-powered development forge."""
 
-import os
 import sys
 from pathlib import Path
 
 import click
 from rich.console import Console
-from rich.live import Live
-from rich.text import Text
 from rich.panel import Panel
 from rich import print as rprint
 
-from forge.core.llm import DeepSeekClient
+from forge.core.llm import get_client
+from forge.ui.output import StreamRenderer
 from forge import __version__
 from forge.cli.fs import fs
 from forge.cli.run import run
@@ -65,13 +63,13 @@ def cli(ctx, version):
 @cli.command()
 @click.argument('prompt', nargs=-1, required=True)
 @click.option('--file', '-f', multiple=True, help='Include file contents in context')
-@click.option('--model', default='deepseek-chat', help='DeepSeek model to use')
+@click.option('--model', default=None, help='DeepSeek model to use (default: deepseek.model)')
 def ask(prompt, file, model):
     """Ask DeepSeek a question about code or development."""
     full_prompt = ' '.join(prompt)
     
     # Check for API key
-    api_key = os.getenv('DEEPSEEK_API_KEY')
+    api_key = get_config().get_deepseek_api_key()
     if not api_key:
         console.print("[red]Error:[/red] DEEPSEEK_API_KEY environment variable not set.")
         console.print("Set it with: [cyan]export DEEPSEEK_API_KEY='your-key'[/cyan]")
@@ -101,7 +99,7 @@ def ask(prompt, file, model):
         full_prompt = "Here are the files I'm working with:\n\n" + "\n".join(file_contents) + f"\n\nMy question: {full_prompt}"
     
     try:
-        client = DeepSeekClient(api_key=api_key)
+        client = get_client(api_key=api_key)
         messages = [{"role": "user", "content": full_prompt}]
         
         console.print("\n[dim]DeepSeek is thinking...[/dim]\n")
@@ -109,16 +107,8 @@ def ask(prompt, file, model):
         # Stream the response
         stream = client.stream_chat(messages, model=model)
         
-        collected = []
-        with Live(console=console, refresh_per_second=10, vertical_overflow="visible") as live:
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    token = chunk.choices[0].delta.content
-                    collected.append(token)
-                    text = Text("".join(collected), style="bold green")
-                    live.update(text)
-        
-        console.print()  # Newline after streaming
+        with StreamRenderer(console) as renderer:
+            renderer.feed(stream)
         
     except Exception as e:
         console.print(f"\n[red]Error calling DeepSeek API:[/red] {e}")
@@ -2,7 +2,10 @@
 
 import os
 import sys
+import csv
+import json
 import shlex
+import asyncio
 from pathlib import Path
 from typing import Optional
 import click
@@ -10,18 +13,66 @@ from rich.console import Console
 from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich.syntax import Syntax
 from rich.table import Table
+from rich.markup import escape
 from rich import print as rprint
 import time
 
-from forge.core.executor import CommandExecutor, CodeRunner
-from forge.core.llm import DeepSeekClient
+from forge.core.executor import CommandExecutor, AsyncCommandExecutor, CodeRunner, OutputCapture
+from forge.core.benchmark import CommandBenchmark, compare
+from forge.core.llm import get_client
+from forge.cli.fs import format_size
 from forge.ui.styling import console
+from forge.ui.output import OutputViewport
 
 console = Console()
 
+# Prefix colors cycled across parallel jobs
+JOB_COLORS = ["cyan", "magenta", "green", "yellow", "blue", "bright_cyan", "bright_magenta", "bright_green"]
+
+
+def stream_output(output) -> dict:
+    """Render an executor output generator in a live viewport and return its result."""
+    with OutputViewport(console) as viewport:
+        while True:
+            try:
+                viewport.add(next(output))
+            except StopIteration as done:
+                return done.value or {}
+
+
+def format_resources(usage: dict) -> str:
+    """Summarize a result's resource usage on one line."""
+    parts = [f"⏱  {usage['wall_time']:.2f}s wall"]
+    if usage.get("user_time") is not None:
+        parts.append(f"{usage['user_time']:.2f}s user")
+        parts.append(f"{usage['sys_time']:.2f}s sys")
+        parts.append(f"{format_size(usage['max_rss'])} peak RSS")
+    parts.append(f"{format_size(usage['stdout_bytes'])} stdout")
+    parts.append(f"{format_size(usage['stderr_bytes'])} stderr")
+    return " · ".join(parts)
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration with a unit suited to its size."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.3f} s"
+
+
+def load_jobs_file(path: Path) -> list:
+    """Read one command per line, skipping blank lines and # comments."""
+    jobs = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            jobs.append(line)
+    return jobs
+
 
 @click.group()
 def run():
@@ -35,7 +86,10 @@ def run():
 @click.option('--timeout', '-t', default=60, help='Timeout in seconds')
 @click.option('--analyze/--no-analyze', default=True, help='Analyze output with AI')
 @click.option('--env', '-e', multiple=True, help='Environment variables (KEY=VALUE)')
-def cmd(command, cwd, timeout, analyze, env):
+@click.option('--max-lines', default=10000, show_default=True, help='Output lines kept in memory per stream (0 for no limit)')
+@click.option('--log', 'log_file', type=click.Path(dir_okay=False), help='Also write the full output to this file')
+@click.option('--json', 'as_json', is_flag=True, help='Print the result, including resource usage, as JSON')
+def cmd(command, cwd, timeout, analyze, env, max_lines, log_file, as_json):
     """Run a shell command with live output."""
     full_command = ' '.join(command)
     
@@ -49,43 +103,26 @@ def cmd(command, cwd, timeout, analyze, env):
     # Set working directory
     workspace = Path(cwd) if cwd else Path.cwd()
     
-    console.print(f"\n[bold blue]⚡ Running:[/bold blue] [yellow]{full_command}[/yellow]")
-    console.print(f"[dim]Directory: {workspace}[/dim]\n")
-    
     executor = CommandExecutor(workspace=workspace, timeout=timeout)
+    capture = OutputCapture(max_lines=max_lines or None, spill_path=Path(log_file) if log_file else None)
     
-    stdout_lines = []
-    stderr_lines = []
+    if as_json:
+        # Machine-readable mode: no live output, no analysis, just the result
+        try:
+            result = executor.run_command(full_command, stream=False, env=env_vars, capture=capture)
+        except TimeoutError as e:
+            result = {"command": full_command, "success": False, "error": str(e)}
+        click.echo(json.dumps(result, indent=2))
+        return
+    
+    console.print(f"\n[bold blue]⚡ Running:[/bold blue] [yellow]{full_command}[/yellow]")
+    console.print(f"[dim]Directory: {workspace}[/dim]\n")
     
     try:
         # Stream output
-        with Live(console=console, refresh_per_second=10, vertical_overflow="visible") as live:
-            output_text = ""
-            for chunk in executor.run(full_command, stream=True, env=env_vars):
-                if isinstance(chunk, dict):
-                    if chunk["type"] == "stdout":
-                        line = chunk["line"]
-                        stdout_lines.append(line)
-                        output_text += f"[green]{line}[/green]\n"
-                    else:
-                        line = chunk["line"]
-                        stderr_lines.append(line)
-                        output_text += f"[red]{line}[/red]\n"
-                    
-                    live.update(Panel(
-                        output_text,
-                        title="Output",
-                        border_style="blue"
-                    ))
-        
-        # Get final result
-        result = {
-            "command": full_command,
-            "stdout": stdout_lines,
-            "stderr": stderr_lines,
-            "returncode": executor.process.returncode if executor.process else -1,
-            "success": executor.process.returncode == 0 if executor.process else False
-        }
+        result = stream_output(executor.run(full_command, stream=True, env=env_vars, capture=capture))
+        stdout_lines = result["stdout"]
+        stderr_lines = result["stderr"]
         
         # Show summary
         console.print("\n")
@@ -94,11 +131,19 @@ def cmd(command, cwd, timeout, analyze, env):
         else:
             console.print(f"[red]❌ Command failed with code {result['returncode']}[/red]")
         
+        console.print(f"[dim]{format_resources(result['resources'])}[/dim]")
+        
+        dropped = sum(result["dropped"].values())
+        if dropped:
+            console.print(f"[dim]Kept the last {max_lines} lines per stream; {dropped} older lines dropped[/dim]")
+        if result["log_file"]:
+            console.print(f"[dim]Full log: {result['log_file']}[/dim]")
+        
         # Analyze with AI if requested
         if analyze and (stderr_lines or not result["success"]):
             console.print("\n[yellow]🔍 Analyzing output with DeepSeek...[/yellow]")
             
-            client = DeepSeekClient()
+            client = get_client()
             
             # Prepare context
             context = f"""
@@ -129,6 +174,216 @@ STDERR:
         console.print(f"[red]Error: {e}[/red]")
 
 
+@run.command()
+@click.argument('commands', nargs=-1)
+@click.option('--file', '-f', 'jobs_file', type=click.Path(exists=True), help='Read commands from a jobs file (one per line)')
+@click.option('--jobs', '-j', default=os.cpu_count() or 4, show_default=True, help='Maximum commands running at once')
+@click.option('--cwd', '-C', help='Working directory')
+@click.option('--timeout', '-t', type=float, help='Per-command timeout in seconds')
+@click.option('--env', '-e', multiple=True, help='Environment variables (KEY=VALUE)')
+@click.option('--output/--no-output', default=True, help='Show prefixed output lines from each job')
+@click.option('--max-lines', default=10000, show_default=True, help='Output lines kept in memory per job stream (0 for no limit)')
+def parallel(commands, jobs_file, jobs, cwd, timeout, env, output, max_lines):
+    """Run independent commands concurrently with live output."""
+    job_list = [c for c in commands]
+    if jobs_file:
+        job_list.extend(load_jobs_file(Path(jobs_file)))
+    
+    if not job_list:
+        console.print("[red]Error: No commands provided. Pass commands as arguments or use --file.[/red]")
+        return
+    
+    # Parse environment variables
+    env_vars = {}
+    for e in env:
+        if '=' in e:
+            key, value = e.split('=', 1)
+            env_vars[key] = value
+    
+    workspace = Path(cwd) if cwd else Path.cwd()
+    executor = AsyncCommandExecutor(workspace=workspace, timeout=timeout, max_concurrency=jobs)
+    
+    console.print(f"\n[bold blue]⚡ Running {len(job_list)} commands[/bold blue] [dim](up to {jobs} at once)[/dim]")
+    console.print(f"[dim]Directory: {workspace}[/dim]\n")
+    
+    states = [{"status": "queued", "started": None, "last": ""} for _ in job_list]
+    
+    def label(index: int) -> str:
+        color = JOB_COLORS[index % len(JOB_COLORS)]
+        return f"[{color}][{index + 1}][/{color}]"
+    
+    def status_table() -> Table:
+        table = Table(show_header=True, header_style="bold cyan", box=None)
+        table.add_column("Job")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        table.add_column("Command", style="yellow", overflow="ellipsis", no_wrap=True)
+        for index, state in enumerate(states):
+            if state["status"] == "running":
+                elapsed = f"{time.monotonic() - state['started']:.1f}s"
+                status = "[blue]⏳ running[/blue]"
+            elif state["status"] == "queued":
+                elapsed = ""
+                status = "[dim]queued[/dim]"
+            else:
+                elapsed = f"{state['duration']:.1f}s"
+                status = "[green]✅ done[/green]" if state["status"] == "ok" else "[red]❌ failed[/red]"
+            table.add_row(label(index), status, elapsed, escape(job_list[index]))
+        return table
+    
+    with Live(console=console, refresh_per_second=10, get_renderable=status_table) as live:
+        def on_start(index):
+            states[index]["status"] = "running"
+            states[index]["started"] = time.monotonic()
+        
+        def on_output(index, chunk):
+            if output:
+                style = "" if chunk["type"] == "stdout" else "red"
+                line = escape(chunk["line"])
+                live.console.print(f"{label(index)} [{style}]{line}[/{style}]" if style else f"{label(index)} {line}")
+        
+        def on_done(index, result):
+            states[index]["status"] = "ok" if result["success"] else "failed"
+            states[index]["duration"] = result["duration"]
+        
+        try:
+            results = asyncio.run(executor.gather(
+                job_list,
+                env=env_vars,
+                on_output=on_output,
+                on_start=on_start,
+                on_done=on_done,
+                max_lines=max_lines or None
+            ))
+        except KeyboardInterrupt:
+            console.print("\n[yellow]⚠️ Commands interrupted by user[/yellow]")
+            sys.exit(130)
+    
+    # Summary table
+    table = Table(title="Summary", show_header=True, header_style="bold cyan")
+    table.add_column("Job", justify="right")
+    table.add_column("Command", style="yellow")
+    table.add_column("Exit", justify="right")
+    table.add_column("Duration", justify="right")
+    
+    for index, result in enumerate(results):
+        if result.get("error"):
+            exit_display = "[red]timeout[/red]"
+        elif result["success"]:
+            exit_display = f"[green]{result['returncode']}[/green]"
+        else:
+            exit_display = f"[red]{result['returncode']}[/red]"
+        table.add_row(str(index + 1), escape(result["command"]), exit_display, f"{result['duration']:.2f}s")
+    
+    console.print()
+    console.print(table)
+    
+    failed = sum(1 for r in results if not r["success"])
+    if failed:
+        console.print(f"\n[red]❌ {failed} of {len(results)} commands failed[/red]")
+        sys.exit(1)
+    console.print(f"\n[green]✅ All {len(results)} commands completed successfully[/green]")
+
+
+@run.command()
+@click.argument('commands', nargs=-1, required=True)
+@click.option('--runs', '-n', default=10, show_default=True, help='Timed runs per command')
+@click.option('--warmup', '-w', default=1, show_default=True, help='Untimed warmup runs per command')
+@click.option('--cwd', '-C', help='Working directory')
+@click.option('--timeout', '-t', default=60, help='Per-run timeout in seconds')
+@click.option('--ignore-failure', '-i', is_flag=True, help='Keep benchmarking commands that exit non-zero')
+@click.option('--export-json', type=click.Path(dir_okay=False), help='Write all results to a JSON file')
+@click.option('--export-csv', type=click.Path(dir_okay=False), help='Write the summary to a CSV file')
+def bench(commands, runs, warmup, cwd, timeout, ignore_failure, export_json, export_csv):
+    """Benchmark one or more commands and compare them."""
+    workspace = Path(cwd) if cwd else Path.cwd()
+    benchmark = CommandBenchmark(
+        workspace=workspace,
+        runs=runs,
+        warmup=warmup,
+        timeout=timeout,
+        ignore_failure=ignore_failure
+    )
+    
+    results = []
+    for command in commands:
+        console.print(f"\n[bold blue]⏱  Benchmarking:[/bold blue] [yellow]{escape(command)}[/yellow]")
+        
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("{task.completed}/{task.total}"),
+                transient=True,
+            ) as progress:
+                task = progress.add_task(description="Warming up...", total=warmup + runs)
+                
+                def on_run(phase, index):
+                    progress.update(task, advance=1, description="Measuring..." if phase == "timed" or index == warmup - 1 else "Warming up...")
+                
+                result = benchmark.run(command, on_run=on_run)
+        except (RuntimeError, TimeoutError) as e:
+            console.print(f"[red]❌ {e}[/red]")
+            sys.exit(1)
+        
+        results.append(result)
+        
+        line = f"  Time ([bold green]mean[/bold green] ± σ): [bold green]{format_duration(result['mean'])}[/bold green] ± {format_duration(result['stddev'])}"
+        console.print(line)
+        console.print(f"  Range (min … max):  {format_duration(result['min'])} … {format_duration(result['max'])}    [dim]{runs} runs[/dim]")
+        if result["outliers"]:
+            console.print(f"  [yellow]⚠️ {result['outliers']} statistical outlier(s) detected; consider more warmup runs or a quieter system[/yellow]")
+        if any(code != 0 for code in result["exit_codes"]):
+            console.print("  [yellow]⚠️ Some runs exited with a non-zero code[/yellow]")
+    
+    # Summary table
+    table = Table(title="Benchmark Results", show_header=True, header_style="bold cyan")
+    table.add_column("Command", style="yellow")
+    table.add_column("Mean ± σ", justify="right", no_wrap=True)
+    table.add_column("Median", justify="right", no_wrap=True)
+    table.add_column("User", justify="right", no_wrap=True)
+    table.add_column("System", justify="right", no_wrap=True)
+    table.add_column("Peak RSS", justify="right", no_wrap=True)
+    
+    for result in results:
+        table.add_row(
+            escape(result["command"]),
+            f"{format_duration(result['mean'])} ± {format_duration(result['stddev'])}",
+            format_duration(result["median"]),
+            format_duration(result["user"]) if result["user"] is not None else "-",
+            format_duration(result["system"]) if result["system"] is not None else "-",
+            format_size(result["max_rss"]) if result["max_rss"] else "-"
+        )
+    
+    console.print()
+    console.print(table)
+    
+    comparisons = compare(results) if len(results) > 1 else []
+    if comparisons:
+        console.print(f"\n[bold]Summary[/bold]\n  [yellow]{escape(comparisons[0]['fastest'])}[/yellow] ran")
+        for comparison in comparisons:
+            console.print(
+                f"    [bold green]{comparison['ratio']:.2f}[/bold green] ± {comparison['ratio_stddev']:.2f} "
+                f"times faster than [yellow]{escape(comparison['command'])}[/yellow]"
+            )
+    
+    if export_json:
+        Path(export_json).write_text(
+            json.dumps({"results": results, "comparisons": comparisons}, indent=2),
+            encoding='utf-8'
+        )
+        console.print(f"\n[green]✓[/green] Results written to [bold]{export_json}[/bold]")
+    
+    if export_csv:
+        fields = ["command", "mean", "stddev", "median", "min", "max", "user", "system", "max_rss", "outliers"]
+        with open(export_csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+        console.print(f"[green]✓[/green] Summary written to [bold]{export_csv}[/bold]")
+
+
 @run.command()
 @click.argument('code', required=False)
 @click.option('--lang', '-l', help='Programming language')
@@ -184,29 +439,14 @@ def code(code, lang, file, args, analyze):
     
     console.print(f"\n[bold blue]⚡ Executing...[/bold blue]\n")
     
-    stdout_lines = []
-    stderr_lines = []
-    
     try:
         # Run code
-        with Live(console=console, refresh_per_second=10, vertical_overflow="visible") as live:
-            output_text = ""
-            for chunk in runner.run_code(code_content, detected_lang, filename, cmd_args, stream=True):
-                if isinstance(chunk, dict):
-                    if chunk["type"] == "stdout":
-                        line = chunk["line"]
-                        stdout_lines.append(line)
-                        output_text += f"[green]{line}[/green]\n"
-                    else:
-                        line = chunk["line"]
-                        stderr_lines.append(line)
-                        output_text += f"[red]{line}[/red]\n"
-                    
-                    live.update(Panel(
-                        output_text,
-                        title="Output",
-                        border_style="blue"
-                    ))
+        result = stream_output(runner.run_code(code_content, detected_lang, filename, cmd_args, stream=True))
+        stdout_lines = result.get("stdout", [])
+        stderr_lines = result.get("stderr", [])
+        
+        if result.get("compile_cache") == "hit":
+            console.print("[dim]Reused cached build (source unchanged)[/dim]")
         
         # Show summary
         console.print("\n")
@@ -219,7 +459,7 @@ def code(code, lang, file, args, analyze):
         if analyze and stderr_lines:
             console.print("\n[yellow]🔍 Analyzing output with DeepSeek...[/yellow]")
             
-            client = DeepSeekClient()
+            client = get_client()
             
             context = f"""
 Language: {detected_lang}
@@ -302,17 +542,10 @@ def file(path, args, analyze):
     console.print(f"\n[bold blue]⚡ Executing {path}...[/bold blue]\n")
     
     try:
-        result = runner.run_file(path, cmd_args, stream=False)
-        
-        if result.get("stdout"):
-            console.print("\n[bold]Output:[/bold]")
-            for line in result["stdout"]:
-                console.print(f"  [green]{line}[/green]")
+        result = stream_output(runner.run_file(path, cmd_args, stream=True))
         
-        if result.get("stderr"):
-            console.print("\n[bold red]Errors:[/bold red]")
-            for line in result["stderr"]:
-                console.print(f"  [red]{line}[/red]")
+        if result.get("compile_cache") == "hit":
+            console.print("[dim]Reused cached build (source unchanged)[/dim]")
         
         if result.get("success"):
             console.print(f"\n[green]✅ Command completed successfully[/green]")
@@ -323,7 +556,7 @@ def file(path, args, analyze):
         if analyze and result.get("stderr"):
             console.print("\n[yellow]🔍 Analyzing with DeepSeek...[/yellow]")
             
-            client = DeepSeekClient()
+            client = get_client()
             
             context = f"""
 File: {path}
@@ -355,9 +588,11 @@ STDERR:
 
 
 @run.command()
-def list():
+@click.option('--refresh', is_flag=True, help='Re-probe every runtime instead of using cached versions')
+def list(refresh):
     """List available language runtimes."""
     runner = CodeRunner()
+    probes = runner.probe_runtimes(refresh=refresh)
     
     table = Table(title="Available Languages", show_header=True, header_style="bold cyan")
     table.add_column("Language", style="cyan")
@@ -366,7 +601,7 @@ def list():
     table.add_column("Version", style="blue")
     
     for lang, config in runner.LANGUAGE_CONFIGS.items():
-        has_deps, version = runner.check_dependencies(lang)
+        has_deps, version = probes[lang]
         if has_deps:
             status = "✅ Installed"
             version_display = version.split('\n')[0][:50]
@@ -1,6 +1,7 @@
 """Configuration management for FORGE CLI."""
 
 import os
+import copy
 import json
 from pathlib import Path
 from typing import Optional, Any, Dict
@@ -15,7 +16,14 @@ class Config:
             "api_key": "",
             "model": "deepseek-chat",
             "temperature": 0.7,
-            "max_tokens": 4096
+            "max_tokens": 4096,
+            "base_url": "https://api.deepseek.com/v1",
+            "timeout": 120.0,
+            "connect_timeout": 10.0,
+            "max_connections": 20,
+            "max_keepalive_connections": 10,
+            "keepalive_expiry": 60.0,
+            "http2": True
         },
         "github": {
             "token": "",
@@ -50,11 +58,11 @@ class Config:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     loaded = toml.load(f)
                     # Merge with defaults
-                    self._config = self._deep_merge(self.DEFAULT_CONFIG.copy(), loaded)
+                    self._config = self._deep_merge(copy.deepcopy(self.DEFAULT_CONFIG), loaded)
             except Exception:
-                self._config = self.DEFAULT_CONFIG.copy()
+                self._config = copy.deepcopy(self.DEFAULT_CONFIG)
         else:
-            self._config = self.DEFAULT_CONFIG.copy()
+            self._config = copy.deepcopy(self.DEFAULT_CONFIG)
     
     def _deep_merge(self, base: Dict, update: Dict) -> Dict:
         """Deep merge two dictionaries."""
@@ -182,7 +190,7 @@ class Config:
     
     def reset(self) -> None:
         """Reset configuration to defaults."""
-        self._config = self.DEFAULT_CONFIG.copy()
+        self._config = copy.deepcopy(self.DEFAULT_CONFIG)
         self._save_config()
 
 
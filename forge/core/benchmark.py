@@ -0,0 +1,134 @@
+"""Command benchmarking for FORGE."""
+
+import statistics
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+from forge.core.executor import CommandExecutor, OutputCapture
+
+# Modified Z-score above which a sample counts as an outlier
+OUTLIER_THRESHOLD = 3.5
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Compute summary statistics for a list of timings.
+
+    Outliers are detected with the modified Z-score (based on the median
+    absolute deviation), which stays robust when the outliers themselves
+    skew the mean.
+    """
+    median = statistics.median(samples)
+    mad = statistics.median(abs(s - median) for s in samples)
+    if mad:
+        outliers = sum(1 for s in samples if 0.6745 * abs(s - median) / mad > OUTLIER_THRESHOLD)
+    else:
+        outliers = 0
+
+    return {
+        "mean": statistics.mean(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "median": median,
+        "min": min(samples),
+        "max": max(samples),
+        "outliers": outliers,
+    }
+
+
+class CommandBenchmark:
+    """Run commands repeatedly and summarize their timings and resource usage."""
+
+    def __init__(self,
+                 workspace: Optional[Path] = None,
+                 runs: int = 10,
+                 warmup: int = 1,
+                 timeout: int = 60,
+                 ignore_failure: bool = False):
+        """Initialize benchmark.
+
+        Args:
+            workspace: Working directory for commands.
+            runs: Timed runs per command.
+            warmup: Untimed runs before measuring (fills caches).
+            timeout: Per-run timeout in seconds.
+            ignore_failure: Keep measuring when a run exits non-zero.
+        """
+        self.executor = CommandExecutor(workspace=workspace, timeout=timeout)
+        self.runs = max(1, runs)
+        self.warmup = max(0, warmup)
+        self.ignore_failure = ignore_failure
+
+    def run(self,
+            command: str,
+            on_run: Optional[Callable[[str, int], None]] = None) -> Dict[str, Any]:
+        """Benchmark a single command.
+
+        Args:
+            command: Shell command to measure.
+            on_run: Called with ``("warmup"|"timed", index)`` after each run.
+
+        Returns:
+            Dict with the per-run measurements and summary statistics.
+
+        Raises:
+            RuntimeError: If a run fails and ``ignore_failure`` is not set.
+        """
+        for index in range(self.warmup):
+            self._run_once(command)
+            if on_run:
+                on_run("warmup", index)
+
+        measurements = []
+        for index in range(self.runs):
+            measurements.append(self._run_once(command))
+            if on_run:
+                on_run("timed", index)
+
+        wall_times = [m["wall_time"] for m in measurements]
+        result = {
+            "command": command,
+            "runs": measurements,
+            "times": wall_times,
+            **summarize(wall_times),
+            "max_rss": max((m["max_rss"] or 0) for m in measurements),
+            "exit_codes": [m["returncode"] for m in measurements],
+        }
+        if measurements[0]["user_time"] is not None:
+            result["user"] = statistics.mean(m["user_time"] for m in measurements)
+            result["system"] = statistics.mean(m["sys_time"] for m in measurements)
+        else:
+            result["user"] = result["system"] = None
+        return result
+
+    def _run_once(self, command: str) -> Dict[str, Any]:
+        # Output is drained but not kept; only its size is recorded
+        result = self.executor.run_command(command, stream=False, capture=OutputCapture(max_lines=0))
+        if not result["success"] and not self.ignore_failure:
+            raise RuntimeError(
+                f"Command '{command}' exited with code {result['returncode']} "
+                f"(use --ignore-failure to benchmark it anyway)"
+            )
+        return dict(result["resources"], returncode=result["returncode"])
+
+
+def compare(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rank results against the fastest one.
+
+    Returns:
+        One entry per slower command with its ``ratio`` to the fastest mean
+        and the propagated ``ratio_stddev``.
+    """
+    fastest = min(results, key=lambda r: r["mean"])
+    comparisons = []
+    for result in results:
+        if result is fastest:
+            continue
+        ratio = result["mean"] / fastest["mean"]
+        relative = ((result["stddev"] / result["mean"]) ** 2
+                    + (fastest["stddev"] / fastest["mean"]) ** 2) ** 0.5
+        comparisons.append({
+            "command": result["command"],
+            "fastest": fastest["command"],
+            "ratio": ratio,
+            "ratio_stddev": ratio * relative,
+        })
+    return sorted(comparisons, key=lambda c: c["ratio"])
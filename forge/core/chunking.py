@@ -0,0 +1,300 @@
+"""Chunked map-reduce questions over large files for FORGE."""
+
+import ast
+import io
+import math
+import re
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import accumulate
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Files up to this many characters are sent whole; larger ones are chunked
+INLINE_LIMIT = 120_000
+
+# Target size of a chunk (roughly 3k tokens)
+CHUNK_CHARS = 12_000
+
+# What a map call answers when its chunk does not help with the question
+NOT_RELEVANT = "NOT RELEVANT"
+
+# Words too common in questions to say anything about relevance
+STOPWORDS = frozenset("""
+a an and are as at be by can do does file for from how i if in is it its me of on or should
+that the this to was what when where which who why will with would you your there their
+""".split())
+
+TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+class Chunk(NamedTuple):
+    """A run of whole lines of a file (1-based, inclusive)."""
+    start_line: int
+    end_line: int
+    text: str
+
+
+def _line_offsets(lines: List[str]) -> List[int]:
+    """Character offset of the start of every line, plus the end of the text."""
+    return list(accumulate(map(len, lines), initial=0))
+
+
+def _split_span(start: int, end: int, offsets: List[int], max_chars: int) -> List[Tuple[int, int]]:
+    """Cut lines ``start..end`` into pieces of at most ``max_chars`` (a longer single line stays whole)."""
+    spans = []
+    while start <= end:
+        limit = offsets[start - 1] + max_chars
+        last = max(start, min(end, bisect_right(offsets, limit) - 1))
+        spans.append((start, last))
+        start = last + 1
+    return spans
+
+
+def _python_spans(nodes: List[ast.stmt], start: int, end: int, offsets: List[int], max_chars: int) -> List[Tuple[int, int]]:
+    """Line spans for lines ``start..end`` that break only between statements.
+    
+    Comments and blank lines before a statement stay with it. A statement
+    too large for one chunk is split between its own body statements
+    (class methods, function blocks), and split by lines as a last resort.
+    """
+    spans = []
+    position = start
+    for index, node in enumerate(nodes):
+        node_end = end if index == len(nodes) - 1 else node.end_lineno
+        if offsets[node_end] - offsets[position - 1] > max_chars:
+            body = getattr(node, "body", None)
+            if isinstance(body, list) and body and body[0].lineno > position:
+                spans.extend(_python_spans(body, position, node_end, offsets, max_chars))
+            else:
+                spans.extend(_split_span(position, node_end, offsets, max_chars))
+        else:
+            spans.append((position, node_end))
+        position = node_end + 1
+    
+    if position <= end:
+        spans.append((position, end))
+    return spans
+
+
+def _block_spans(lines: List[str]) -> List[Tuple[int, int]]:
+    """Line spans of blank-line separated blocks (blank lines stay with the block above)."""
+    spans = []
+    start = 1
+    for number in range(1, len(lines)):
+        if not lines[number - 1].strip() and lines[number].strip():
+            spans.append((start, number))
+            start = number + 1
+    if lines:
+        spans.append((start, len(lines)))
+    return spans
+
+
+def chunk_text(text: str, language: str = "", max_chars: int = CHUNK_CHARS) -> List[Chunk]:
+    """Split text into chunks of whole lines along its structure.
+    
+    Python source is cut between top-level statements (or, for very large
+    classes and functions, between their members); anything else, or
+    Python that does not parse, is cut at blank lines. Adjacent small
+    pieces are merged up to ``max_chars``.
+    """
+    # Split the way the parser counts lines (\n, \r\n, \r), keeping the endings
+    lines = io.StringIO(text, newline="").readlines()
+    if not lines:
+        return []
+    offsets = _line_offsets(lines)
+    
+    spans = None
+    if language in ("py", "pyi", "python"):
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            tree = None
+        if tree is not None and tree.body:
+            spans = _python_spans(tree.body, 1, len(lines), offsets, max_chars)
+    if spans is None:
+        spans = []
+        for start, end in _block_spans(lines):
+            spans.extend(_split_span(start, end, offsets, max_chars))
+    
+    chunks = []
+    group_start, group_end = spans[0]
+    for start, end in spans[1:]:
+        if offsets[end] - offsets[group_start - 1] <= max_chars:
+            group_end = end
+        else:
+            chunks.append(Chunk(group_start, group_end, "".join(lines[group_start - 1:group_end])))
+            group_start, group_end = start, end
+    chunks.append(Chunk(group_start, group_end, "".join(lines[group_start - 1:group_end])))
+    return chunks
+
+
+def _term_parts(word: str) -> List[str]:
+    """A word's lowercase form, plus its snake_case and camelCase parts."""
+    lowered = word.lower()
+    parts = [part.lower() for piece in word.split("_") for part in CAMEL_RE.findall(piece)]
+    return [lowered] + parts if len(parts) > 1 else [lowered]
+
+
+def term_counts(text: str) -> Counter:
+    """Count terms, splitting each distinct word only once."""
+    counts = Counter()
+    for word, count in Counter(TOKEN_RE.findall(text)).items():
+        for term in _term_parts(word):
+            counts[term] += count
+    return counts
+
+
+def rank_chunks(chunks: List[Chunk], question: str, k1: float = 1.2, b: float = 0.75) -> List[Tuple[float, Chunk]]:
+    """Score chunks against a question with BM25, best first (ties keep file order)."""
+    terms = [term for term in term_counts(question) if term not in STOPWORDS]
+    if not chunks or not terms:
+        return [(0.0, chunk) for chunk in chunks]
+    
+    counts = [term_counts(chunk.text) for chunk in chunks]
+    lengths = [sum(count.values()) for count in counts]
+    average = sum(lengths) / len(lengths) or 1
+    idf = {}
+    for term in terms:
+        documents = sum(1 for count in counts if term in count)
+        idf[term] = math.log((len(chunks) - documents + 0.5) / (documents + 0.5) + 1)
+    
+    scores = []
+    for count, length, chunk in zip(counts, lengths, chunks):
+        score = 0.0
+        for term in terms:
+            frequency = count.get(term)
+            if frequency:
+                score += idf[term] * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / average))
+        scores.append((score, chunk))
+    return sorted(scores, key=lambda item: -item[0])
+
+
+class ChunkedAsk:
+    """Answer a question about a large file by map-reduce over its chunks.
+    
+    The most relevant chunks (by a local lexical ranking) are each asked
+    the question concurrently; the partial answers are then combined by a
+    final, streamed reduce call.
+    """
+    
+    def __init__(self,
+                 client,
+                 max_chunk_chars: int = CHUNK_CHARS,
+                 top_k: int = 8,
+                 workers: int = 4):
+        """Initialize the map-reduce driver.
+        
+        Args:
+            client: ``DeepSeekClient`` (anything with ``chat`` and ``stream_chat``).
+            max_chunk_chars: Target chunk size.
+            top_k: Chunks queried in the map pass (all of them if the
+                question shares no terms with the file).
+            workers: Map queries in flight at once.
+        """
+        self.client = client
+        self.max_chunk_chars = max_chunk_chars
+        self.top_k = max(1, top_k)
+        self.workers = max(1, workers)
+    
+    def select(self, chunks: List[Chunk], question: str) -> List[Chunk]:
+        """Pick the chunks worth querying, in file order."""
+        ranked = rank_chunks(chunks, question)
+        relevant = [chunk for score, chunk in ranked if score > 0]
+        if not relevant:
+            # Nothing to go on lexically (e.g. "summarize this"): every chunk matters
+            return chunks
+        return sorted(relevant[:self.top_k], key=lambda chunk: chunk.start_line)
+    
+    def map(self,
+            path: str,
+            chunks: List[Chunk],
+            question: str,
+            on_answer: Optional[Callable[[Chunk, Optional[str]], None]] = None) -> List[Tuple[Chunk, str]]:
+        """Ask the question of each chunk concurrently.
+        
+        Returns:
+            ``(chunk, answer)`` pairs in file order, without chunks that
+            answered ``NOT_RELEVANT``.
+        
+        Raises:
+            Exception: The first failure, if every query failed.
+        """
+        answers: Dict[Chunk, str] = {}
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self.client.chat, map_messages(path, chunk, question), temperature=0.2, max_tokens=1024): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    answers[chunk] = (future.result() or "").strip()
+                except Exception as e:
+                    errors.append(e)
+                    answers[chunk] = None
+                if on_answer:
+                    on_answer(chunk, answers[chunk])
+        
+        if errors and len(errors) == len(chunks):
+            raise errors[0]
+        return [
+            (chunk, answers[chunk]) for chunk in chunks
+            if answers[chunk] and not answers[chunk].upper().startswith(NOT_RELEVANT)
+        ]
+    
+    def reduce(self, path: str, question: str, partials: List[Tuple[Chunk, str]]):
+        """Stream the combined answer (``DeepSeekClient.stream_chat`` chunks)."""
+        return self.client.stream_chat(reduce_messages(path, question, partials))
+    
+    def ask(self,
+            path: str,
+            text: str,
+            question: str,
+            language: str = "",
+            on_answer: Optional[Callable[[Chunk, Optional[str]], None]] = None):
+        """Run selection, map and reduce; returns the reduce stream."""
+        chunks = self.select(chunk_text(text, language, self.max_chunk_chars), question)
+        if len(chunks) == 1:
+            return self.client.stream_chat(map_messages(path, chunks[0], question, final=True))
+        
+        partials = self.map(path, chunks, question, on_answer)
+        return self.reduce(path, question, partials)
+
+
+def map_messages(path: str, chunk: Chunk, question: str, final: bool = False) -> List[Dict[str, str]]:
+    """Prompt asking the question of one chunk."""
+    if final:
+        instructions = "Answer the question about this excerpt of the file."
+    else:
+        instructions = (
+            "This is one excerpt of a larger file. Answer the question using only this excerpt, "
+            "citing line numbers. Be brief: other excerpts are examined separately. If the excerpt "
+            f"does not help answer the question, reply exactly '{NOT_RELEVANT}'."
+        )
+    return [
+        {"role": "system", "content": f"You are a helpful coding assistant. {instructions}"},
+        {"role": "user", "content": (
+            f"File: {path} (lines {chunk.start_line}-{chunk.end_line})\n\n"
+            f"Content:\n```\n{chunk.text}\n```\n\nQuestion: {question}"
+        )},
+    ]
+
+
+def reduce_messages(path: str, question: str, partials: List[Tuple[Chunk, str]]) -> List[Dict[str, str]]:
+    """Prompt combining the partial answers into one."""
+    if partials:
+        notes = "\n\n".join(
+            f"Lines {chunk.start_line}-{chunk.end_line}:\n{answer}" for chunk, answer in partials
+        )
+    else:
+        notes = "(No excerpt contained anything relevant.)"
+    return [
+        {"role": "system", "content": (
+            "You are a helpful coding assistant. You are given notes taken from separate excerpts "
+            "of one file. Combine them into a single answer to the question, keeping line references."
+        )},
+        {"role": "user", "content": f"File: {path}\n\nNotes:\n{notes}\n\nQuestion: {question}"},
+    ]
@@ -0,0 +1,384 @@
+"""Line diff engine for FORGE."""
+
+import bisect
+import difflib
+import functools
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# A run of equal lines: a[i:i + n] == b[j:j + n]
+Block = Tuple[int, int, int]
+
+# Lines occurring more often than this are not used as histogram anchors
+MAX_CHAIN = 64
+
+# Backend used unless another is asked for
+DEFAULT_ALGORITHM = "myers"
+
+# Edit distance at which a Myers bisection stops searching for the optimal split
+# and splits at its furthest-reaching path instead
+MYERS_MAX_COST = 64
+
+
+def intern_lines(*sequences: Sequence[bytes]) -> List[List[int]]:
+    """Map lines to small ints shared across sequences, so equal lines compare as ints."""
+    ids: Dict[bytes, int] = {}
+    return [[ids.setdefault(line, len(ids)) for line in lines] for lines in sequences]
+
+
+def split_lines(data: bytes) -> List[bytes]:
+    """Split into lines, keeping terminators so a missing final newline is a change."""
+    return data.splitlines(keepends=True)
+
+
+def _forward_run(a: Sequence[int], i: int, b: Sequence[int], j: int, limit: int) -> int:
+    """Length of the equal run ``a[i:]``/``b[j:]`` (at most ``limit``).
+    
+    Gallops with slice comparisons so long runs are compared in C rather
+    than one item at a time.
+    """
+    n = 0
+    step = 1
+    while n < limit:
+        k = min(step, limit - n)
+        if a[i + n:i + n + k] == b[j + n:j + n + k]:
+            n += k
+            step *= 2
+        elif k == 1:
+            break
+        else:
+            step = k // 2
+    return n
+
+
+def _backward_run(a: Sequence[int], i: int, b: Sequence[int], j: int, limit: int) -> int:
+    """Length of the equal run ending just before ``a[i]``/``b[j]`` (at most ``limit``)."""
+    n = 0
+    step = 1
+    while n < limit:
+        k = min(step, limit - n)
+        if a[i - n - k:i - n] == b[j - n - k:j - n]:
+            n += k
+            step *= 2
+        elif k == 1:
+            break
+        else:
+            step = k // 2
+    return n
+
+
+def _trim(a: Sequence[int], alo: int, ahi: int, b: Sequence[int], blo: int, bhi: int) -> Tuple[int, int]:
+    """Lengths of the common prefix and suffix of two ranges."""
+    prefix = _forward_run(a, alo, b, blo, min(ahi - alo, bhi - blo))
+    suffix = _backward_run(a, ahi, b, bhi, min(ahi - alo, bhi - blo) - prefix)
+    return prefix, suffix
+
+
+def _run(a: Sequence[int], b: Sequence[int], split: Callable) -> Iterator[Block]:
+    """Drive a splitting strategy over ``a`` and ``b``, yielding blocks in order.
+    
+    ``split(a, alo, ahi, b, blo, bhi)`` returns the sub-ranges and blocks a
+    trimmed range breaks into, in order. An explicit stack keeps the output
+    ordered (and streaming) without recursion limits.
+    """
+    stack: List[tuple] = [("range", 0, len(a), 0, len(b))]
+    while stack:
+        task = stack.pop()
+        if task[0] == "block":
+            yield task[1:]
+            continue
+        
+        _, alo, ahi, blo, bhi = task
+        prefix, suffix = _trim(a, alo, ahi, b, blo, bhi)
+        if prefix:
+            yield (alo, blo, prefix)
+        if suffix:
+            stack.append(("block", ahi - suffix, bhi - suffix, suffix))
+        alo, blo, ahi, bhi = alo + prefix, blo + prefix, ahi - suffix, bhi - suffix
+        if alo < ahi and blo < bhi:
+            stack.extend(reversed(split(a, alo, ahi, b, blo, bhi)))
+
+
+def _bisect(a: Sequence[int], alo: int, ahi: int, b: Sequence[int], blo: int, bhi: int) -> Optional[Tuple[int, int]]:
+    """Find where the forward and backward Myers paths meet (linear space).
+    
+    Returns the split point relative to ``alo``/``blo``. Once the edit
+    distance passes ``MYERS_MAX_COST`` the search stops and the end of the
+    furthest-reaching path is used instead (as xdiff does), which keeps the
+    result close to minimal without quadratic cost. Returns None only if no
+    path gets off the corner, i.e. the ranges share nothing.
+    """
+    n, m = ahi - alo, bhi - blo
+    max_d = min((n + m + 1) // 2, MYERS_MAX_COST)
+    offset = max_d
+    length = 2 * max_d + 2
+    v1 = [-1] * length
+    v2 = [-1] * length
+    v1[offset + 1] = 0
+    v2[offset + 1] = 0
+    delta = n - m
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+    
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            if x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                snake = _forward_run(a, alo + x1, b, blo + y1, min(n - x1, m - y1))
+                x1 += snake
+                y1 += snake
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < length and v2[k2_offset] != -1 and x1 >= n - v2[k2_offset]:
+                    return x1, y1
+        
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            if x2 < n and y2 < m and a[ahi - x2 - 1] == b[bhi - y2 - 1]:
+                snake = _backward_run(a, ahi - x2, b, bhi - y2, min(n - x2, m - y2))
+                x2 += snake
+                y2 += snake
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, offset + x1 - k1_offset
+    
+    # Too costly to finish: split where a path got furthest along its diagonal
+    best, point = 0, None
+    for k in range(-max_d, max_d + 1):
+        x1 = v1[offset + k]
+        if 0 <= x1 <= n and 0 <= x1 - k <= m and x1 + (x1 - k) > best:
+            best, point = x1 + x1 - k, (x1, x1 - k)
+        x2 = v2[offset + k]
+        if 0 <= x2 <= n and 0 <= x2 - k <= m and x2 + (x2 - k) > best:
+            best, point = x2 + x2 - k, (n - x2, m - (x2 - k))
+    if point in ((0, 0), (n, m)):
+        return None
+    return point
+
+
+def _myers_split(a, alo, ahi, b, blo, bhi) -> list:
+    point = _bisect(a, alo, ahi, b, blo, bhi)
+    if point is None:
+        return []
+    x, y = point
+    return [("range", alo, alo + x, blo, blo + y), ("range", alo + x, ahi, blo + y, bhi)]
+
+
+def myers_blocks(a: Sequence[int], b: Sequence[int]) -> Iterator[Block]:
+    """Minimal diff (Myers' O(ND) algorithm, linear-space variant).
+    
+    Regions whose edit distance exceeds ``MYERS_MAX_COST`` are split
+    heuristically, so the result may then be slightly longer than minimal.
+    """
+    return _run(a, b, _myers_split)
+
+
+def _histogram_split(positions: Dict[int, List[int]], a, alo, ahi, b, blo, bhi) -> list:
+    counts = Counter(a[alo:ahi])
+    
+    best = None  # (lowest occurrence count, length, a start, b start)
+    j = blo
+    while j < bhi:
+        count = counts.get(b[j])
+        if count is None or count > MAX_CHAIN:
+            j += 1
+            continue
+        
+        next_j = j + 1
+        line_positions = positions[b[j]]
+        first = bisect.bisect_left(line_positions, alo)
+        for i in line_positions[first:first + count]:
+            back = _backward_run(a, i, b, j, min(i - alo, j - blo))
+            ahead = _forward_run(a, i, b, j, min(ahi - i, bhi - j))
+            start_a, start_b = i - back, j - back
+            size = back + ahead
+            rarest = min(map(counts.__getitem__, a[start_a:start_a + size]))
+            if best is None or rarest < best[0] or (rarest == best[0] and size > best[1]):
+                best = (rarest, size, start_a, start_b)
+            next_j = max(next_j, j + ahead)
+        j = next_j
+    
+    if best is None:
+        # No low-frequency anchor: let Myers sort out this region
+        return _myers_split(a, alo, ahi, b, blo, bhi)
+    
+    _, size, start_a, start_b = best
+    return [
+        ("range", alo, start_a, blo, start_b),
+        ("block", start_a, start_b, size),
+        ("range", start_a + size, ahi, start_b + size, bhi),
+    ]
+
+
+def histogram_blocks(a: Sequence[int], b: Sequence[int]) -> Iterator[Block]:
+    """Histogram diff (as in git): anchor on the rarest common lines, recurse around them."""
+    positions: Dict[int, List[int]] = {}
+    for i, line in enumerate(a):
+        positions.setdefault(line, []).append(i)
+    return _run(a, b, functools.partial(_histogram_split, positions))
+
+
+def difflib_blocks(a: Sequence[int], b: Sequence[int]) -> Iterator[Block]:
+    """Matching blocks from ``difflib.SequenceMatcher`` (not minimal, quadratic worst case)."""
+    for i, j, n in difflib.SequenceMatcher(None, a, b).get_matching_blocks():
+        if n:
+            yield (i, j, n)
+
+
+ALGORITHMS: Dict[str, Callable[[Sequence[int], Sequence[int]], Iterator[Block]]] = {
+    "myers": myers_blocks,
+    "histogram": histogram_blocks,
+    "difflib": difflib_blocks,
+}
+
+
+def register_algorithm(name: str, blocks: Callable[[Sequence[int], Sequence[int]], Iterator[Block]]) -> None:
+    """Make a diff backend available by name.
+    
+    ``blocks(a, b)`` must yield ``(i, j, n)`` runs of equal items with
+    strictly increasing ``i`` and ``j``.
+    """
+    ALGORITHMS[name] = blocks
+
+
+def opcodes(a: Sequence[int], b: Sequence[int], algorithm: str = DEFAULT_ALGORITHM) -> Iterator[Tuple[str, int, int, int, int]]:
+    """Stream ``difflib``-style ``(tag, i1, i2, j1, j2)`` opcodes."""
+    try:
+        blocks = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown diff algorithm: {algorithm} (choose from {', '.join(ALGORITHMS)})")
+    
+    i = j = 0
+    pending = None  # Adjacent blocks are merged before being reported
+    for ai, bj, n in blocks(a, b):
+        if pending and pending[1] == ai and pending[3] == bj:
+            pending = ("equal", pending[1], ai + n, pending[3], bj + n)
+            i, j = ai + n, bj + n
+            continue
+        if pending:
+            yield pending
+        if i < ai or j < bj:
+            tag = "replace" if i < ai and j < bj else "delete" if i < ai else "insert"
+            yield (tag, i, ai, j, bj)
+        pending = ("equal", ai, ai + n, bj, bj + n)
+        i, j = ai + n, bj + n
+    
+    if pending:
+        yield pending
+    if i < len(a) or j < len(b):
+        tag = "replace" if i < len(a) and j < len(b) else "delete" if i < len(a) else "insert"
+        yield (tag, i, len(a), j, len(b))
+
+
+def grouped_opcodes(codes: Iterator[tuple], context: int = 3) -> Iterator[List[tuple]]:
+    """Group opcodes into hunks with ``context`` equal lines around changes, as they stream in."""
+    group: List[tuple] = []
+    leading = None
+    for code in codes:
+        tag, i1, i2, j1, j2 = code
+        if tag != "equal":
+            if not group and leading:
+                _, li1, li2, lj1, lj2 = leading
+                keep = min(context, li2 - li1)
+                if keep:
+                    group.append(("equal", li2 - keep, li2, lj2 - keep, lj2))
+            group.append(code)
+            leading = None
+        elif not group:
+            leading = code
+        elif i2 - i1 > 2 * context:
+            if context:
+                group.append(("equal", i1, i1 + context, j1, j1 + context))
+            yield group
+            group = []
+            leading = code
+        else:
+            group.append(code)
+    
+    if group:
+        tag, i1, i2, j1, j2 = group[-1]
+        if tag == "equal":
+            group[-1] = ("equal", i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+            if context == 0:
+                group.pop()
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range, as formatted by ``difflib``."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(a_lines: Sequence[bytes],
+                 b_lines: Sequence[bytes],
+                 fromfile: str = "",
+                 tofile: str = "",
+                 context: int = 3,
+                 algorithm: str = DEFAULT_ALGORITHM) -> Iterator[str]:
+    """Stream a unified diff of two line sequences, one hunk's lines at a time.
+    
+    Yields nothing when the sequences are equal.
+    """
+    a, b = intern_lines(a_lines, b_lines)
+    
+    def emit(prefix: str, lines: Sequence[bytes]) -> Iterator[str]:
+        for line in lines:
+            yield prefix + line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+            if not line.endswith((b"\n", b"\r")):
+                yield "\\ No newline at end of file"
+    
+    started = False
+    for group in grouped_opcodes(opcodes(a, b, algorithm), context):
+        if not started:
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+            started = True
+        
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from emit(" ", a_lines[i1:i2])
+            else:
+                yield from emit("-", a_lines[i1:i2])
+                yield from emit("+", b_lines[j1:j2])
+
+
+def diff_stat(a_lines: Sequence[bytes], b_lines: Sequence[bytes], algorithm: str = DEFAULT_ALGORITHM) -> Dict[str, int]:
+    """Count inserted and deleted lines."""
+    a, b = intern_lines(a_lines, b_lines)
+    insertions = deletions = 0
+    for tag, i1, i2, j1, j2 in opcodes(a, b, algorithm):
+        if tag != "equal":
+            deletions += i2 - i1
+            insertions += j2 - j1
+    return {"insertions": insertions, "deletions": deletions}
@@ -1,15 +1,123 @@
 """Command execution engine for FORGE."""
 
+import asyncio
+import hashlib
+import json
+import shutil
 import subprocess
+import select
+import selectors
 import shlex
 import signal
 import sys
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple, List
+from typing import Optional, Dict, Any, Tuple, List, Iterator, AsyncIterator, Callable, Generator
 import tempfile
 import os
 import time
 
+# Bytes pulled from a ready pipe per wakeup
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _decode(data: bytes) -> str:
+    """Decode process output, replacing undecodable bytes."""
+    return data.decode("utf-8", errors="replace")
+
+
+def _finish(output: Generator[Dict[str, str], None, Dict[str, Any]]) -> Dict[str, Any]:
+    """Exhaust an output generator and return its result dict."""
+    while True:
+        try:
+            next(output)
+        except StopIteration as done:
+            return done.value or {}
+
+
+def _replay_errors(result: Dict[str, Any]) -> Generator[Dict[str, str], None, Dict[str, Any]]:
+    """Stream an already-failed result's stderr lines, then return it."""
+    for line in result["stderr"]:
+        yield {"type": "stderr", "line": line}
+    return result
+
+
+def _drain_lines(buffer: bytearray, data: bytes) -> List[str]:
+    """Append ``data`` to ``buffer`` and pop every complete line out of it."""
+    buffer.extend(data)
+    end = buffer.rfind(b"\n")
+    if end == -1:
+        return []
+    
+    complete = bytes(buffer[:end])
+    del buffer[:end + 1]
+    return [_decode(raw).rstrip() for raw in complete.split(b"\n")]
+
+
+class OutputCapture:
+    """Keep the most recent output lines of a command within fixed limits.
+    
+    Each stream is held in a ring buffer bounded by line count and/or byte
+    size; older lines are dropped and counted. The full output can also be
+    spilled to a log file on disk as it arrives.
+    """
+    
+    def __init__(self,
+                 max_lines: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 spill_path: Optional[Path] = None):
+        """Initialize capture.
+        
+        Args:
+            max_lines: Lines kept in memory per stream (None for no limit).
+            max_bytes: UTF-8 bytes kept in memory per stream (None for no limit).
+            spill_path: Optional file receiving every line, stdout and stderr interleaved.
+        """
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.dropped = {"stdout": 0, "stderr": 0}
+        self._lines = {"stdout": deque(), "stderr": deque()}
+        self._bytes = {"stdout": 0, "stderr": 0}
+        self._spill = None
+    
+    def append(self, stream_name: str, line: str) -> None:
+        """Record a line, evicting the oldest ones once over a limit."""
+        if self.spill_path:
+            if self._spill is None:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill = open(self.spill_path, 'w', encoding='utf-8')
+            self._spill.write(line + "\n")
+        
+        lines = self._lines[stream_name]
+        lines.append(line)
+        if self.max_bytes is not None:
+            self._bytes[stream_name] += len(line.encode('utf-8')) + 1
+        
+        while lines and self._over_limit(stream_name):
+            evicted = lines.popleft()
+            self.dropped[stream_name] += 1
+            if self.max_bytes is not None:
+                self._bytes[stream_name] -= len(evicted.encode('utf-8')) + 1
+    
+    def _over_limit(self, stream_name: str) -> bool:
+        if self.max_lines is not None and len(self._lines[stream_name]) > self.max_lines:
+            return True
+        return self.max_bytes is not None and self._bytes[stream_name] > self.max_bytes
+    
+    def lines(self, stream_name: str) -> List[str]:
+        """Return the retained lines of a stream, oldest first."""
+        return list(self._lines[stream_name])
+    
+    def close(self) -> None:
+        """Flush and close the spill file, if any."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
 
 class CommandExecutor:
     """Execute commands and capture output with real-time streaming."""
@@ -19,88 +127,49 @@ class CommandExecutor:
         self.workspace = workspace or Path.cwd()
         self.timeout = timeout
         self.process = None
+        self.result = None
     
     def run(self, 
             command: str, 
             stream: bool = True,
-            env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        """Run a command and return result."""
+            env: Optional[Dict[str, str]] = None,
+            capture: Optional[OutputCapture] = None) -> Dict[str, Any]:
+        """Run a command and return result.
+        
+        Args:
+            command: Shell command to run.
+            stream: Yield output chunks as they arrive.
+            env: Extra environment variables.
+            capture: Where output lines are kept; defaults to an unbounded
+                capture. Pass a bounded one for long-running commands.
+        """
         # Merge environment
         cmd_env = os.environ.copy()
         if env:
             cmd_env.update(env)
         
-        # Prepare command
-        if sys.platform == "win32":
-            # Windows needs different handling
-            process = subprocess.Popen(
-                command,
-                cwd=str(self.workspace),
-                env=cmd_env,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-        else:
-            # Unix-like systems
-            process = subprocess.Popen(
-                command,
-                cwd=str(self.workspace),
-                env=cmd_env,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                stdin=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                preexec_fn=os.setsid  # Create process group for killing children
-            )
-        
+        capture = capture or OutputCapture()
+        received = {"stdout": 0, "stderr": 0}
+        started = time.monotonic()
+        process = self._spawn(command, cmd_env)
         self.process = process
+        self.result = None
         
-        stdout_lines = []
-        stderr_lines = []
+        # Streaming has no time limit; captured runs are bounded by the timeout
+        deadline = None if stream else started + self.timeout
         
         try:
-            if stream:
-                # Stream output in real-time
-                while True:
-                    # Check if process has ended
-                    if process.poll() is not None:
-                        # Read any remaining output
-                        stdout, stderr = process.communicate()
-                        if stdout:
-                            stdout_lines.extend(stdout.splitlines())
-                        if stderr:
-                            stderr_lines.extend(stderr.splitlines())
-                        break
-                    
-                    # Read lines if available
-                    if process.stdout:
-                        line = process.stdout.readline()
-                        if line:
-                            line = line.rstrip()
-                            stdout_lines.append(line)
-                            yield {"type": "stdout", "line": line}
-                    
-                    if process.stderr:
-                        line = process.stderr.readline()
-                        if line:
-                            line = line.rstrip()
-                            stderr_lines.append(line)
-                            yield {"type": "stderr", "line": line}
-                    
-                    time.sleep(0.01)
-            else:
-                # Just capture output
-                stdout, stderr = process.communicate(timeout=self.timeout)
-                stdout_lines = stdout.splitlines() if stdout else []
-                stderr_lines = stderr.splitlines() if stderr else []
+            # Nothing is ever written to stdin; close it so children that
+            # read it see EOF instead of blocking forever.
+            if process.stdin:
+                process.stdin.close()
+            
+            # Collect output as lines arrive on either pipe
+            for stream_name, line in self._iter_output(process, deadline, received):
+                capture.append(stream_name, line)
+                if stream:
+                    yield {"type": stream_name, "line": line}
+            usage = self._wait(process, deadline)
                 
         except subprocess.TimeoutExpired:
             self.kill_process()
@@ -108,15 +177,197 @@ class CommandExecutor:
         except KeyboardInterrupt:
             self.kill_process()
             raise
+        finally:
+            capture.close()
         
-        return {
+        usage["wall_time"] = time.monotonic() - started
+        usage["stdout_bytes"] = received["stdout"]
+        usage["stderr_bytes"] = received["stderr"]
+        
+        self.result = {
             "command": command,
-            "stdout": stdout_lines,
-            "stderr": stderr_lines,
+            "stdout": capture.lines("stdout"),
+            "stderr": capture.lines("stderr"),
             "returncode": process.returncode,
-            "success": process.returncode == 0
+            "success": process.returncode == 0,
+            "dropped": dict(capture.dropped),
+            "log_file": str(capture.spill_path) if capture.spill_path else None,
+            "resources": usage
+        }
+        return self.result
+    
+    def _wait(self, process: subprocess.Popen, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Reap the process and return its resource usage.
+        
+        On POSIX the shell is reaped with ``os.wait4``, whose rusage covers
+        the shell and every descendant it waited for. Elsewhere only the exit
+        code is available. Note that Linux charges the high-water RSS of the
+        address space a process exec'd from, so ``max_rss`` never reads below
+        this process's own footprint at spawn time.
+        """
+        if sys.platform == "win32":
+            process.wait(timeout=None if deadline is None else max(0, deadline - time.monotonic()))
+            return {"user_time": None, "sys_time": None, "max_rss": None}
+        
+        reaped = self._wait_exit(process, deadline) if deadline is not None else None
+        pid, status, rusage = reaped or os.wait4(process.pid, 0)
+        
+        # We reaped the child ourselves, so tell Popen its exit code
+        process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        rss_scale = 1 if sys.platform == "darwin" else 1024
+        return {
+            "user_time": rusage.ru_utime,
+            "sys_time": rusage.ru_stime,
+            "max_rss": rusage.ru_maxrss * rss_scale
         }
     
+    def _spawn(self, command: str, env: Dict[str, str]) -> subprocess.Popen:
+        """Start a shell command with binary stdout/stderr pipes."""
+        if sys.platform == "win32":
+            # Windows needs different handling
+            return subprocess.Popen(
+                command,
+                cwd=str(self.workspace),
+                env=env,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.PIPE
+            )
+        
+        # Unix-like systems
+        return subprocess.Popen(
+            command,
+            cwd=str(self.workspace),
+            env=env,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            # Create process group for killing children. Unlike preexec_fn this
+            # lets CPython spawn with vfork instead of copying our address space.
+            start_new_session=True
+        )
+    
+    def _wait_exit(self, process: subprocess.Popen, deadline: float) -> Optional[Tuple[int, int, Any]]:
+        """Wait for the process to exit, raising ``subprocess.TimeoutExpired`` on the deadline.
+        
+        Returns:
+            The ``os.wait4`` result if the process had to be reaped while
+            polling, or None if it has exited and is ready to be reaped.
+        """
+        if hasattr(os, "pidfd_open"):
+            # Linux: the pidfd becomes readable on exit, so no polling is needed
+            pidfd = os.pidfd_open(process.pid)
+            try:
+                ready, _, _ = select.select([pidfd], [], [], max(0, deadline - time.monotonic()))
+            finally:
+                os.close(pidfd)
+            if not ready:
+                raise subprocess.TimeoutExpired(process.args, self.timeout)
+            return None
+        
+        delay = 0.0005
+        while True:
+            reaped = os.wait4(process.pid, os.WNOHANG)
+            if reaped[0]:
+                return reaped
+            if time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(process.args, self.timeout)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+    
+    def _iter_output(self,
+                     process: subprocess.Popen,
+                     deadline: Optional[float] = None,
+                     received: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, str]]:
+        """Yield ``(stream, line)`` pairs as soon as either pipe completes a line.
+        
+        Both pipes are drained together, so a chatty stream can never fill its
+        pipe buffer and stall the child while we wait on the other one.
+        
+        Args:
+            process: Process whose stdout/stderr pipes to read.
+            deadline: ``time.monotonic()`` value after which
+                ``subprocess.TimeoutExpired`` is raised (None for no limit).
+            received: Optional per-stream counters of bytes read.
+        """
+        received = received if received is not None else {"stdout": 0, "stderr": 0}
+        if sys.platform == "win32":
+            # select() does not support pipes on Windows
+            yield from self._iter_output_threaded(process, deadline, received)
+            return
+        
+        selector = selectors.DefaultSelector()
+        pending = {}
+        for stream_name, pipe in (("stdout", process.stdout), ("stderr", process.stderr)):
+            if pipe is not None:
+                selector.register(pipe, selectors.EVENT_READ, stream_name)
+                pending[stream_name] = bytearray()
+        
+        try:
+            while selector.get_map():
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise subprocess.TimeoutExpired(process.args, self.timeout)
+                
+                for key, _ in selector.select(remaining):
+                    stream_name = key.data
+                    buffer = pending[stream_name]
+                    # A readable fd never blocks os.read; it returns what is there
+                    data = os.read(key.fd, READ_CHUNK_SIZE)
+                    
+                    if not data:
+                        # EOF - flush a trailing line without a newline
+                        selector.unregister(key.fileobj)
+                        if buffer:
+                            yield stream_name, _decode(bytes(buffer)).rstrip()
+                        continue
+                    
+                    received[stream_name] += len(data)
+                    for line in _drain_lines(buffer, data):
+                        yield stream_name, line
+        finally:
+            selector.close()
+    
+    def _iter_output_threaded(self,
+                              process: subprocess.Popen,
+                              deadline: Optional[float],
+                              received: Dict[str, int]) -> Iterator[Tuple[str, str]]:
+        """Fallback for platforms without select() on pipes: one reader thread per pipe."""
+        lines: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        
+        def reader(stream_name: str, pipe) -> None:
+            try:
+                for raw in iter(pipe.readline, b""):
+                    received[stream_name] += len(raw)
+                    lines.put((stream_name, _decode(raw).rstrip()))
+            finally:
+                lines.put(None)
+        
+        readers = [
+            threading.Thread(target=reader, args=(name, pipe), daemon=True)
+            for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr))
+            if pipe is not None
+        ]
+        for thread in readers:
+            thread.start()
+        
+        remaining = len(readers)
+        while remaining:
+            try:
+                timeout = None if deadline is None else max(0, deadline - time.monotonic())
+                item = lines.get(timeout=timeout)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(process.args, self.timeout)
+            if item is None:
+                remaining -= 1
+            else:
+                yield item
+    
     def kill_process(self):
         """Kill the running process and its children."""
         if self.process:
@@ -128,15 +379,351 @@ class CommandExecutor:
                 except:
                     self.process.kill()
     
-    def run_command(self, command: str, stream: bool = True) -> Dict[str, Any]:
+    def run_command(self,
+                    command: str,
+                    stream: bool = True,
+                    env: Optional[Dict[str, str]] = None,
+                    capture: Optional[OutputCapture] = None) -> Dict[str, Any]:
         """Simple wrapper for running commands."""
-        result = {}
-        for output in self.run(command, stream=stream):
-            if isinstance(output, dict):
-                # This is a streaming chunk
+        return _finish(self.run(command, stream=stream, env=env, capture=capture))
+
+
+class AsyncCommandExecutor:
+    """Execute commands on asyncio, streaming output and fanning out concurrently."""
+    
+    def __init__(self,
+                 workspace: Optional[Path] = None,
+                 timeout: Optional[float] = None,
+                 max_concurrency: int = 8):
+        """Initialize executor.
+        
+        Args:
+            workspace: Working directory for commands.
+            timeout: Per-command timeout in seconds (None for no limit).
+            max_concurrency: Maximum number of commands ``gather`` runs at once.
+        """
+        self.workspace = workspace or Path.cwd()
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+    
+    async def run(self,
+                  command: str,
+                  env: Optional[Dict[str, str]] = None,
+                  on_output: Optional[Callable[[Dict[str, str]], None]] = None,
+                  capture: Optional[OutputCapture] = None) -> Dict[str, Any]:
+        """Run a command to completion and return its result.
+        
+        Args:
+            command: Shell command to run.
+            env: Extra environment variables.
+            on_output: Called with each ``{"type", "line"}`` chunk as it arrives.
+            capture: Where output lines are kept; defaults to an unbounded capture.
+        
+        Returns:
+            Result dict in the same shape as ``CommandExecutor.run``.
+        """
+        cmd_env = os.environ.copy()
+        if env:
+            cmd_env.update(env)
+        
+        kwargs = {}
+        if sys.platform != "win32":
+            kwargs["start_new_session"] = True  # Create process group for killing children
+        
+        process = await asyncio.create_subprocess_shell(
+            command,
+            cwd=str(self.workspace),
+            env=cmd_env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **kwargs
+        )
+        
+        capture = capture or OutputCapture()
+        started = time.monotonic()
+        
+        async def pump(stream_name: str, reader: asyncio.StreamReader) -> None:
+            buffer = bytearray()
+            while True:
+                data = await reader.read(READ_CHUNK_SIZE)
+                if not data:
+                    break
+                for line in _drain_lines(buffer, data):
+                    capture.append(stream_name, line)
+                    if on_output:
+                        on_output({"type": stream_name, "line": line})
+            if buffer:
+                line = _decode(bytes(buffer)).rstrip()
+                capture.append(stream_name, line)
+                if on_output:
+                    on_output({"type": stream_name, "line": line})
+        
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    pump("stdout", process.stdout),
+                    pump("stderr", process.stderr),
+                    process.wait()
+                ),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            self._kill(process)
+            await process.wait()
+            raise TimeoutError(f"Command timed out after {self.timeout} seconds")
+        except asyncio.CancelledError:
+            self._kill(process)
+            raise
+        finally:
+            capture.close()
+        
+        return {
+            "command": command,
+            "stdout": capture.lines("stdout"),
+            "stderr": capture.lines("stderr"),
+            "returncode": process.returncode,
+            "success": process.returncode == 0,
+            "dropped": dict(capture.dropped),
+            "log_file": str(capture.spill_path) if capture.spill_path else None,
+            "duration": time.monotonic() - started
+        }
+    
+    async def stream(self,
+                     command: str,
+                     env: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, str]]:
+        """Yield ``{"type": "stdout"|"stderr", "line": ...}`` chunks as they arrive."""
+        chunks: "asyncio.Queue[Dict[str, str]]" = asyncio.Queue()
+        task = asyncio.ensure_future(self.run(command, env=env, on_output=chunks.put_nowait))
+        
+        try:
+            while not (task.done() and chunks.empty()):
+                getter = asyncio.ensure_future(chunks.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            # Surface errors such as timeouts to the consumer
+            task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def gather(self,
+                     commands: List[str],
+                     env: Optional[Dict[str, str]] = None,
+                     on_output: Optional[Callable[[int, Dict[str, str]], None]] = None,
+                     on_start: Optional[Callable[[int], None]] = None,
+                     on_done: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+                     max_lines: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run many commands concurrently, at most ``max_concurrency`` at a time.
+        
+        Args:
+            commands: Shell commands to run.
+            env: Extra environment variables for every command.
+            on_output: Called with ``(index, chunk)`` for each output line.
+            on_start: Called with ``index`` when a command acquires a slot.
+            on_done: Called with ``(index, result)`` when a command finishes.
+            max_lines: Output lines kept in memory per stream of each command.
+        
+        Returns:
+            One result dict per command, in the order given. Commands that
+            time out report ``success`` False with an ``error`` message.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_one(index: int, command: str) -> Dict[str, Any]:
+            forward = (lambda chunk: on_output(index, chunk)) if on_output else None
+            async with semaphore:
+                if on_start:
+                    on_start(index)
+                started = time.monotonic()
+                try:
+                    result = await self.run(command, env=env, on_output=forward,
+                                            capture=OutputCapture(max_lines=max_lines))
+                except TimeoutError as e:
+                    result = {
+                        "command": command,
+                        "stdout": [],
+                        "stderr": [],
+                        "returncode": None,
+                        "success": False,
+                        "dropped": {"stdout": 0, "stderr": 0},
+                        "log_file": None,
+                        "duration": time.monotonic() - started,
+                        "error": str(e)
+                    }
+                if on_done:
+                    on_done(index, result)
+                return result
+        
+        return await asyncio.gather(*(run_one(i, c) for i, c in enumerate(commands)))
+    
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kill a running process and its children."""
+        if process.returncode is not None:
+            return
+        if sys.platform == "win32":
+            process.kill()
+        else:
+            try:
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                process.kill()
+
+
+class RuntimeProbeCache:
+    """Persistent cache of runtime version probes.
+    
+    Entries are keyed on the probe command and remember the resolved binary's
+    path, mtime and inode; an entry is only reused while all three match, so
+    upgrading or switching a runtime invalidates it.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        """Initialize cache.
+        
+        Args:
+            path: Cache file location (defaults to ~/.forge/runtimes.json).
+        """
+        self.path = path or Path.home() / ".forge" / "runtimes.json"
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+    
+    @staticmethod
+    def fingerprint(version_cmd: str) -> Optional[Dict[str, Any]]:
+        """Identify the binary a probe command would run, or None if not on PATH."""
+        binary = shutil.which(shlex.split(version_cmd)[0])
+        if not binary:
+            return None
+        
+        resolved = os.path.realpath(binary)
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            return None
+        
+        return {"path": resolved, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+    
+    def get(self, version_cmd: str, fingerprint: Dict[str, Any]) -> Optional[Tuple[bool, str]]:
+        """Return a cached ``(installed, version)`` if the binary is unchanged."""
+        with self._lock:
+            entry = self._load().get(version_cmd)
+        
+        if not entry or any(entry.get(key) != value for key, value in fingerprint.items()):
+            return None
+        return entry["installed"], entry["version"]
+    
+    def put(self, version_cmd: str, fingerprint: Dict[str, Any], installed: bool, version: str) -> None:
+        """Record a probe result and persist the cache."""
+        with self._lock:
+            entries = self._load()
+            entries[version_cmd] = dict(fingerprint, installed=installed, version=version)
+            self._save(entries)
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+    
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(entries, indent=2), encoding='utf-8')
+            os.replace(temp_path, self.path)
+        except OSError:
+            # The cache is an optimisation; never fail a run because of it
+            pass
+
+
+class CompileCache:
+    """Content-addressed cache of compiled snippet binaries.
+    
+    Each entry is a directory named after the hash of the source, compile
+    command and compiler version. Entries are touched on use and the least
+    recently used ones are evicted once the cache exceeds ``max_bytes``.
+    """
+    
+    BINARY_NAME = "program"
+    
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = 512 * 1024 * 1024):
+        """Initialize cache.
+        
+        Args:
+            root: Cache directory (defaults to ~/.forge/cache/build).
+            max_bytes: Total size of cached binaries to keep.
+        """
+        self.root = root or Path.home() / ".forge" / "cache" / "build"
+        self.max_bytes = max_bytes
+    
+    @staticmethod
+    def key(source: str, compile_cmd: str, compiler_version: str) -> str:
+        """Hash everything that affects the produced binary."""
+        digest = hashlib.sha256()
+        for part in (compile_cmd, compiler_version, source):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the cached binary for ``key``, marking it as recently used."""
+        entry = self.root / key
+        binary = entry / self.BINARY_NAME
+        if not binary.is_file():
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return binary
+    
+    def reserve(self, key: str) -> Path:
+        """Create a private build directory for ``key``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix=f".build-{key[:16]}-", dir=self.root))
+    
+    def commit(self, key: str, build_dir: Path) -> Path:
+        """Publish a finished build as the entry for ``key`` and enforce the size limit."""
+        entry = self.root / key
+        try:
+            os.rename(build_dir, entry)
+        except OSError:
+            # Another run published the same entry first; use theirs
+            self.discard(build_dir)
+        self.evict(keep=key)
+        return self.lookup(key) or entry / self.BINARY_NAME
+    
+    def discard(self, build_dir: Path) -> None:
+        """Remove an unpublished build directory."""
+        shutil.rmtree(build_dir, ignore_errors=True)
+    
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        total = 0
+        for entry in self.root.iterdir():
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+                total += size
+            except OSError:
                 continue
-            result = output
-        return result
+        
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
 
 
 class CodeRunner:
@@ -170,7 +757,8 @@ class CodeRunner:
         },
         "rust": {
             "extension": ".rs",
-            "run_cmd": "rustc {file} -o /tmp/rust_temp && /tmp/rust_temp",
+            "compile_cmd": "rustc {file} -o {binary}",
+            "run_cmd": "{binary}",
             "version_cmd": "rustc --version"
         },
         "bash": {
@@ -180,19 +768,37 @@ class CodeRunner:
         },
         "c": {
             "extension": ".c",
-            "run_cmd": "gcc {file} -o /tmp/c_temp && /tmp/c_temp",
+            "compile_cmd": "gcc {file} -o {binary}",
+            "run_cmd": "{binary}",
             "version_cmd": "gcc --version"
         },
         "cpp": {
             "extension": ".cpp",
-            "run_cmd": "g++ {file} -o /tmp/cpp_temp && /tmp/cpp_temp",
+            "compile_cmd": "g++ {file} -o {binary}",
+            "run_cmd": "{binary}",
             "version_cmd": "g++ --version"
         },
     }
     
-    def __init__(self, workspace: Optional[Path] = None):
+    def __init__(self,
+                 workspace: Optional[Path] = None,
+                 probe_cache: Optional[RuntimeProbeCache] = None,
+                 compile_cache: Optional[CompileCache] = None,
+                 interpreter_pool=None):
+        """Initialize runner.
+        
+        Args:
+            workspace: Working directory for code runs.
+            probe_cache: Runtime version probe cache.
+            compile_cache: Cache of compiled binaries.
+            interpreter_pool: Optional ``forge.core.workers.InterpreterPool``;
+                when given, supported languages run on its warm workers.
+        """
         self.workspace = workspace or Path.cwd()
         self.executor = CommandExecutor(workspace)
+        self.probes = probe_cache or RuntimeProbeCache()
+        self.compile_cache = compile_cache or CompileCache()
+        self.interpreter_pool = interpreter_pool
     
     def detect_language(self, code: str, filename: str = None, language: str = None) -> Tuple[str, dict]:
         """Detect programming language from code or filename."""
@@ -222,21 +828,53 @@ class CodeRunner:
         
         return "python", self.LANGUAGE_CONFIGS["python"]  # Default to Python
     
-    def check_dependencies(self, language: str) -> Tuple[bool, str]:
-        """Check if required runtime is installed."""
+    def check_dependencies(self, language: str, refresh: bool = False) -> Tuple[bool, str]:
+        """Check if required runtime is installed.
+        
+        Probe results are cached on disk and reused while the runtime binary
+        is unchanged; ``refresh`` forces a new probe.
+        """
         config = self.LANGUAGE_CONFIGS.get(language)
         if not config:
             return False, f"No configuration for {language}"
         
+        version_cmd = config["version_cmd"]
+        fingerprint = self.probes.fingerprint(version_cmd)
+        if fingerprint is None:
+            # Binary is not on PATH; no need to spawn a shell to find that out
+            return False, f"{language} not found in PATH"
+        
+        if not refresh:
+            cached = self.probes.get(version_cmd, fingerprint)
+            if cached is not None:
+                return cached
+        
         try:
-            result = self.executor.run_command(config["version_cmd"], stream=False)
+            # Probes run concurrently (probe_runtimes); each gets its own executor
+            # so none can see or kill another's process
+            probe_executor = CommandExecutor(self.workspace, timeout=self.executor.timeout)
+            result = probe_executor.run_command(version_cmd, stream=False)
             if result["success"]:
                 version = result["stdout"][0] if result["stdout"] else "Unknown"
-                return True, version
+                probe = (True, version)
             else:
-                return False, f"{language} not found in PATH"
+                probe = (False, f"{language} not found in PATH")
         except Exception as e:
             return False, str(e)
+        
+        self.probes.put(version_cmd, fingerprint, *probe)
+        return probe
+    
+    def probe_runtimes(self, refresh: bool = False) -> Dict[str, Tuple[bool, str]]:
+        """Check every configured runtime in parallel.
+        
+        Returns:
+            Mapping of language to ``(installed, version_or_error)``.
+        """
+        languages = [lang for lang in self.LANGUAGE_CONFIGS]
+        with ThreadPoolExecutor(max_workers=len(languages)) as pool:
+            probes = pool.map(lambda lang: self.check_dependencies(lang, refresh=refresh), languages)
+            return dict(zip(languages, probes))
     
     def run_code(self, 
                  code: str, 
@@ -244,20 +882,51 @@ class CodeRunner:
                  filename: str = None,
                  args: List[str] = None,
                  stream: bool = True) -> Dict[str, Any]:
-        """Run code in specified language."""
+        """Run code in specified language.
+        
+        With ``stream`` set, returns a generator of output chunks whose return
+        value is the result dict; otherwise returns the result dict directly.
+        """
         # Detect language
         lang, config = self.detect_language(code, filename, language)
         
         # Check dependencies
         has_deps, version = self.check_dependencies(lang)
         if not has_deps:
-            return {
+            result = {
                 "success": False,
                 "error": f"Missing dependency: {version}",
                 "language": lang,
                 "stdout": [],
                 "stderr": [f"Error: {lang} is not installed or not in PATH"]
             }
+            return _replay_errors(result) if stream else result
+        
+        output = self._execute(code, lang, config, version, args, stream)
+        return output if stream else _finish(output)
+    
+    def _execute(self,
+                 code: str,
+                 lang: str,
+                 config: dict,
+                 version: str,
+                 args: Optional[List[str]],
+                 stream: bool):
+        """Write code to a temp file and run it, yielding chunks and returning the result.
+        
+        Compiled languages go through the compile cache: an unchanged source
+        built with the same compiler and flags reuses its binary.
+        """
+        if self.interpreter_pool and self.interpreter_pool.supports(lang):
+            result = yield from self.interpreter_pool.run(code, lang, args)
+            result.update(language=lang, version=version)
+            return result
+        
+        binary = None
+        cache_key = None
+        if "compile_cmd" in config:
+            cache_key = self.compile_cache.key(code, config["compile_cmd"], version)
+            binary = self.compile_cache.lookup(cache_key)
         
         # Create temporary file
         with tempfile.NamedTemporaryFile(
@@ -270,20 +939,37 @@ class CodeRunner:
             temp_file = f.name
         
         try:
+            if cache_key and binary is None:
+                # Build into a private directory so concurrent runs never clobber each other
+                build_dir = self.compile_cache.reserve(cache_key)
+                compile_cmd = config["compile_cmd"].format(
+                    file=shlex.quote(temp_file),
+                    binary=shlex.quote(str(build_dir / CompileCache.BINARY_NAME))
+                )
+                result = yield from self.executor.run(compile_cmd, stream=stream)
+                if not result["success"]:
+                    self.compile_cache.discard(build_dir)
+                    result.update(language=lang, version=version, compile_cache="miss")
+                    return result
+                binary = self.compile_cache.commit(cache_key, build_dir)
+                cache_status = "miss"
+            else:
+                cache_status = "hit" if cache_key else None
+            
             # Build command
-            cmd = config["run_cmd"].format(file=temp_file)
+            cmd = config["run_cmd"].format(
+                file=temp_file,
+                binary=shlex.quote(str(binary)) if binary else ""
+            )
             if args:
                 cmd += " " + " ".join(shlex.quote(arg) for arg in args)
             
             # Run code
-            if stream:
-                for output in self.executor.run(cmd, stream=True):
-                    yield output
-            else:
-                result = self.executor.run_command(cmd, stream=False)
-                result["language"] = lang
-                result["version"] = version
-                return result
+            result = yield from self.executor.run(cmd, stream=stream)
+            result.update(language=lang, version=version)
+            if cache_status:
+                result["compile_cache"] = cache_status
+            return result
                 
         finally:
             # Clean up temp file
@@ -299,12 +985,13 @@ class CodeRunner:
         """Run a code file."""
         path = Path(filepath)
         if not path.exists():
-            return {
+            result = {
                 "success": False,
                 "error": f"File not found: {filepath}",
                 "stdout": [],
                 "stderr": [f"Error: {filepath} does not exist"]
             }
+            return _replay_errors(result) if stream else result
         
         code = path.read_text(encoding='utf-8')
         return self.run_code(
@@ -1,18 +1,1099 @@
 """File system operations for FORGE."""
 
 import os
+import re
+import sys
+import json
+import mmap
+import time
+import errno
+import bisect
+import hashlib
 import shutil
+import struct
+import fnmatch
+import glob
+import ctypes
+import ctypes.util
+import selectors
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import List, Optional, Tuple
-import difflib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Iterator, NamedTuple, Union, TYPE_CHECKING
+
+from forge.core import diff
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+if TYPE_CHECKING:
+    from forge.core.index import WorkspaceIndex, TrigramIndex
+
+# Ignore files honored by the directory walker, in increasing precedence
+IGNORE_FILES = (".gitignore", ".forgeignore")
+
+# Directories that are never descended into
+ALWAYS_IGNORED = frozenset({".git"})
+
+# Leading bytes checked for a NUL byte to tell binary files apart
+BINARY_SNIFF_SIZE = 8192
+
+# The line-offset index records one line start per block of this size
+LINE_INDEX_BLOCK_SIZE = 64 * 1024
+
+# Line-offset indexes covering less than this much of a file are not cached
+LINE_INDEX_CACHE_MIN = 8 * 1024 * 1024
+
+# Read size when hashing file contents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# ioctl that shares a file's extents with another file (reflink) on Btrfs, XFS and others
+FICLONE = 0x40049409
+
+# Bytes requested per copy_file_range/sendfile call
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Errors meaning a copy mechanism is unavailable for these files, not that the copy failed
+UNSUPPORTED_COPY_ERRORS = frozenset({
+    errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+    errno.EINVAL, errno.EBADF, errno.EPERM, errno.ETXTBSY, errno.ENOTSOCK,
+})
+
+
+def _translate_ignore_pattern(pattern: str) -> str:
+    """Translate a gitignore glob into a regex over '/'-separated relative paths."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    
+    parts = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end + 1
+        elif c == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    
+    # Unanchored patterns match at any depth below the ignore file
+    prefix = "" if anchored else "(?:.*/)?"
+    return "^" + prefix + "".join(parts) + "$"
+
+
+class IgnoreRules:
+    """Patterns from the ignore files of one directory, chained to its parent's.
+    
+    Follows gitignore semantics: patterns are relative to the directory that
+    holds the file, the last matching pattern wins, ``!`` re-includes, a
+    trailing ``/`` only matches directories, and rules in deeper directories
+    take precedence over their ancestors.
+    """
+    
+    def __init__(self, base: str, lines: List[str], parent: Optional["IgnoreRules"] = None):
+        """Initialize rules.
+        
+        Args:
+            base: Absolute path of the directory the patterns are relative to.
+            lines: Raw ignore file lines.
+            parent: Rules inherited from enclosing directories.
+        """
+        self.base = base.rstrip(os.sep) + os.sep
+        self.parent = parent
+        self.patterns = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if line:
+                self.patterns.append((re.compile(_translate_ignore_pattern(line)), negate, dir_only))
+    
+    @classmethod
+    def for_directory(cls, directory: str, parent: Optional["IgnoreRules"] = None) -> Optional["IgnoreRules"]:
+        """Load the ignore files in ``directory``, or return ``parent`` if there are none."""
+        lines = []
+        for name in IGNORE_FILES:
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                    lines.extend(f.readlines())
+            except OSError:
+                continue
+        if not lines:
+            return parent
+        rules = cls(directory, lines, parent)
+        return rules if rules.patterns else parent
+    
+    @classmethod
+    def for_root(cls, root: Path) -> Optional["IgnoreRules"]:
+        """Load ignore files from the enclosing repository down to ``root``."""
+        root = root.resolve()
+        chain = [root]
+        for ancestor in root.parents:
+            if (chain[-1] / ".git").exists():
+                break
+            chain.append(ancestor)
+        else:
+            # Not inside a repository: only the walk root's own files apply
+            chain = [root]
+        
+        rules = None
+        for directory in reversed(chain):
+            rules = cls.for_directory(str(directory), rules)
+        return rules
+    
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        """Check whether an absolute path is ignored."""
+        rules = self
+        while rules is not None:
+            if path.startswith(rules.base):
+                relative = path[len(rules.base):].replace(os.sep, "/")
+                decision = None
+                for regex, negate, dir_only in rules.patterns:
+                    if dir_only and not is_dir:
+                        continue
+                    if regex.match(relative):
+                        decision = not negate
+                if decision is not None:
+                    return decision
+            rules = rules.parent
+        return False
+
+
+class FileEntry(NamedTuple):
+    """Path and cached metadata of a listed file or directory."""
+    path: Path
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+class WalkEntry(NamedTuple):
+    """A directory entry found by ``DirectoryWalker`` and its depth below the root.
+    
+    ``last`` marks the final entry of its directory; only the ordered
+    (single-threaded) walk sets it.
+    """
+    entry: os.DirEntry
+    depth: int
+    last: bool = False
+
+
+class TreeEntry(NamedTuple):
+    """An entry of a depth-first tree listing (see ``FileSystemTool.tree``)."""
+    entry: FileEntry
+    depth: int
+    last: bool
+
+
+class DirectoryWalker:
+    """Walk a directory tree lazily with ``os.scandir``.
+    
+    Ignored and hidden directories are pruned before they are opened, and
+    each entry keeps the ``DirEntry`` stat cache from the scan. With more than
+    one thread, subdirectories are scanned concurrently and entries are
+    yielded as each directory completes; with one thread the walk is an
+    ordered depth-first pre-order traversal.
+    """
+    
+    def __init__(self,
+                 root: Path,
+                 respect_ignore: bool = True,
+                 show_hidden: bool = True,
+                 max_depth: Optional[int] = None,
+                 threads: int = 8,
+                 dirs_first: bool = False):
+        """Initialize walker.
+        
+        Args:
+            root: Directory to walk.
+            respect_ignore: Honor .gitignore/.forgeignore files.
+            show_hidden: Include names starting with a dot.
+            max_depth: Deepest level to descend to (1 lists only ``root``).
+            threads: Directories scanned concurrently.
+            dirs_first: Order each directory's subdirectories before its files.
+        """
+        # Resolved like the ignore rules' base, so a symlinked root still matches them
+        self.root = Path(root).resolve()
+        self.respect_ignore = respect_ignore
+        self.show_hidden = show_hidden
+        self.max_depth = max_depth
+        self.threads = max(1, threads)
+        self.dirs_first = dirs_first
+    
+    def __iter__(self) -> Iterator[WalkEntry]:
+        rules = IgnoreRules.for_root(self.root) if self.respect_ignore else None
+        if self.threads == 1:
+            return self._walk_ordered(rules)
+        return self._walk_parallel(rules)
+    
+    def _scan(self, directory: str, depth: int, rules: Optional[IgnoreRules]) -> Tuple[List[os.DirEntry], Optional[IgnoreRules]]:
+        """List one directory, dropping hidden and ignored entries."""
+        if self.respect_ignore and depth > 1:
+            rules = IgnoreRules.for_directory(directory, rules)
+        
+        kept = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not self.show_hidden and entry.name.startswith("."):
+                        continue
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_dir and entry.name in ALWAYS_IGNORED:
+                        continue
+                    if rules is not None and rules.ignored(entry.path, is_dir):
+                        continue
+                    kept.append(entry)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            return [], rules
+        
+        if self.dirs_first:
+            kept.sort(key=lambda e: (not e.is_dir(follow_symlinks=False), e.name))
+        else:
+            kept.sort(key=lambda e: e.name)
+        return kept, rules
+    
+    def _descend(self, entry: os.DirEntry, depth: int) -> bool:
+        return ((self.max_depth is None or depth < self.max_depth)
+                and entry.is_dir(follow_symlinks=False))
+    
+    def _walk_ordered(self, rules: Optional[IgnoreRules]) -> Iterator[WalkEntry]:
+        entries, rules = self._scan(str(self.root), 1, rules)
+        stack = [(iter(entries), len(entries), 1, rules)]
+        while stack:
+            entries, remaining, depth, rules = stack.pop()
+            entry = next(entries, None)
+            if entry is None:
+                continue
+            stack.append((entries, remaining - 1, depth, rules))
+            yield WalkEntry(entry, depth, remaining == 1)
+            if self._descend(entry, depth):
+                children, child_rules = self._scan(entry.path, depth + 1, rules)
+                stack.append((iter(children), len(children), depth + 1, child_rules))
+    
+    def _walk_parallel(self, rules: Optional[IgnoreRules]) -> Iterator[WalkEntry]:
+        pool = ThreadPoolExecutor(max_workers=self.threads)
+        pending = {pool.submit(self._scan, str(self.root), 1, rules): 1}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = pending.pop(future)
+                    entries, rules = future.result()
+                    for entry in entries:
+                        if self._descend(entry, depth):
+                            pending[pool.submit(self._scan, entry.path, depth + 1, rules)] = depth + 1
+                    for entry in entries:
+                        yield WalkEntry(entry, depth)
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+
+def _map_unordered(fn, items, threads: int) -> Iterator[tuple]:
+    """Apply ``fn`` to ``items`` on a thread pool, yielding ``(item, result)`` as each finishes.
+    
+    Only a few tasks per thread are queued at a time, so ``items`` is consumed
+    lazily and stopping early abandons the rest of the work.
+    """
+    pool = ThreadPoolExecutor(max_workers=threads)
+    items = iter(items)
+    pending = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < threads * 4:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(fn, item)] = item
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def _map_ordered(fn, items, threads: int) -> Iterator[tuple]:
+    """Like ``_map_unordered``, but yields ``(item, result)`` in the order of ``items``."""
+    pool = ThreadPoolExecutor(max_workers=threads)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, pool.submit(fn, item)))
+            if len(pending) >= threads * 4:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+class BatchResult(NamedTuple):
+    """Outcome for one path of a batch operation: its ``value``, or the ``error`` it raised."""
+    path: Path
+    value: Any
+    error: Optional[Exception]
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def compile_search_pattern(pattern: str, literal: bool = False, ignore_case: bool = False) -> "re.Pattern[bytes]":
+    """Compile a content search pattern to a multiline bytes regex."""
+    source = re.escape(pattern) if literal else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(source.encode("utf-8"), flags)
+
+
+class ContentMatch(NamedTuple):
+    """A matching line found by content search.
+    
+    ``spans`` are character offsets of the matches within ``line``; ``before``
+    and ``after`` hold ``(line_number, line)`` context pairs, never repeating
+    lines already reported with the previous match in the same file.
+    """
+    path: Path
+    line_number: int
+    line: str
+    spans: List[Tuple[int, int]]
+    before: List[Tuple[int, str]]
+    after: List[Tuple[int, str]]
+
+
+def _decode_line(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def grep_file(path: Path,
+              regex: "re.Pattern[bytes]",
+              context: int = 0,
+              max_count: Optional[int] = None) -> List[ContentMatch]:
+    """Find the lines of a file that match ``regex``.
+    
+    The file is memory-mapped, so pages are only faulted in as the regex
+    scans them. Empty and unreadable files yield nothing, and files with a
+    NUL byte near the start are treated as binary and skipped.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1:
+                    return []
+                return _grep_buffer(Path(path), data, regex, context, max_count)
+    except (OSError, ValueError):
+        return []
+
+
+def _grep_buffer(path: Path,
+                 data,
+                 regex: "re.Pattern[bytes]",
+                 context: int,
+                 max_count: Optional[int]) -> List[ContentMatch]:
+    matches: List[ContentMatch] = []
+    size = len(data)
+    line_number = 1
+    counted = 0  # Offset up to which newlines have been counted
+    position = 0
+    
+    while max_count is None or len(matches) < max_count:
+        found = regex.search(data, position)
+        if not found:
+            break
+        start = data.rfind(b"\n", 0, found.start()) + 1
+        end = data.find(b"\n", found.start())
+        if end == -1:
+            end = size
+        line_number += data[counted:start].count(b"\n")
+        counted = start
+        
+        raw = data[start:end]
+        spans = []
+        for m in regex.finditer(raw):
+            if m.end() > m.start():
+                spans.append((len(_decode_line(raw[:m.start()])), len(_decode_line(raw[:m.end()]))))
+        
+        # Context already shown after the previous match is not repeated
+        last_shown = 0
+        if matches:
+            previous = matches[-1]
+            del previous.after[max(0, line_number - previous.line_number - 1):]
+            last_shown = previous.after[-1][0] if previous.after else previous.line_number
+        
+        before = []
+        cursor = start
+        for number in range(line_number - 1, max(line_number - context, last_shown + 1) - 1, -1):
+            line_start = data.rfind(b"\n", 0, cursor - 1) + 1
+            before.append((number, _decode_line(data[line_start:cursor - 1])))
+            cursor = line_start
+        before.reverse()
+        
+        after = []
+        cursor = end + 1
+        for number in range(line_number + 1, line_number + context + 1):
+            if cursor >= size:
+                break
+            line_end = data.find(b"\n", cursor)
+            if line_end == -1:
+                line_end = size
+            after.append((number, _decode_line(data[cursor:line_end])))
+            cursor = line_end + 1
+        
+        matches.append(ContentMatch(path, line_number, _decode_line(raw), spans, before, after))
+        position = end + 1
+    
+    return matches
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """Content hash of a file (BLAKE2b, 128-bit), or None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _kernel_copy(method: str, src_fd: int, dst_fd: int) -> None:
+    """Copy a whole file between descriptors without passing the data through userspace."""
+    offset = 0
+    while True:
+        if method == "copy_file_range":
+            sent = os.copy_file_range(src_fd, dst_fd, COPY_CHUNK_SIZE, offset, offset)
+        else:
+            sent = os.sendfile(dst_fd, src_fd, offset, COPY_CHUNK_SIZE)
+        if not sent:
+            return
+        offset += sent
+
+
+def copy_file_data(source: Path, destination: Path) -> str:
+    """Copy a file's contents with the cheapest mechanism available.
+    
+    On Linux, tries a reflink first (no data copied at all), then
+    ``copy_file_range`` and ``sendfile``, which keep the data in the kernel;
+    elsewhere (where ``sendfile`` only writes to sockets), and whenever
+    those are unsupported, falls back to buffered reads and writes.
+    
+    Returns:
+        The mechanism used: "reflink", "copy_file_range", "sendfile" or "read".
+    """
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        linux = sys.platform.startswith("linux")
+        if fcntl is not None and linux:
+            try:
+                fcntl.ioctl(dst_fd, FICLONE, src_fd)
+                return "reflink"
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_COPY_ERRORS:
+                    raise
+        
+        for method in ("copy_file_range", "sendfile") if linux else ():
+            if not hasattr(os, method):
+                continue
+            try:
+                _kernel_copy(method, src_fd, dst_fd)
+                return method
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_COPY_ERRORS:
+                    raise
+                # Start over with the next mechanism
+                os.ftruncate(dst_fd, 0)
+                os.lseek(dst_fd, 0, os.SEEK_SET)
+        
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE // 64)
+        return "read"
+
+
+class CopyProgress(NamedTuple):
+    """Progress of a bulk copy, reported after each file (skipped files count as done)."""
+    files_done: int
+    total_files: int
+    bytes_done: int
+    total_bytes: int
+    skipped: int
+
+
+class LineIndexCache:
+    """On-disk cache of sparse line-offset indexes, one JSON file per path.
+    
+    An entry is only reused while the file's size, mtime and inode match.
+    """
+    
+    def __init__(self, root: Optional[Path] = None):
+        """Initialize cache.
+        
+        Args:
+            root: Cache directory (defaults to ~/.forge/cache/lines).
+        """
+        self.root = root or Path.home() / ".forge" / "cache" / "lines"
+    
+    def _entry_path(self, path: Path) -> Path:
+        return self.root / (hashlib.sha1(str(path).encode("utf-8", "surrogateescape")).hexdigest() + ".json")
+    
+    def get(self, path: Path, fingerprint: List[int]) -> Optional[dict]:
+        try:
+            entry = json.loads(self._entry_path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("fingerprint") == fingerprint else None
+    
+    def put(self, path: Path, entry: dict) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            target = self._entry_path(path)
+            temp_path = target.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(entry), encoding='utf-8')
+            os.replace(temp_path, target)
+        except OSError:
+            # The cache is an optimisation; never fail a read because of it
+            pass
+
+
+class LineReader:
+    """Read windows of lines from a file of any size without loading it.
+    
+    The file is memory-mapped. ``head`` and ``tail`` only touch the bytes
+    they return; ``lines`` seeks through a sparse index of line starts (one
+    per 64 KiB block, built with C-speed newline counting as far as needed
+    and cached on disk), so jumping to a line costs at most one block scan
+    once the index exists.
+    """
+    
+    def __init__(self, path: Path, cache: Optional[LineIndexCache] = None):
+        """Open a file.
+        
+        Args:
+            path: File to read.
+            cache: Where to persist the line index (None to keep it in memory).
+        
+        Raises:
+            ValueError: If the file looks binary.
+        """
+        self.path = Path(path).resolve()
+        self.cache = cache
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self.size = stat.st_size
+        self._fingerprint = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        
+        if self._data.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1:
+            self.close()
+            raise ValueError(f"Binary file: {path}")
+        
+        # Parallel arrays of known line starts and their line numbers
+        self._offsets = array("Q", [0])
+        self._numbers = array("Q", [1])
+        self._scanned = 0  # Bytes whose newlines have been counted
+        self._scanned_line = 1  # Line number at the end of the scanned bytes
+        self._cached_scanned = 0
+        
+        entry = cache.get(self.path, self._fingerprint) if cache else None
+        if entry:
+            self._offsets = array("Q", entry["offsets"])
+            self._numbers = array("Q", entry["numbers"])
+            self._scanned = self._cached_scanned = entry["scanned"]
+            self._scanned_line = entry["scanned_line"]
+    
+    def close(self) -> None:
+        self._save()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+    
+    def __enter__(self) -> "LineReader":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
+    @property
+    def total_lines(self) -> Optional[int]:
+        """Number of lines, if the index already covers the whole file."""
+        if self._scanned < self.size:
+            return None
+        if not self.size:
+            return 0
+        return self._scanned_line - (1 if self._data[self.size - 1:self.size] == b"\n" else 0)
+    
+    def head(self, count: int) -> List[str]:
+        """The first ``count`` lines."""
+        return self._read_from(0, count)
+    
+    def lines(self, start: int, count: Optional[int] = None) -> List[str]:
+        """``count`` lines (or all remaining lines) starting at 1-based line ``start``."""
+        offset = self._offset_of(max(1, start))
+        if offset is None:
+            return []
+        return self._read_from(offset, count)
+    
+    def tail(self, count: int) -> List[str]:
+        """The last ``count`` lines."""
+        if count <= 0 or not self.size:
+            return []
+        end = self.size - 1 if self._data[self.size - 1:self.size] == b"\n" else self.size
+        lines = []
+        while len(lines) < count and end >= 0:
+            start = self._data.rfind(b"\n", 0, end) + 1
+            lines.append(_decode_line(self._data[start:end]))
+            if start == 0:
+                break
+            end = start - 1
+        lines.reverse()
+        return lines
+    
+    def remaining_bytes(self, start: int, count: int) -> int:
+        """Bytes after the window of ``count`` lines starting at line ``start``."""
+        offset = self._offset_of(max(1, start))
+        if offset is None:
+            return 0
+        for _ in range(count):
+            newline = self._data.find(b"\n", offset)
+            if newline == -1:
+                return 0
+            offset = newline + 1
+        return self.size - offset
+    
+    def _read_from(self, offset: int, count: Optional[int]) -> List[str]:
+        if count is None:
+            if offset >= self.size:
+                return []
+            text = self._data[offset:]
+            if text.endswith(b"\n"):
+                text = text[:-1]
+            return [_decode_line(line) for line in text.split(b"\n")]
+        lines = []
+        while len(lines) < count and offset < self.size:
+            end = self._data.find(b"\n", offset)
+            if end == -1:
+                end = self.size
+            lines.append(_decode_line(self._data[offset:end]))
+            offset = end + 1
+        return lines
+    
+    def _offset_of(self, line: int) -> Optional[int]:
+        """Byte offset where 1-based ``line`` starts, or None past the end."""
+        while self._scanned < self.size and self._scanned_line <= line:
+            self._index_block()
+        
+        position = bisect.bisect_right(self._numbers, line) - 1
+        offset, number = self._offsets[position], self._numbers[position]
+        while number < line:
+            newline = self._data.find(b"\n", offset)
+            if newline == -1 or newline + 1 >= self.size:
+                return None
+            offset, number = newline + 1, number + 1
+        return offset if offset < self.size else None
+    
+    def _index_block(self) -> None:
+        """Count the newlines of the next block and record its first line start."""
+        start = self._scanned
+        end = min(self.size, start + LINE_INDEX_BLOCK_SIZE)
+        block = self._data[start:end]
+        first = block.find(b"\n")
+        if first != -1 and start + first + 1 < self.size:
+            self._offsets.append(start + first + 1)
+            self._numbers.append(self._scanned_line + 1)
+        self._scanned = end
+        self._scanned_line += block.count(b"\n")
+    
+    def _save(self) -> None:
+        if self.cache is None or self._scanned - self._cached_scanned < LINE_INDEX_CACHE_MIN:
+            return
+        self.cache.put(self.path, {
+            "fingerprint": self._fingerprint,
+            "scanned": self._scanned,
+            "scanned_line": self._scanned_line,
+            "offsets": self._offsets.tolist(),
+            "numbers": self._numbers.tolist(),
+        })
+        self._cached_scanned = self._scanned
+
+
+class ChangeEvent(NamedTuple):
+    """A coalesced change to one path: ``created``, ``modified`` or ``deleted``."""
+    path: Path
+    kind: str
+
+
+def _merge_change(previous: Optional[str], kind: str) -> Optional[str]:
+    """Combine two changes to the same path within one batch (None cancels out)."""
+    if previous == "created":
+        return None if kind == "deleted" else "created"
+    if previous == "deleted" and kind == "created":
+        return "modified"
+    return kind
+
+
+class _InotifyBackend:
+    """Recursive watch built from one inotify watch per directory (Linux)."""
+    
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, watcher: "FileWatcher"):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        
+        self.watcher = watcher
+        self._dirs = {}  # watch descriptor -> (directory, ignore rules)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.fd, selectors.EVENT_READ)
+        self._add_tree(str(watcher.root), watcher.root_rules, report=False, events=[])
+    
+    def read(self, timeout: Optional[float]) -> List[Tuple[str, str]]:
+        if not self._selector.select(timeout):
+            return []
+        
+        events: List[Tuple[str, str]] = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+                offset += length
+                self._handle(wd, mask, name, events)
+        return events
+    
+    def _handle(self, wd: int, mask: int, name: str, events: List[Tuple[str, str]]) -> None:
+        if mask & self.IN_Q_OVERFLOW:
+            # Events were lost: rescan everything and report the root as changed
+            self._reset()
+            events.append((str(self.watcher.root), "modified"))
+            return
+        if mask & self.IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        if wd not in self._dirs or not name:
+            return
+        
+        directory, rules = self._dirs[wd]
+        path = os.path.join(directory, name)
+        is_dir = bool(mask & self.IN_ISDIR)
+        if self.watcher.excluded(path, name, is_dir, rules):
+            return
+        
+        if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+            events.append((path, "created"))
+            if is_dir:
+                # Files may have appeared before the new directory was watched
+                if self.watcher.respect_ignore:
+                    rules = IgnoreRules.for_directory(path, rules)
+                self._add_tree(path, rules, report=True, events=events)
+        elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+            events.append((path, "deleted"))
+            if is_dir:
+                # The watches follow the directory wherever it went; a move within
+                # the tree re-adds them under the new path (IN_MOVED_TO)
+                self._remove_tree(path)
+        elif not is_dir:
+            events.append((path, "modified"))
+    
+    def _add_tree(self, directory: str, rules: Optional["IgnoreRules"], report: bool, events: List[Tuple[str, str]]) -> None:
+        self._add_watch(directory, rules)
+        stack = [(directory, rules)]
+        while stack:
+            current, current_rules = stack.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if self.watcher.excluded(entry.path, entry.name, is_dir, current_rules):
+                    continue
+                if report:
+                    events.append((entry.path, "created"))
+                if is_dir:
+                    child_rules = IgnoreRules.for_directory(entry.path, current_rules) if self.watcher.respect_ignore else None
+                    self._add_watch(entry.path, child_rules)
+                    stack.append((entry.path, child_rules))
+    
+    def _add_watch(self, directory: str, rules: Optional["IgnoreRules"]) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (raise fs.inotify.max_user_watches)")
+            return  # Directory vanished or is unreadable
+        self._dirs[wd] = (directory, rules)
+    
+    def _remove_tree(self, directory: str) -> None:
+        """Drop the watches of ``directory`` and everything below it."""
+        prefix = directory + os.sep
+        for wd, (path, _) in list(self._dirs.items()):
+            if path == directory or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+    
+    def _reset(self) -> None:
+        for wd in list(self._dirs):
+            self._libc.inotify_rm_watch(self.fd, wd)
+        self._dirs.clear()
+        self._add_tree(str(self.watcher.root), self.watcher.root_rules, report=False, events=[])
+    
+    def close(self) -> None:
+        self._selector.close()
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Portable fallback that diffs periodic snapshots of the tree."""
+    
+    def __init__(self, watcher: "FileWatcher"):
+        self.watcher = watcher
+        self._snapshot = self._scan()
+        self._next_poll = time.monotonic() + watcher.poll_interval
+    
+    def _scan(self) -> dict:
+        snapshot = {}
+        walker = DirectoryWalker(self.watcher.root, respect_ignore=self.watcher.respect_ignore)
+        for item in walker:
+            entry = item.entry
+            if entry.name in self.watcher.exclude:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            # Directory mtimes change with their contents; only report entries themselves
+            snapshot[entry.path] = (is_dir, None if is_dir else (stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        return snapshot
+    
+    def read(self, timeout: Optional[float]) -> List[Tuple[str, str]]:
+        wait_for = max(0.0, self._next_poll - time.monotonic())
+        if timeout is not None and timeout < wait_for:
+            time.sleep(timeout)
+            return []
+        time.sleep(wait_for)
+        self._next_poll = time.monotonic() + self.watcher.poll_interval
+        
+        current = self._scan()
+        events = [(path, "deleted") for path in self._snapshot.keys() - current.keys()]
+        for path, state in current.items():
+            previous = self._snapshot.get(path)
+            if previous is None:
+                events.append((path, "created"))
+            elif previous != state:
+                events.append((path, "modified"))
+        self._snapshot = current
+        return events
+    
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """Watch a directory tree and yield debounced batches of changes.
+    
+    Uses inotify (through ctypes) on Linux and falls back to polling
+    snapshots elsewhere. Events are coalesced per path, and a batch is
+    yielded once no new event has arrived for ``debounce`` seconds (or
+    ``max_delay`` after its first event, so a steady stream of writes can't
+    hold it back forever). Ignored paths and ``.git`` are not reported.
+    """
+    
+    def __init__(self,
+                 root: Path,
+                 respect_ignore: bool = True,
+                 debounce: float = 0.1,
+                 max_delay: float = 2.0,
+                 poll_interval: float = 1.0,
+                 backend: str = "auto",
+                 exclude: Tuple[str, ...] = ()):
+        """Initialize watcher.
+        
+        Args:
+            root: Directory to watch.
+            respect_ignore: Skip paths excluded by .gitignore/.forgeignore.
+            debounce: Quiet period that ends a batch, in seconds.
+            max_delay: Longest a batch is held back, in seconds.
+            poll_interval: Snapshot interval of the polling backend.
+            backend: ``"inotify"``, ``"poll"`` or ``"auto"``.
+            exclude: Extra file or directory names that are never reported.
+        """
+        self.root = Path(root).resolve()
+        self.respect_ignore = respect_ignore
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.exclude = frozenset(exclude) | ALWAYS_IGNORED
+        self.root_rules = IgnoreRules.for_root(self.root) if respect_ignore else None
+        self._closed = False
+        self._iterating = False
+        
+        if backend in ("auto", "inotify"):
+            try:
+                self._backend = _InotifyBackend(self)
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+                self._backend = _PollingBackend(self)
+        else:
+            self._backend = _PollingBackend(self)
+    
+    @property
+    def backend(self) -> str:
+        return "inotify" if isinstance(self._backend, _InotifyBackend) else "poll"
+    
+    def excluded(self, path: str, name: str, is_dir: bool, rules: Optional[IgnoreRules]) -> bool:
+        if name in self.exclude:
+            return True
+        return rules is not None and rules.ignored(path, is_dir)
+    
+    def __iter__(self) -> Iterator[List[ChangeEvent]]:
+        self._iterating = True
+        try:
+            yield from self._batches()
+        finally:
+            self._iterating = False
+            if self._closed:
+                self._backend.close()
+    
+    def _batches(self) -> Iterator[List[ChangeEvent]]:
+        pending = {}
+        first = last = 0.0
+        while not self._closed:
+            if pending:
+                timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - time.monotonic())
+            else:
+                # Wake up now and then so close() from another thread is noticed
+                timeout = 0.5
+            
+            events = self._backend.read(timeout)
+            now = time.monotonic()
+            for path, kind in events:
+                if not pending:
+                    first = now
+                merged = _merge_change(pending.get(path), kind)
+                if merged is None:
+                    pending.pop(path, None)
+                else:
+                    pending[path] = merged
+            if events:
+                last = now
+            
+            if pending and now >= min(last + self.debounce, first + self.max_delay):
+                batch = [ChangeEvent(Path(path), kind) for path, kind in sorted(pending.items())]
+                pending = {}
+                yield batch
+    
+    def close(self) -> None:
+        """Stop watching; an active iteration ends within half a second."""
+        if self._closed:
+            return
+        self._closed = True
+        # A running iteration releases the backend itself once it notices
+        if not self._iterating:
+            self._backend.close()
+    
+    def __enter__(self) -> "FileWatcher":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
 
 class FileSystemTool:
     """Tools for interacting with the file system."""
     
-    def __init__(self, workspace: Optional[Path] = None):
-        """Initialize with optional workspace restriction."""
+    def __init__(self,
+                 workspace: Optional[Path] = None,
+                 index: Optional["WorkspaceIndex"] = None,
+                 content_index: Optional["TrigramIndex"] = None):
+        """Initialize with optional workspace restriction.
+        
+        When a ``WorkspaceIndex`` is given, ignore-aware recursive listings,
+        file searches and file info inside the workspace are answered from it
+        instead of walking the tree. A ``TrigramIndex`` narrows content
+        searches to the files that can contain a match.
+        """
         self.workspace = workspace or Path.cwd()
+        self.index = index
+        self.content_index = content_index
     
     def read_file(self, path: str) -> Tuple[str, str]:
         """Read a file and return its content with syntax hint."""
@@ -29,6 +1110,18 @@ class FileSystemTool:
         
         return content, extension
     
+    def open_lines(self, path: str, cache: Optional[LineIndexCache] = None) -> LineReader:
+        """Open a file for windowed line access without reading all of it."""
+        full_path = self._resolve_path(path)
+        
+        if not full_path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        
+        if not full_path.is_file():
+            raise IsADirectoryError(f"Path is a directory: {path}")
+        
+        return LineReader(full_path, cache=cache)
+    
     def write_file(self, path: str, content: str, force: bool = False) -> bool:
         """Write content to a file."""
         full_path = self._resolve_path(path)
@@ -43,25 +1136,142 @@ class FileSystemTool:
         full_path.write_text(content, encoding='utf-8')
         return True
     
-    def list_directory(self, path: str = ".", recursive: bool = False) -> List[Path]:
-        """List contents of a directory."""
-        full_path = self._resolve_path(path)
+    def list_directory(self,
+                       path: str = ".",
+                       recursive: bool = False,
+                       respect_ignore: bool = True,
+                       show_hidden: bool = True) -> List[Path]:
+        """List contents of a directory.
         
-        if not full_path.exists():
-            raise FileNotFoundError(f"Path not found: {path}")
+        Recursive listings skip paths excluded by .gitignore/.forgeignore
+        unless ``respect_ignore`` is False.
+        """
+        return [entry.path for entry in self.entries(path, recursive, respect_ignore, show_hidden)]
+    
+    def entries(self,
+                path: str = ".",
+                recursive: bool = False,
+                respect_ignore: bool = True,
+                show_hidden: bool = True) -> Iterator[FileEntry]:
+        """Yield the contents of a directory with their size and mtime.
         
-        if not full_path.is_dir():
-            raise NotADirectoryError(f"Not a directory: {path}")
+        Metadata comes from the workspace index when it covers the listing,
+        and otherwise from the stat cache of the directory scan.
+        """
+        full_path = self._resolve_dir(path)
+        
+        if recursive and respect_ignore and self.index is not None and self.index.covers(full_path):
+            yield from self.index.entries(full_path, show_hidden=show_hidden)
+            return
         
         if recursive:
-            return list(full_path.rglob("*"))
+            walker = self.walk(path, respect_ignore=respect_ignore, show_hidden=show_hidden)
         else:
-            return list(full_path.iterdir())
+            walker = self.walk(path, respect_ignore=False, show_hidden=show_hidden, max_depth=1, threads=1)
+        
+        for item in walker:
+            yield self._file_entry(item.entry)
+    
+    def tree(self,
+             path: str = ".",
+             respect_ignore: bool = True,
+             show_hidden: bool = True,
+             max_depth: Optional[int] = None) -> Iterator[TreeEntry]:
+        """Yield a directory tree depth-first, directories before files.
+        
+        Each directory is listed only when the walk reaches it, so the first
+        entries arrive immediately and only the directories along the
+        current path are held in memory. The workspace index answers when it
+        covers the tree.
+        """
+        full_path = self._resolve_dir(path)
+        
+        if respect_ignore and self.index is not None and self.index.covers(full_path):
+            stack = [(self.index.children(full_path, show_hidden), 0, 1)]
+            while stack:
+                children, position, depth = stack.pop()
+                if position == len(children):
+                    continue
+                stack.append((children, position + 1, depth))
+                entry = children[position]
+                yield TreeEntry(entry, depth, position == len(children) - 1)
+                if entry.is_dir and (max_depth is None or depth < max_depth):
+                    stack.append((self.index.children(entry.path, show_hidden), 0, depth + 1))
+            return
+        
+        walker = DirectoryWalker(
+            full_path,
+            respect_ignore=respect_ignore,
+            show_hidden=show_hidden,
+            max_depth=max_depth,
+            threads=1,
+            dirs_first=True
+        )
+        for item in walker:
+            yield TreeEntry(self._file_entry(item.entry), item.depth, item.last)
+    
+    @staticmethod
+    def _file_entry(entry: os.DirEntry) -> FileEntry:
+        """``FileEntry`` from the stat cached by the directory scan."""
+        is_dir = entry.is_dir(follow_symlinks=False)
+        try:
+            stat = entry.stat()
+        except OSError:
+            stat = entry.stat(follow_symlinks=False)
+        return FileEntry(Path(entry.path), is_dir, 0 if is_dir else stat.st_size, stat.st_mtime)
+    
+    def watch(self,
+              path: str = ".",
+              respect_ignore: bool = True,
+              debounce: float = 0.1,
+              backend: str = "auto",
+              exclude: Tuple[str, ...] = ()) -> FileWatcher:
+        """Watch a directory tree, yielding debounced batches of ``ChangeEvent``."""
+        return FileWatcher(
+            self._resolve_dir(path),
+            respect_ignore=respect_ignore,
+            debounce=debounce,
+            backend=backend,
+            exclude=exclude
+        )
+    
+    def walk(self,
+             path: str = ".",
+             respect_ignore: bool = True,
+             show_hidden: bool = True,
+             max_depth: Optional[int] = None,
+             threads: int = 8) -> DirectoryWalker:
+        """Lazily walk a directory tree, pruning ignored directories.
+        
+        Args:
+            path: Directory to walk.
+            respect_ignore: Honor .gitignore/.forgeignore files.
+            show_hidden: Include dotfiles and descend into dot-directories.
+            max_depth: Deepest level to descend to (None for unlimited).
+            threads: Directories scanned concurrently (1 for ordered output).
+        
+        Returns:
+            An iterable of ``WalkEntry`` items.
+        """
+        return DirectoryWalker(
+            self._resolve_dir(path),
+            respect_ignore=respect_ignore,
+            show_hidden=show_hidden,
+            max_depth=max_depth,
+            threads=threads
+        )
     
     def get_file_info(self, path: str) -> dict:
         """Get information about a file or directory."""
         full_path = self._resolve_path(path)
+        info = self._stat_info(full_path, path)
         
+        if self.index is not None:
+            info.update(self.index.summary(full_path))
+        
+        return info
+    
+    def _stat_info(self, full_path: Path, path: str) -> dict:
         if not full_path.exists():
             raise FileNotFoundError(f"Path not found: {path}")
         
@@ -99,71 +1309,426 @@ class FileSystemTool:
         
         return True
     
-    def move_file(self, source: str, destination: str) -> bool:
-        """Move or rename a file/directory."""
+    def move_file(self,
+                  source: str,
+                  destination: str,
+                  threads: int = 8,
+                  on_progress: Optional[Callable[[CopyProgress], None]] = None) -> bool:
+        """Move or rename a file/directory.
+        
+        A rename is tried first; across filesystems the tree is bulk-copied
+        (see ``copy_tree``) and the source removed afterwards.
+        """
         src_path = self._resolve_path(source)
         dst_path = self._resolve_path(destination)
         
-        if not src_path.exists():
+        if not src_path.exists() and not src_path.is_symlink():
             raise FileNotFoundError(f"Source not found: {source}")
         
+        if dst_path.is_dir():
+            dst_path = dst_path / src_path.name
         # Create destination directory if needed
         dst_path.parent.mkdir(parents=True, exist_ok=True)
         
-        shutil.move(str(src_path), str(dst_path))
+        try:
+            os.rename(src_path, dst_path)
+            return True
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        
+        self.copy_tree(str(src_path), str(dst_path), threads=threads, on_progress=on_progress)
+        if src_path.is_dir() and not src_path.is_symlink():
+            shutil.rmtree(src_path)
+        else:
+            src_path.unlink()
         return True
     
     def copy_file(self, source: str, destination: str) -> bool:
         """Copy a file/directory."""
+        self.copy_tree(source, destination)
+        return True
+    
+    def copy_tree(self,
+                  source: str,
+                  destination: str,
+                  threads: int = 8,
+                  skip_unchanged: bool = False,
+                  checksum: bool = False,
+                  on_progress: Optional[Callable[[CopyProgress], None]] = None) -> Dict[str, Any]:
+        """Copy a file or directory tree, copying files concurrently.
+        
+        Directories are merged into an existing destination, symlinks are
+        recreated rather than followed, and timestamps and permissions are
+        preserved. File data goes through ``copy_file_data``.
+        
+        Args:
+            source: File or directory to copy.
+            destination: Target path (a file copied onto a directory lands inside it).
+            threads: Files copied concurrently.
+            skip_unchanged: Leave destination files alone when their size and
+                mtime already match the source (rsync-style).
+            checksum: With ``skip_unchanged``, also require equal content hashes.
+            on_progress: Called with a ``CopyProgress`` after each file.
+        
+        Returns:
+            Dict with counts of ``files`` copied, ``skipped``, ``bytes``,
+            ``dirs`` and ``links``, and the copy ``methods`` used.
+        """
         src_path = self._resolve_path(source)
         dst_path = self._resolve_path(destination)
         
-        if not src_path.exists():
+        if not src_path.exists() and not src_path.is_symlink():
             raise FileNotFoundError(f"Source not found: {source}")
+        if not src_path.is_dir() and dst_path.is_dir():
+            dst_path = dst_path / src_path.name
+        if dst_path.exists() and src_path.samefile(dst_path):
+            raise shutil.SameFileError(f"{source} and {destination} are the same file")
         
-        # Create destination directory if needed
-        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        dirs, files, links = self._plan_copy(src_path, dst_path)
+        for _, dst_dir in dirs:
+            dst_dir.mkdir(parents=True, exist_ok=True)
+        if not dirs:
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+        for src_link, dst_link in links:
+            if dst_link.is_symlink() or dst_link.exists():
+                dst_link.unlink()
+            os.symlink(os.readlink(src_link), dst_link)
         
-        if src_path.is_file():
-            shutil.copy2(src_path, dst_path)
-        else:
-            shutil.copytree(src_path, dst_path)
+        def copy_one(job: Tuple[Path, Path, os.stat_result]) -> Optional[str]:
+            src, dst, stat = job
+            if skip_unchanged and self._unchanged(src, dst, stat, checksum):
+                return None
+            method = copy_file_data(src, dst)
+            shutil.copystat(src, dst)
+            return method
         
-        return True
+        total_bytes = sum(stat.st_size for _, _, stat in files)
+        stats: Dict[str, Any] = {"files": 0, "skipped": 0, "bytes": 0, "dirs": len(dirs), "links": len(links), "methods": {}}
+        done = done_bytes = 0
+        for (_, _, stat), method in _map_unordered(copy_one, files, threads):
+            done += 1
+            done_bytes += stat.st_size
+            if method is None:
+                stats["skipped"] += 1
+            else:
+                stats["files"] += 1
+                stats["bytes"] += stat.st_size
+                stats["methods"][method] = stats["methods"].get(method, 0) + 1
+            if on_progress:
+                on_progress(CopyProgress(done, len(files), done_bytes, total_bytes, stats["skipped"]))
+        
+        # Deepest first, so copying into a directory cannot touch its restored mtime again
+        for src_dir, dst_dir in reversed(dirs):
+            shutil.copystat(src_dir, dst_dir)
+        return stats
     
-    def search_files(self, pattern: str, path: str = ".", content_search: bool = False) -> List[Path]:
-        """Search for files matching pattern."""
-        full_path = self._resolve_path(path)
+    @staticmethod
+    def _plan_copy(source: Path, destination: Path) -> Tuple[list, list, list]:
+        """List the directories, regular files (with their stat) and symlinks to copy."""
+        if source.is_symlink():
+            return [], [], [(source, destination)]
+        if not source.is_dir():
+            return [], [(source, destination, source.stat())], []
         
-        if not full_path.exists():
-            raise FileNotFoundError(f"Path not found: {path}")
+        dirs, files, links = [(source, destination)], [], []
+        stack = [(source, destination)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            with os.scandir(src_dir) as it:
+                for entry in it:
+                    src, dst = Path(entry.path), dst_dir / entry.name
+                    if entry.is_symlink():
+                        links.append((src, dst))
+                    elif entry.is_dir():
+                        dirs.append((src, dst))
+                        stack.append((src, dst))
+                    elif entry.is_file():
+                        files.append((src, dst, entry.stat()))
+        return dirs, files, links
+    
+    @staticmethod
+    def _unchanged(source: Path, destination: Path, stat: os.stat_result, checksum: bool) -> bool:
+        """Whether ``destination`` already holds a copy of ``source``."""
+        try:
+            existing = destination.stat()
+        except OSError:
+            return False
+        if existing.st_size != stat.st_size or existing.st_mtime_ns != stat.st_mtime_ns:
+            return False
+        return not checksum or hash_file(source) == hash_file(destination)
+    
+    def expand_paths(self, patterns: Iterable[Union[str, Path]]) -> List[Path]:
+        """Resolve paths and glob patterns (``*``, ``?``, ``[...]``, ``**``), in order and without duplicates.
+        
+        Plain paths are kept even when missing, so batch operations report
+        them; patterns that match nothing contribute no paths.
+        """
+        paths = []
+        for pattern in map(str, patterns):
+            if any(char in pattern for char in "*?["):
+                full_pattern = os.path.join(self.workspace, os.path.expanduser(pattern))
+                paths.extend(Path(match) for match in sorted(glob.glob(full_pattern, recursive=True)))
+            else:
+                paths.append(self._resolve_path(pattern))
+        return list(dict.fromkeys(paths))
+    
+    def read_many(self,
+                  patterns: Iterable[Union[str, Path]],
+                  threads: int = 8,
+                  stream: bool = False) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Read several files; each value is ``read_file``'s ``(content, extension)``."""
+        return self._batch(lambda path: self.read_file(str(path)), patterns, threads, stream)
+    
+    def stat_many(self,
+                  patterns: Iterable[Union[str, Path]],
+                  threads: int = 8,
+                  stream: bool = False) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Get ``get_file_info`` for several paths.
+        
+        Paths are stat'ed on the thread pool; index details are added as
+        results are collected, since the index connection is not shared
+        between threads.
+        """
+        def summarize(path: Path, info: dict) -> dict:
+            if self.index is not None:
+                info.update(self.index.summary(path))
+            return info
+        
+        return self._batch(lambda path: self._stat_info(path, str(path)), patterns, threads, stream, summarize)
+    
+    def delete_many(self,
+                    patterns: Iterable[Union[str, Path]],
+                    force: bool = False,
+                    threads: int = 8,
+                    stream: bool = False) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Delete several files or directories (see ``delete_file``)."""
+        return self._batch(lambda path: self.delete_file(str(path), force=force), patterns, threads, stream)
+    
+    def copy_many(self,
+                  patterns: Iterable[Union[str, Path]],
+                  destination: str,
+                  threads: int = 8,
+                  skip_unchanged: bool = False,
+                  checksum: bool = False,
+                  stream: bool = False) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Copy several files or trees into the ``destination`` directory.
         
-        results = []
-        for file_path in full_path.rglob(pattern):
-            if file_path.is_file():
-                results.append(file_path)
+        Each value is the ``copy_tree`` stats dict for that source.
+        """
+        dst_dir = self._resolve_path(destination)
+        if dst_dir.exists() and not dst_dir.is_dir():
+            raise NotADirectoryError(f"Destination is not a directory: {destination}")
+        dst_dir.mkdir(parents=True, exist_ok=True)
         
-        return results
+        def copy(path: Path) -> Dict[str, Any]:
+            return self.copy_tree(
+                str(path), str(dst_dir / path.name),
+                threads=1, skip_unchanged=skip_unchanged, checksum=checksum
+            )
+        
+        return self._batch(copy, patterns, threads, stream)
+    
+    def _batch(self,
+               fn: Callable[[Path], Any],
+               patterns: Iterable[Union[str, Path]],
+               threads: int,
+               stream: bool,
+               finish: Optional[Callable[[Path, Any], Any]] = None) -> Union[List[BatchResult], Iterator[BatchResult]]:
+        """Run ``fn`` over the expanded paths on a bounded pool, keeping input order.
+        
+        A failure is recorded in its ``BatchResult`` instead of stopping the
+        batch. ``finish`` post-processes each value on the calling thread.
+        """
+        def attempt(path: Path) -> Tuple[Any, Optional[Exception]]:
+            try:
+                return fn(path), None
+            except Exception as e:
+                return None, e
+        
+        def results() -> Iterator[BatchResult]:
+            for path, (value, error) in _map_ordered(attempt, self.expand_paths(patterns), max(1, threads)):
+                if error is None and finish is not None:
+                    try:
+                        value = finish(path, value)
+                    except Exception as e:
+                        value, error = None, e
+                yield BatchResult(path, value, error)
+        
+        return results() if stream else list(results())
+    
+    def search_files(self,
+                     pattern: str,
+                     path: str = ".",
+                     content_search: bool = False,
+                     respect_ignore: bool = True) -> List[Path]:
+        """Search for files matching pattern.
+        
+        With ``content_search``, ``pattern`` is a regex matched against file
+        contents and the files containing it are returned.
+        """
+        if content_search:
+            matches = self.search_content(pattern, path, respect_ignore=respect_ignore)
+            return list(dict.fromkeys(match.path for match in matches))
+        return list(self.iter_files(pattern, path, respect_ignore=respect_ignore))
+    
+    def search_content(self,
+                       pattern: str,
+                       path: str = ".",
+                       glob: str = "*",
+                       literal: bool = False,
+                       ignore_case: bool = False,
+                       context: int = 0,
+                       max_count: Optional[int] = None,
+                       respect_ignore: bool = True,
+                       threads: int = 8) -> Iterator[ContentMatch]:
+        """Search file contents, yielding matches as each file is scanned.
+        
+        Files come from the trigram index when one is available and
+        enabled, otherwise from the ignore-aware walker, and are grepped on a
+        thread pool; a file's matches are yielded together, in line order.
+        
+        Args:
+            pattern: Regex (or literal string) to look for.
+            path: Directory to search.
+            glob: Only search files whose name matches this glob.
+            literal: Treat ``pattern`` as a plain string.
+            ignore_case: Match case-insensitively.
+            context: Lines of context to include around each match.
+            max_count: Stop after this many matching lines in total.
+            respect_ignore: Honor .gitignore/.forgeignore files.
+            threads: Files scanned concurrently.
+        
+        Raises:
+            re.error: If ``pattern`` is not a valid regex.
+        """
+        regex = compile_search_pattern(pattern, literal, ignore_case)
+        remaining = max_count
+        
+        files = None
+        if respect_ignore and self.content_index is not None:
+            full_path = self._resolve_dir(path)
+            candidates = self.content_index.candidates(pattern, full_path, literal, ignore_case)
+            if candidates is not None:
+                name_regex = re.compile(fnmatch.translate(glob))
+                files = [f for f in candidates if name_regex.match(f.name)]
+        if files is None:
+            files = self.iter_files(glob, path, respect_ignore=respect_ignore)
+        
+        def scan(file_path: Path) -> List[ContentMatch]:
+            return grep_file(file_path, regex, context, remaining)
+        
+        results = _map_unordered(scan, files, threads)
+        try:
+            for _, matches in results:
+                if remaining is not None:
+                    matches = matches[:remaining]
+                    remaining -= len(matches)
+                yield from matches
+                if remaining is not None and remaining <= 0:
+                    return
+        finally:
+            results.close()
+    
+    def iter_files(self, pattern: str = "*", path: str = ".", respect_ignore: bool = True) -> Iterator[Path]:
+        """Yield files whose name (or relative path, if ``pattern`` has a '/') matches.
+        
+        Files are yielded as the parallel walker finds them, in no fixed order.
+        """
+        full_path = self._resolve_dir(path)
+        match_path = "/" in pattern
+        regex = re.compile(fnmatch.translate(pattern))
+        root = str(full_path) + os.sep
+        
+        if respect_ignore and self.index is not None and self.index.covers(full_path):
+            yield from self.index.files(full_path, regex, match_path)
+            return
+        
+        for item in self.walk(path, respect_ignore=respect_ignore):
+            entry = item.entry
+            if match_path:
+                name = entry.path[len(root):].replace(os.sep, "/")
+            else:
+                name = entry.name
+            if regex.match(name) and entry.is_file():
+                yield Path(entry.path)
     
     def diff_files(self, file1: str, file2: str) -> str:
         """Generate diff between two files."""
+        return '\n'.join(self.iter_diff(file1, file2))
+    
+    def iter_diff(self,
+                  file1: str,
+                  file2: str,
+                  algorithm: str = diff.DEFAULT_ALGORITHM,
+                  context: int = 3) -> Iterator[str]:
+        """Stream a unified diff between two files, line by line.
+        
+        Files with the same content hash are reported as identical (nothing
+        is yielded) without any line-level work.
+        
+        Args:
+            file1: Original file.
+            file2: Changed file.
+            algorithm: Diff backend, one of ``diff.ALGORITHMS``.
+            context: Unchanged lines shown around each change.
+        """
+        path1, path2 = self._diff_paths(file1, file2)
+        if self.same_content(path1, path2):
+            return
+        
+        yield from diff.unified_diff(
+            diff.split_lines(path1.read_bytes()),
+            diff.split_lines(path2.read_bytes()),
+            fromfile=str(path1),
+            tofile=str(path2),
+            context=context,
+            algorithm=algorithm
+        )
+    
+    def diff_stat(self, file1: str, file2: str, algorithm: str = diff.DEFAULT_ALGORITHM) -> Dict[str, int]:
+        """Count the lines inserted and deleted between two files."""
+        path1, path2 = self._diff_paths(file1, file2)
+        if self.same_content(path1, path2):
+            return {"insertions": 0, "deletions": 0}
+        return diff.diff_stat(diff.split_lines(path1.read_bytes()), diff.split_lines(path2.read_bytes()), algorithm)
+    
+    def same_content(self, path1: Path, path2: Path) -> bool:
+        """Compare two files by size and content hash (cached in the index when available)."""
+        if path1.stat().st_size != path2.stat().st_size:
+            return False
+        if path1.samefile(path2):
+            return True
+        
+        def digest(path: Path) -> Optional[str]:
+            if self.index:
+                cached = self.index.summary(path).get("hash")
+                if cached:
+                    return cached
+            return hash_file(path)
+        
+        first = digest(path1)
+        return first is not None and first == digest(path2)
+    
+    def _diff_paths(self, file1: str, file2: str) -> Tuple[Path, Path]:
         path1 = self._resolve_path(file1)
         path2 = self._resolve_path(file2)
         
         if not path1.exists() or not path2.exists():
             raise FileNotFoundError("One or both files not found")
+        return path1, path2
+    
+    def _resolve_dir(self, path: str) -> Path:
+        """Resolve a path that must be an existing directory."""
+        full_path = self._resolve_path(path)
         
-        content1 = path1.read_text(encoding='utf-8').splitlines()
-        content2 = path2.read_text(encoding='utf-8').splitlines()
+        if not full_path.exists():
+            raise FileNotFoundError(f"Path not found: {path}")
         
-        diff = difflib.unified_diff(
-            content1, content2,
-            fromfile=str(path1),
-            tofile=str(path2),
-            lineterm=''
-        )
+        if not full_path.is_dir():
+            raise NotADirectoryError(f"Not a directory: {path}")
         
-        return '\n'.join(diff)
+        return full_path
     
     def _resolve_path(self, path: str) -> Path:
         """Resolve a path relative to workspace."""
@@ -0,0 +1,664 @@
+"""Persistent workspace file index for FORGE."""
+
+import os
+import re
+import sqlite3
+from array import array
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterator, Tuple, Set
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from forge.core.filesystem import (
+    ALWAYS_IGNORED, BINARY_SNIFF_SIZE, IGNORE_FILES, FileEntry, IgnoreRules, _map_unordered, hash_file
+)
+
+# Location of the index inside a workspace
+INDEX_DIR = Path(".forge") / "index"
+
+# Bump when the schema changes; older indexes are rebuilt
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    hash TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    ids BLOB NOT NULL,
+    PRIMARY KEY (trigram, segment)
+) WITHOUT ROWID;
+"""
+
+TABLES = ("dirs", "entries", "meta", "docs", "postings")
+
+
+def _subtree(rel: str) -> Tuple[str, str]:
+    """Bounds of the paths strictly below ``rel`` ('0' sorts right after '/')."""
+    return rel + "/", rel + "0"
+
+
+class WorkspaceIndex:
+    """SQLite index of every non-ignored file and directory in a workspace.
+    
+    Entries record size, mtime, inode and (lazily) a content hash. A refresh
+    only lists directories whose signature changed - their own mtime or that
+    of their ignore files - so adding, removing or renaming files costs one
+    directory rescan, while untouched directories cost a single stat. A file
+    rewritten in place does not change its directory's mtime; such entries
+    are corrected when looked up and on ``refresh(verify=True)``. The
+    workspace's own ``.forge`` directory is never indexed.
+    """
+    
+    def __init__(self, workspace: Optional[Path] = None, path: Optional[Path] = None):
+        """Open (creating if needed) the index of a workspace.
+        
+        Args:
+            workspace: Directory to index (defaults to the current directory).
+            path: Database file (defaults to .forge/index/files.db in the workspace).
+        """
+        self.workspace = (workspace or Path.cwd()).resolve()
+        self.path = path or self.workspace / INDEX_DIR / "files.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=10)
+        self._fresh = False
+        
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._db.executescript(
+                "".join(f"DROP TABLE IF EXISTS {table};" for table in TABLES)
+                + f"PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        self._db.executescript(SCHEMA)
+    
+    def close(self) -> None:
+        self._db.close()
+    
+    def __enter__(self) -> "WorkspaceIndex":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
+    def refresh(self, verify: bool = False, hashes: bool = False, threads: int = 8) -> Dict[str, int]:
+        """Bring the index up to date with the workspace.
+        
+        Args:
+            verify: Also re-stat files in unchanged directories, catching
+                files rewritten in place.
+            hashes: Compute missing content hashes.
+            threads: Files hashed concurrently.
+        
+        Returns:
+            Counts of directories seen and rescanned, and of entries added,
+            updated and removed.
+        """
+        stats = {"dirs": 0, "rescanned": 0, "added": 0, "updated": 0, "removed": 0}
+        with self._db:
+            known = dict(self._db.execute("SELECT path, signature FROM dirs"))
+            visited = set()
+            stack = [("", IgnoreRules.for_root(self.workspace), False)]
+            
+            while stack:
+                rel, rules, force = stack.pop()
+                directory = self._absolute(rel)
+                if rel:
+                    rules = IgnoreRules.for_directory(directory, rules)
+                signature = self._signature(directory)
+                if signature is None:
+                    continue
+                
+                visited.add(rel)
+                stats["dirs"] += 1
+                previous = known.get(rel)
+                if force or previous != signature:
+                    stats["rescanned"] += 1
+                    children = self._rescan(rel, directory, rules, stats)
+                    self._db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (rel, signature))
+                    # Changed ignore files can include or exclude anything below
+                    force = force or (previous is not None
+                                      and previous.split(":", 1)[1] != signature.split(":", 1)[1])
+                else:
+                    if verify:
+                        self._verify(rel, stats)
+                    children = [row[0] for row in self._db.execute(
+                        "SELECT path FROM entries WHERE parent = ? AND kind = 'd'", (rel,)
+                    )]
+                
+                for child in children:
+                    stack.append((child, rules, force))
+            
+            self._db.executemany("DELETE FROM dirs WHERE path = ?", [(rel,) for rel in set(known) - visited])
+        
+        if hashes:
+            self._hash_missing(threads)
+        self._fresh = True
+        return stats
+    
+    def covers(self, path: Path) -> bool:
+        """Check whether ``path`` is an indexed directory of this workspace."""
+        rel = self._relative(path)
+        if rel is None:
+            return False
+        self._ensure_fresh()
+        if rel == "":
+            return True
+        row = self._db.execute("SELECT kind FROM entries WHERE path = ?", (rel,)).fetchone()
+        return row is not None and row[0] == "d"
+    
+    def entries(self, path: Path, show_hidden: bool = True) -> Iterator[FileEntry]:
+        """Yield every indexed entry below directory ``path``, in path order."""
+        self._ensure_fresh()
+        rel = self._relative(path)
+        for entry_rel, kind, size, mtime_ns in self._below(rel, "path, kind, size, mtime_ns"):
+            if not show_hidden and self._hidden(entry_rel, rel):
+                continue
+            yield FileEntry(self.workspace / entry_rel, kind == "d", size, mtime_ns / 1e9)
+    
+    def children(self, path: Path, show_hidden: bool = True) -> List[FileEntry]:
+        """Entries directly inside directory ``path``, directories first, then by name."""
+        self._ensure_fresh()
+        rel = self._relative(path)
+        rows = self._db.execute(
+            "SELECT path, name, kind, size, mtime_ns FROM entries WHERE parent = ? ORDER BY kind != 'd', name",
+            (rel,)
+        )
+        return [
+            FileEntry(self.workspace / entry_rel, kind == "d", size, mtime_ns / 1e9)
+            for entry_rel, name, kind, size, mtime_ns in rows
+            if show_hidden or not name.startswith(".")
+        ]
+    
+    def files(self, path: Path, regex: "re.Pattern[str]", match_path: bool = False) -> Iterator[Path]:
+        """Yield indexed files below ``path`` whose name (or relative path) matches."""
+        self._ensure_fresh()
+        rel = self._relative(path)
+        prefix = len(rel) + 1 if rel else 0
+        for entry_rel, name in self._below(rel, "path, name", "AND kind = 'f'"):
+            if regex.match(entry_rel[prefix:] if match_path else name):
+                yield self.workspace / entry_rel
+    
+    def summary(self, path: Path) -> Dict[str, Any]:
+        """Index-backed details for ``get_file_info``.
+        
+        Files get their content hash (computed and stored if missing or
+        stale); directories get the number and total size of the files
+        below them. Paths outside the index get nothing.
+        """
+        rel = self._relative(path)
+        if rel is None:
+            return {}
+        
+        if path.is_dir():
+            if not self.covers(path):
+                return {}
+            count, total = self._db.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE kind = 'f' AND {self._below_clause(rel)}",
+                self._below_args(rel)
+            ).fetchone()
+            return {"files": count, "total_size": total}
+        
+        try:
+            stat = path.stat()
+        except OSError:
+            return {}
+        row = self._db.execute(
+            "SELECT size, mtime_ns, inode, hash FROM entries WHERE path = ?", (rel,)
+        ).fetchone()
+        if row and row[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_ino) and row[3]:
+            return {"hash": row[3]}
+        
+        digest = hash_file(path)
+        if row:
+            with self._db:
+                self._db.execute(
+                    "UPDATE entries SET size = ?, mtime_ns = ?, inode = ?, hash = ? WHERE path = ?",
+                    (stat.st_size, stat.st_mtime_ns, stat.st_ino, digest, rel)
+                )
+        return {"hash": digest} if digest else {}
+    
+    def _ensure_fresh(self) -> None:
+        if not self._fresh:
+            self.refresh()
+    
+    def _absolute(self, rel: str) -> str:
+        return os.path.join(str(self.workspace), *rel.split("/")) if rel else str(self.workspace)
+    
+    def _relative(self, path: Path) -> Optional[str]:
+        """Workspace-relative '/' path, or None if ``path`` is not indexable."""
+        path = Path(path).resolve()
+        if path == self.workspace:
+            return ""
+        try:
+            rel = path.relative_to(self.workspace).as_posix()
+        except ValueError:
+            return None
+        return None if rel.split("/", 1)[0] == INDEX_DIR.parts[0] else rel
+    
+    @staticmethod
+    def _hidden(entry_rel: str, root_rel: str) -> bool:
+        below = entry_rel[len(root_rel) + 1:] if root_rel else entry_rel
+        return any(part.startswith(".") for part in below.split("/"))
+    
+    @staticmethod
+    def _below_clause(rel: str) -> str:
+        return "path > ? AND path < ?" if rel else "1 = 1"
+    
+    @staticmethod
+    def _below_args(rel: str) -> tuple:
+        return _subtree(rel) if rel else ()
+    
+    def _below(self, rel: str, columns: str, extra: str = "") -> List[tuple]:
+        return self._db.execute(
+            f"SELECT {columns} FROM entries WHERE {self._below_clause(rel)} {extra} ORDER BY path",
+            self._below_args(rel)
+        ).fetchall()
+    
+    @staticmethod
+    def _signature(directory: str) -> Optional[str]:
+        """Directory mtime plus the state of its ignore files."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        
+        parts = []
+        for name in IGNORE_FILES:
+            try:
+                stat = os.stat(os.path.join(directory, name))
+                parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+            except OSError:
+                parts.append("-")
+        return f"{mtime}:{','.join(parts)}"
+    
+    @staticmethod
+    def _stat(entry: os.DirEntry) -> Tuple[str, os.stat_result]:
+        is_dir = entry.is_dir(follow_symlinks=False)
+        try:
+            stat = entry.stat()
+        except OSError:
+            stat = entry.stat(follow_symlinks=False)
+        if is_dir:
+            return "d", stat
+        return ("f" if entry.is_file() else "o"), stat
+    
+    def _rescan(self, rel: str, directory: str, rules: Optional[IgnoreRules], stats: Dict[str, int]) -> List[str]:
+        """Re-list one directory, updating its entries and returning its subdirectories."""
+        previous = {
+            row[0]: row[1:] for row in self._db.execute(
+                "SELECT name, kind, size, mtime_ns, inode FROM entries WHERE parent = ?", (rel,)
+            )
+        }
+        
+        rows = []
+        seen = set()
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if is_dir and entry.name in ALWAYS_IGNORED:
+                        continue
+                    if not rel and entry.name == INDEX_DIR.parts[0]:
+                        continue
+                    if rules is not None and rules.ignored(entry.path, is_dir):
+                        continue
+                    try:
+                        kind, stat = self._stat(entry)
+                    except OSError:
+                        continue
+                    
+                    entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                    seen.add(entry.name)
+                    if kind == "d":
+                        subdirs.append(entry_rel)
+                    size = 0 if kind == "d" else stat.st_size
+                    current = (kind, size, stat.st_mtime_ns, stat.st_ino)
+                    old = previous.get(entry.name)
+                    if old == current:
+                        continue
+                    stats["updated" if old else "added"] += 1
+                    rows.append((entry_rel, rel, entry.name) + current)
+        except OSError:
+            pass
+        
+        self._db.executemany(
+            "INSERT OR REPLACE INTO entries (path, parent, name, kind, size, mtime_ns, inode, hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+            rows
+        )
+        for name, (kind, *_) in previous.items():
+            if name in seen:
+                continue
+            stats["removed"] += 1
+            entry_rel = f"{rel}/{name}" if rel else name
+            self._db.execute("DELETE FROM entries WHERE path = ?", (entry_rel,))
+            if kind == "d":
+                self._db.execute("DELETE FROM entries WHERE path > ? AND path < ?", _subtree(entry_rel))
+                self._db.execute("DELETE FROM dirs WHERE path = ? OR (path > ? AND path < ?)",
+                                 (entry_rel,) + _subtree(entry_rel))
+        return subdirs
+    
+    def _verify(self, rel: str, stats: Dict[str, int]) -> None:
+        """Re-stat the files of an unchanged directory."""
+        rows = self._db.execute(
+            "SELECT path, size, mtime_ns, inode FROM entries WHERE parent = ? AND kind = 'f'", (rel,)
+        ).fetchall()
+        for entry_rel, *old in rows:
+            try:
+                stat = os.stat(self._absolute(entry_rel))
+            except OSError:
+                continue
+            current = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+            if current != old:
+                stats["updated"] += 1
+                self._db.execute(
+                    "UPDATE entries SET size = ?, mtime_ns = ?, inode = ?, hash = NULL WHERE path = ?",
+                    current + [entry_rel]
+                )
+    
+    def _hash_missing(self, threads: int) -> None:
+        missing = [row[0] for row in self._db.execute("SELECT path FROM entries WHERE kind = 'f' AND hash IS NULL")]
+        results = _map_unordered(lambda rel: hash_file(Path(self._absolute(rel))), missing, threads)
+        with self._db:
+            self._db.executemany(
+                "UPDATE entries SET hash = ? WHERE path = ?",
+                [(digest, rel) for rel, digest in results if digest]
+            )
+
+
+# Files larger than this are not split into trigrams; they are always scanned
+MAX_TRIGRAM_FILE_SIZE = 4 * 1024 * 1024
+
+# Posting segments kept before they are merged into one
+MAX_SEGMENTS = 8
+
+_REPEAT_OPS = tuple(
+    getattr(sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+_ATOMIC_GROUP = getattr(sre_constants, "ATOMIC_GROUP", object())
+
+
+def extract_trigrams(data: bytes) -> Set[int]:
+    """Distinct case-folded byte trigrams of ``data``, packed into 24-bit ints."""
+    data = data.lower()
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def _file_trigrams(path: str, max_size: int) -> Tuple[str, Set[int]]:
+    """Classify a file as text/large/binary and extract its trigrams if text."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(BINARY_SNIFF_SIZE)
+            if b"\0" in head:
+                return "binary", set()
+            if os.fstat(f.fileno()).st_size > max_size:
+                return "large", set()
+            return "text", extract_trigrams(head + f.read())
+    except OSError:
+        return "binary", set()
+
+
+def _literal_trigrams(text: str, ignore_case: bool) -> Optional[Set[int]]:
+    """Trigrams a literal requires, or None if it cannot narrow the search."""
+    # The index folds ASCII case only, so other letters can't be looked up case-insensitively
+    if ignore_case and not text.isascii():
+        return None
+    data = text.encode("utf-8")
+    if len(data) < 3:
+        return None
+    return extract_trigrams(data)
+
+
+def plan_query(pattern: str, literal: bool = False, ignore_case: bool = False) -> Optional[tuple]:
+    """Reduce a search pattern to the trigrams any match must contain.
+    
+    Returns a tree of ``("and", [...])``, ``("or", [...])`` and
+    ``("grams", set)`` nodes, or None when nothing can be required (for
+    example ``.*`` or a pattern with only short literals).
+    """
+    if literal:
+        grams = _literal_trigrams(pattern, ignore_case)
+        return ("grams", grams) if grams else None
+    
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE if ignore_case else 0)
+    except Exception:
+        return None
+    ignore_case = ignore_case or bool(parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE)
+    return _plan_sequence(parsed, ignore_case)
+
+
+def _plan_sequence(items, ignore_case: bool) -> Optional[tuple]:
+    parts = []
+    run: List[str] = []
+    
+    def flush():
+        if run:
+            grams = _literal_trigrams("".join(run), ignore_case)
+            if grams:
+                parts.append(("grams", grams))
+            run.clear()
+    
+    for op, value in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(value))
+            continue
+        flush()
+        child = None
+        if op is sre_constants.SUBPATTERN:
+            group_ignore_case = ignore_case or bool(value[1] & sre_constants.SRE_FLAG_IGNORECASE)
+            child = _plan_sequence(value[-1], group_ignore_case)
+        elif op is sre_constants.BRANCH:
+            branches = [_plan_sequence(branch, ignore_case) for branch in value[1]]
+            if all(branches):
+                child = ("or", branches)
+        elif op in _REPEAT_OPS:
+            if value[0] >= 1:
+                child = _plan_sequence(value[2], ignore_case)
+        elif op is _ATOMIC_GROUP:
+            child = _plan_sequence(value, ignore_case)
+        if child:
+            parts.append(child)
+    flush()
+    
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ("and", parts)
+
+
+class TrigramIndex:
+    """Trigram posting lists over the files of a ``WorkspaceIndex``.
+    
+    Each file is split into case-folded byte trigrams; a query is reduced to
+    the trigrams any match must contain, and only files holding all of them
+    are scanned. Postings are written in append-only segments: changed files
+    get a new document id in a new segment, stale ids simply stop resolving,
+    and segments are merged (dropping stale ids) once there are more than
+    ``max_segments``. The index is opt-in; it is only consulted after the
+    first ``update()``.
+    """
+    
+    def __init__(self,
+                 index: WorkspaceIndex,
+                 max_file_size: int = MAX_TRIGRAM_FILE_SIZE,
+                 max_segments: int = MAX_SEGMENTS):
+        """Initialize trigram index.
+        
+        Args:
+            index: Workspace index whose files are indexed (and whose database is used).
+            max_file_size: Larger files are not indexed and are always scanned.
+            max_segments: Segments kept before merging.
+        """
+        self.index = index
+        self.max_file_size = max_file_size
+        self.max_segments = max_segments
+        self._db = index._db
+        self._updated = False
+    
+    @property
+    def enabled(self) -> bool:
+        return self._db.execute("SELECT 1 FROM meta WHERE key = 'trigrams'").fetchone() is not None
+    
+    def update(self, threads: int = 8) -> Dict[str, int]:
+        """Index new and changed files and retire removed ones.
+        
+        The workspace index is refreshed with ``verify=True`` first, so files
+        rewritten in place are picked up too.
+        
+        Returns:
+            Counts of files indexed and removed, and the number of segments.
+        """
+        self.index.refresh(verify=True)
+        changed = self._db.execute(
+            "SELECT e.path, e.size, e.mtime_ns, e.inode FROM entries e "
+            "LEFT JOIN docs d ON d.path = e.path WHERE e.kind = 'f' AND ("
+            "d.path IS NULL OR d.size != e.size OR d.mtime_ns != e.mtime_ns OR d.inode != e.inode)"
+        ).fetchall()
+        
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('trigrams', '1')")
+            removed = self._db.execute(
+                "DELETE FROM docs WHERE path NOT IN (SELECT path FROM entries WHERE kind = 'f')"
+            ).rowcount
+            self._db.executemany("DELETE FROM docs WHERE path = ?", [(row[0],) for row in changed])
+            
+            postings: Dict[int, array] = {}
+            metadata = {row[0]: row[1:] for row in changed}
+            extract = lambda rel: _file_trigrams(self.index._absolute(rel), self.max_file_size)
+            for rel, (status, grams) in _map_unordered(extract, list(metadata), threads):
+                doc_id = self._db.execute(
+                    "INSERT INTO docs (path, size, mtime_ns, inode, status) VALUES (?, ?, ?, ?, ?)",
+                    (rel,) + tuple(metadata[rel]) + (status,)
+                ).lastrowid
+                for gram in grams:
+                    ids = postings.get(gram)
+                    if ids is None:
+                        ids = postings[gram] = array("I")
+                    ids.append(doc_id)
+            
+            if postings:
+                segment = self._db.execute("SELECT COALESCE(MAX(segment), -1) + 1 FROM postings").fetchone()[0]
+                self._db.executemany(
+                    "INSERT INTO postings (trigram, segment, ids) VALUES (?, ?, ?)",
+                    ((gram, segment, ids.tobytes()) for gram, ids in postings.items())
+                )
+            
+            segments = self._db.execute("SELECT COUNT(DISTINCT segment) FROM postings").fetchone()[0]
+            if segments > self.max_segments:
+                self._compact()
+                segments = 1
+        
+        self._updated = True
+        return {"indexed": len(changed), "removed": removed, "segments": segments}
+    
+    def candidates(self,
+                   pattern: str,
+                   path: Path,
+                   literal: bool = False,
+                   ignore_case: bool = False) -> Optional[List[Path]]:
+        """Files below ``path`` that may match, or None if the index can't answer.
+        
+        The index is brought up to date first (once per instance). Binary
+        files are never candidates; files too large to index always are.
+        """
+        if not self.enabled or not self.index.covers(path):
+            return None
+        if not self._updated:
+            self.update()
+        
+        rel = self.index._relative(path)
+        low, high = _subtree(rel) if rel else ("", "\U0010ffff")
+        docs = self._db.execute(
+            "SELECT id, path, status FROM docs WHERE path > ? AND path < ? AND status != 'binary'",
+            (low, high)
+        ).fetchall()
+        
+        plan = plan_query(pattern, literal, ignore_case)
+        if plan is None:
+            return [self.index.workspace / doc_path for _, doc_path, _ in docs]
+        
+        matching = self._evaluate(plan, {})
+        return [
+            self.index.workspace / doc_path
+            for doc_id, doc_path, status in docs
+            if status == "large" or doc_id in matching
+        ]
+    
+    def _postings(self, gram: int, cache: Dict[int, Set[int]]) -> Set[int]:
+        ids = cache.get(gram)
+        if ids is None:
+            ids = set()
+            for (blob,) in self._db.execute("SELECT ids FROM postings WHERE trigram = ?", (gram,)):
+                chunk = array("I")
+                chunk.frombytes(blob)
+                ids.update(chunk)
+            cache[gram] = ids
+        return ids
+    
+    def _evaluate(self, node: tuple, cache: Dict[int, Set[int]]) -> Set[int]:
+        kind, value = node
+        if kind == "grams":
+            # Rarest trigrams first keeps the running intersection small
+            lists = sorted((self._postings(gram, cache) for gram in value), key=len)
+            result = set(lists[0])
+            for ids in lists[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result
+        if kind == "and":
+            results = sorted((self._evaluate(child, cache) for child in value), key=len)
+            return set.intersection(*results)
+        return set().union(*(self._evaluate(child, cache) for child in value))
+    
+    def _compact(self) -> None:
+        """Merge all segments into one, dropping ids of removed or changed files."""
+        live = {row[0] for row in self._db.execute("SELECT id FROM docs")}
+        segment = self._db.execute("SELECT MAX(segment) + 1 FROM postings").fetchone()[0]
+        
+        merged = []
+        current, ids = None, array("I")
+        for gram, blob in self._db.execute("SELECT trigram, ids FROM postings ORDER BY trigram"):
+            if gram != current:
+                if ids:
+                    merged.append((current, segment, ids.tobytes()))
+                current, ids = gram, array("I")
+            chunk = array("I")
+            chunk.frombytes(blob)
+            ids.extend(doc_id for doc_id in chunk if doc_id in live)
+        if ids:
+            merged.append((current, segment, ids.tobytes()))
+        
+        self._db.execute("DELETE FROM postings")
+        self._db.executemany("INSERT INTO postings (trigram, segment, ids) VALUES (?, ?, ?)", merged)
@@ -1,44 +1,343 @@
 """DeepSeek API client with streaming support."""
 
+import asyncio
+import atexit
+import hashlib
+import importlib.util
+import json
 import os
-from typing import List, Dict, Any, Generator
-from openai import OpenAI
+import random
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Generator, Iterator, NamedTuple, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APIStatusError, DefaultHttpxClient
+
+try:
+    import httpx
+except ImportError:  # openai builds on the httpx2 fork
+    import httpx2 as httpx
+
+from forge.config import Config, get_config
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+
+# Request defaults when the config does not set them
+DEFAULT_MODEL = "deepseek-chat"
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 4096
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Rough characters per token, for budgeting requests before they are sent
+CHARS_PER_TOKEN = 4
+
+# Set to 1 to reuse responses to identical requests (see ResponseCache)
+CACHE_ENV = "FORGE_LLM_CACHE"
+
+# Bump when the schema changes; older caches are dropped
+CACHE_SCHEMA_VERSION = 1
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    pieces TEXT NOT NULL,
+    finish_reason TEXT,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class DeepSeekError(Exception):
+    """A failed DeepSeek API request (``status_code`` is None for connection errors)."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CachedResponse:
+    """A completion as stored in the cache: its streamed text pieces."""
+    
+    def __init__(self, model: str, pieces: List[str], finish_reason: Optional[str] = "stop"):
+        self.model = model
+        self.pieces = pieces
+        self.finish_reason = finish_reason
+    
+    @property
+    def text(self) -> str:
+        return "".join(self.pieces)
+    
+    def chunks(self, key: str) -> Iterator[ChatCompletionChunk]:
+        """Replay the response as the chunks of a streamed completion."""
+        created = int(time.time())
+        
+        def chunk(delta: ChoiceDelta, finish_reason: Optional[str] = None) -> ChatCompletionChunk:
+            return ChatCompletionChunk.model_construct(
+                id=f"cache-{key[:24]}",
+                object="chat.completion.chunk",
+                created=created,
+                model=self.model,
+                choices=[Choice.model_construct(index=0, delta=delta, finish_reason=finish_reason, logprobs=None)],
+            )
+        
+        yield chunk(ChoiceDelta.model_construct(role="assistant", content=""))
+        for piece in self.pieces:
+            yield chunk(ChoiceDelta.model_construct(content=piece))
+        yield chunk(ChoiceDelta.model_construct(), self.finish_reason)
+
+
+class ResponseCache:
+    """Persistent cache of chat completions, in SQLite.
+    
+    Entries are keyed on the model, messages, temperature and max_tokens of
+    a request and shared between ``chat`` and ``stream_chat``: a streamed
+    response is stored piece by piece and replayed as a chunk stream. Entries
+    expire after ``ttl`` seconds, and the least recently used ones are
+    evicted once the stored text exceeds ``max_bytes``.
+    """
+    
+    def __init__(self,
+                 path: Optional[Path] = None,
+                 ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """Open (creating if needed) the cache.
+        
+        Args:
+            path: Database file (defaults to ~/.forge/cache/llm/responses.db).
+            ttl: Seconds an entry stays valid.
+            max_bytes: Total size of cached responses to keep.
+        """
+        self.path = path or Path.home() / ".forge" / "cache" / "llm" / "responses.db"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Map calls of a chunked question store from worker threads
+        self._db = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA_VERSION:
+            self._db.executescript(
+                f"DROP TABLE IF EXISTS responses; PRAGMA user_version = {CACHE_SCHEMA_VERSION};"
+            )
+        self._db.executescript(CACHE_SCHEMA)
+    
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """The default cache if ``FORGE_LLM_CACHE`` enables it, else None."""
+        if os.getenv(CACHE_ENV, "").strip().lower() not in ("1", "true", "yes", "on"):
+            return None
+        try:
+            return cls()
+        except (OSError, sqlite3.Error):
+            return None
+    
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """Hash everything that affects the response."""
+        request = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the unexpired response for ``key``, marking it as recently used."""
+        now = time.time()
+        try:
+            with self._lock, self._db:
+                row = self._db.execute(
+                    "SELECT model, pieces, finish_reason, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[3] < now - self.ttl:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            return None
+        return CachedResponse(row[0], json.loads(row[1]), row[2])
+    
+    def put(self, key: str, response: CachedResponse) -> None:
+        """Store a response and enforce the TTL and size limit."""
+        now = time.time()
+        pieces = json.dumps(response.pieces)
+        try:
+            with self._lock, self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, response.model, pieces, response.finish_reason, len(pieces), now, now)
+                )
+                self._evict(now)
+        except sqlite3.Error:
+            # The cache is an optimisation; never fail a request because of it
+            pass
+    
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+    
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+    
+    def close(self) -> None:
+        self._db.close()
+
+
+class HTTPSettings(NamedTuple):
+    """Connection settings of a shared HTTP client (``deepseek.*`` config keys)."""
+    timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    
+    @classmethod
+    def from_config(cls, config: Config) -> "HTTPSettings":
+        values = []
+        for name, default in cls._field_defaults.items():
+            value = config.get(f"deepseek.{name}", default)
+            # `forge config set` stores strings
+            if isinstance(default, bool) and isinstance(value, str):
+                value = value.strip().lower() in ("1", "true", "yes", "on")
+            values.append(type(default)(value))
+        return cls(*values)
+
+
+_registry_lock = threading.Lock()
+_http_clients: Dict[HTTPSettings, "httpx.Client"] = {}
+_clients: Dict[Tuple[str, str, HTTPSettings], "DeepSeekClient"] = {}
+
+
+def http_client(settings: HTTPSettings) -> "httpx.Client":
+    """The process-wide keep-alive HTTP client for ``settings``.
+    
+    Every ``DeepSeekClient`` with the same settings shares its connection
+    pool, so a session pays for TCP and TLS setup once per connection
+    rather than once per client.
+    """
+    with _registry_lock:
+        client = _http_clients.get(settings)
+        if client is None or client.is_closed:
+            client = _http_clients[settings] = DefaultHttpxClient(
+                http2=settings.http2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=settings.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+            )
+        return client
+
+
+def get_client(api_key: str = None, config: Optional[Config] = None) -> "DeepSeekClient":
+    """The process-wide ``DeepSeekClient`` for an API key and the configured endpoint.
+    
+    Args:
+        api_key: DeepSeek API key. If None, taken from DEEPSEEK_API_KEY or the config.
+        config: Configuration to read ``deepseek.*`` settings from (defaults to the global one).
+    
+    Raises:
+        ValueError: No API key is available.
+    """
+    config = config or get_config()
+    api_key = api_key or config.get_deepseek_api_key()
+    key = (api_key, config.get("deepseek.base_url") or DEEPSEEK_BASE_URL, HTTPSettings.from_config(config))
+    with _registry_lock:
+        client = _clients.get(key)
+    if client is None:
+        client = DeepSeekClient(api_key, config=config)
+        with _registry_lock:
+            client = _clients.setdefault(key, client)
+    return client
+
+
+@atexit.register
+def close_clients() -> None:
+    """Close every shared HTTP client and forget the shared ``DeepSeekClient``s."""
+    with _registry_lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        _clients.clear()
 
 
 class DeepSeekClient:
     """Client for interacting with DeepSeek API."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self,
+                 api_key: str = None,
+                 cache: Optional[ResponseCache] = None,
+                 config: Optional[Config] = None):
         """Initialize the DeepSeek client.
         
+        Prefer ``get_client()``, which reuses one client per process.
+        
         Args:
-            api_key: DeepSeek API key. If None, reads from DEEPSEEK_API_KEY env var.
+            api_key: DeepSeek API key. If None, reads from DEEPSEEK_API_KEY env var
+                or the config.
+            cache: Response cache to reuse identical requests from. If None,
+                ``~/.forge/cache/llm`` is used when FORGE_LLM_CACHE=1.
+            config: Configuration to read the endpoint, connection settings and
+                request defaults from (defaults to the global one).
         """
-        self.api_key = api_key or os.getenv('DEEPSEEK_API_KEY')
+        self.config = config or get_config()
+        self.api_key = api_key or self.config.get_deepseek_api_key()
         if not self.api_key:
             raise ValueError("DeepSeek API key must be provided or set in DEEPSEEK_API_KEY environment variable")
         
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url="https://api.deepseek.com/v1"
+            base_url=self.config.get("deepseek.base_url") or DEEPSEEK_BASE_URL,
+            http_client=http_client(HTTPSettings.from_config(self.config))
         )
+        self.cache = cache if cache is not None else ResponseCache.from_env()
     
     def stream_chat(self, 
                     messages: List[Dict[str, str]], 
-                    model: str = "deepseek-chat",
-                    temperature: float = 0.7,
-                    max_tokens: int = 4096) -> Generator:
+                    model: Optional[str] = None,
+                    temperature: Optional[float] = None,
+                    max_tokens: Optional[int] = None) -> Generator:
         """Stream a chat completion from DeepSeek.
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
-            model: Model name to use (default: deepseek-chat)
-            temperature: Sampling temperature (0-1)
-            max_tokens: Maximum tokens to generate
+            model: Model name to use (default: deepseek.model, else deepseek-chat)
+            temperature: Sampling temperature (0-1, default: deepseek.temperature)
+            max_tokens: Maximum tokens to generate (default: deepseek.max_tokens)
             
         Yields:
-            Chunks from the streaming response
+            Chunks from the streaming response (replayed from the cache on a hit)
         """
+        model, temperature, max_tokens = request_defaults(self.config, model, temperature, max_tokens)
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.chunks(key)
+        
         try:
             stream = self.client.chat.completions.create(
                 model=model,
@@ -47,26 +346,51 @@ class DeepSeekClient:
                 max_tokens=max_tokens,
                 stream=True
             )
-            return stream
         except Exception as e:
-            raise Exception(f"DeepSeek API error: {e}")
+            raise DeepSeekError(f"DeepSeek API error: {e}", getattr(e, "status_code", None)) from e
+        
+        return self._record(key, model, stream) if key else stream
+    
+    def _record(self, key: str, model: str, stream) -> Iterator[ChatCompletionChunk]:
+        """Pass a stream through, caching it once it has been read to the end."""
+        pieces = []
+        finish_reason = None
+        for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    pieces.append(choice.delta.content)
+                finish_reason = choice.finish_reason or finish_reason
+            yield chunk
+        
+        # Streams abandoned or broken off early are not worth replaying
+        if finish_reason in ("stop", "length"):
+            self.cache.put(key, CachedResponse(model, pieces, finish_reason))
     
     def chat(self, 
              messages: List[Dict[str, str]], 
-             model: str = "deepseek-chat",
-             temperature: float = 0.7,
-             max_tokens: int = 4096) -> str:
+             model: Optional[str] = None,
+             temperature: Optional[float] = None,
+             max_tokens: Optional[int] = None) -> str:
         """Non-streaming chat completion.
         
         Args:
             messages: List of message dictionaries
-            model: Model name to use
-            temperature: Sampling temperature
-            max_tokens: Maximum tokens to generate
+            model: Model name to use (default: deepseek.model)
+            temperature: Sampling temperature (default: deepseek.temperature)
+            max_tokens: Maximum tokens to generate (default: deepseek.max_tokens)
             
         Returns:
             The model's response text
         """
+        model, temperature, max_tokens = request_defaults(self.config, model, temperature, max_tokens)
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.text
+        
         try:
             response = self.client.chat.completions.create(
                 model=model,
@@ -75,6 +399,249 @@ class DeepSeekClient:
                 max_tokens=max_tokens,
                 stream=False
             )
-            return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"DeepSeek API error: {e}")
+            raise DeepSeekError(f"DeepSeek API error: {e}", getattr(e, "status_code", None)) from e
+        
+        choice = response.choices[0]
+        if key and choice.message.content is not None:
+            self.cache.put(key, CachedResponse(model, [choice.message.content], choice.finish_reason))
+        return choice.message.content
+
+
+def request_defaults(config: Config,
+                     model: Optional[str],
+                     temperature: Optional[float],
+                     max_tokens: Optional[int]) -> Tuple[str, float, int]:
+    """Fill unset request parameters from the ``deepseek`` config section."""
+    if model is None:
+        model = config.get("deepseek.model") or DEFAULT_MODEL
+    if temperature is None:
+        temperature = float(config.get("deepseek.temperature", DEFAULT_TEMPERATURE))
+    if max_tokens is None:
+        max_tokens = int(config.get("deepseek.max_tokens", DEFAULT_MAX_TOKENS))
+    return model, temperature, max_tokens
+
+
+class TokenBucket:
+    """Rate limit of ``per_minute`` units, with bursts of up to a minute's worth.
+    
+    Reservations are taken immediately and may overdraw the bucket; the
+    caller then waits out the returned delay. Taking the reservation before
+    waiting keeps concurrent callers in arrival order without a lock.
+    """
+    
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+    
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units; returns the seconds to wait before using them."""
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+    
+    def refund(self, amount: float) -> None:
+        """Return units reserved but not used."""
+        self.level = min(self.capacity, self.level + amount)
+
+
+def retry_after(headers) -> Optional[float]:
+    """Seconds a ``Retry-After`` (or ``retry-after-ms``) header asks to wait."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncDeepSeekClient:
+    """Asyncio client for DeepSeek, for running many requests at once.
+    
+    Requests are paced by optional request and token per-minute buckets.
+    Rate-limited (429), server (5xx) and connection errors are retried with
+    jittered exponential backoff, waiting at least as long as the server's
+    ``Retry-After``; other errors raise ``DeepSeekError`` at once.
+    """
+    
+    def __init__(self,
+                 api_key: str = None,
+                 base_url: Optional[str] = None,
+                 max_concurrency: int = 8,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5,
+                 backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 timeout: Optional[float] = None,
+                 cache: Optional[ResponseCache] = None,
+                 config: Optional[Config] = None):
+        """Initialize the async client.
+        
+        Args:
+            api_key: DeepSeek API key. If None, reads from DEEPSEEK_API_KEY env var
+                or the config.
+            base_url: API endpoint (default: deepseek.base_url, else DeepSeek's).
+            max_concurrency: Requests ``batch_chat`` keeps in flight.
+            requests_per_minute: Request rate limit (None for no limit).
+            tokens_per_minute: Token rate limit, counting the prompt (estimated)
+                and ``max_tokens`` until the response reports actual usage.
+            max_retries: Retries of a failing request before giving up.
+            backoff: Base delay of the first retry in seconds.
+            max_backoff: Longest delay between retries.
+            timeout: Timeout of a single attempt in seconds (default: deepseek.timeout).
+            cache: Response cache, as for ``DeepSeekClient``.
+            config: Configuration, as for ``DeepSeekClient``.
+        """
+        self.config = config or get_config()
+        self.api_key = api_key or self.config.get_deepseek_api_key()
+        if not self.api_key:
+            raise ValueError("DeepSeek API key must be provided or set in DEEPSEEK_API_KEY environment variable")
+        
+        settings = HTTPSettings.from_config(self.config)
+        # Retries are ours, so they can share the rate limits
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=base_url or self.config.get("deepseek.base_url") or DEEPSEEK_BASE_URL,
+            max_retries=0,
+            timeout=httpx.Timeout(timeout or settings.timeout, connect=settings.connect_timeout)
+        )
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+    
+    async def __aenter__(self) -> "AsyncDeepSeekClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+    
+    async def close(self) -> None:
+        await self.client.close()
+    
+    async def chat(self,
+                   messages: List[Dict[str, str]],
+                   model: Optional[str] = None,
+                   temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None) -> str:
+        """Non-streaming chat completion, paced and retried.
+        
+        Returns:
+            The model's response text
+        
+        Raises:
+            DeepSeekError: The request failed, or kept failing after retries.
+        """
+        model, temperature, max_tokens = request_defaults(self.config, model, temperature, max_tokens)
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.text
+        
+        budget = sum(len(message.get("content") or "") for message in messages) // CHARS_PER_TOKEN + max_tokens
+        for attempt in range(self.max_retries + 1):
+            await self._pace(budget)
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=False
+                )
+            except (APIStatusError, APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt == self.max_retries:
+                    raise DeepSeekError(f"DeepSeek API error: {e}", status) from e
+                await asyncio.sleep(self._delay(attempt, getattr(e, "response", None)))
+            except Exception as e:
+                raise DeepSeekError(f"DeepSeek API error: {e}") from e
+            else:
+                break
+        
+        if self.tokens and response.usage:
+            self.tokens.refund(max(0, budget - response.usage.total_tokens))
+        choice = response.choices[0]
+        if key and choice.message.content is not None:
+            self.cache.put(key, CachedResponse(model, [choice.message.content], choice.finish_reason))
+        return choice.message.content
+    
+    async def batch_chat(self,
+                         requests: List[List[Dict[str, str]]],
+                         model: Optional[str] = None,
+                         temperature: Optional[float] = None,
+                         max_tokens: Optional[int] = None,
+                         on_done: Optional[Callable[[int, Any], None]] = None,
+                         return_exceptions: bool = False) -> List[Any]:
+        """Run many chat completions concurrently, at most ``max_concurrency`` at a time.
+        
+        Args:
+            requests: The messages of each request.
+            model: Model name to use (default: deepseek.model)
+            temperature: Sampling temperature (default: deepseek.temperature)
+            max_tokens: Maximum tokens to generate per request (default: deepseek.max_tokens)
+            on_done: Called with ``(index, text or error)`` as each request finishes.
+            return_exceptions: Return a request's ``DeepSeekError`` in its place
+                instead of raising the first one.
+        
+        Returns:
+            One response text per request, in the order given.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_one(index: int, messages: List[Dict[str, str]]) -> Any:
+            async with semaphore:
+                try:
+                    result = await self.chat(messages, model, temperature, max_tokens)
+                except DeepSeekError as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+            if on_done:
+                on_done(index, result)
+            return result
+        
+        return await asyncio.gather(*(run_one(index, messages) for index, messages in enumerate(requests)))
+    
+    async def _pace(self, budget: int) -> None:
+        """Wait for room in the rate limits for one request of ``budget`` tokens."""
+        delay = 0.0
+        if self.requests:
+            delay = self.requests.reserve(1)
+        if self.tokens:
+            delay = max(delay, self.tokens.reserve(budget))
+        if delay:
+            await asyncio.sleep(delay)
+    
+    def _delay(self, attempt: int, response) -> float:
+        """Full-jitter exponential backoff, but no shorter than ``Retry-After``."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        requested = retry_after(getattr(response, "headers", None))
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_backoff))
+        return delay
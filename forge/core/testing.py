@@ -16,8 +16,8 @@ class TestGenerator:
     """Generate tests for code using AI."""
     
     def __init__(self):
-        from ..core.llm import DeepSeekClient
-        self.client = DeepSeekClient()
+        from ..core.llm import get_client
+        self.client = get_client()
     
     def analyze_code(self, code: str, language: str) -> Dict[str, Any]:
         """Analyze code to understand its structure for test generation."""
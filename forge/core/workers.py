@@ -0,0 +1,332 @@
+"""Warm interpreter workers for repeated code snippets in FORGE."""
+
+import json
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Generator
+
+from forge.core.executor import OutputCapture, READ_CHUNK_SIZE, _decode, _drain_lines
+
+# Runs each request in a fresh __main__ namespace and reports back over the
+# response fd once stdout/stderr are flushed. Imported modules stay loaded,
+# which is what makes later snippets fast.
+PYTHON_WORKER = r'''
+import builtins, json, os, resource, sys, traceback
+requests = os.fdopen(int(sys.argv[1]), "r", encoding="utf-8")
+responses = os.fdopen(int(sys.argv[2]), "w", encoding="utf-8")
+rss_scale = 1 if sys.platform == "darwin" else 1024
+for message in requests:
+    job = json.loads(message)
+    sys.argv = ["<snippet>"] + job["args"]
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    returncode = 0
+    try:
+        exec(compile(job["code"], "<snippet>", "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            returncode = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException as e:
+        # Hide the worker's own frame from the traceback
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        returncode = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_scale
+    responses.write(json.dumps({"returncode": returncode, "rss": rss}) + "\n")
+    responses.flush()
+'''
+
+# Node equivalent: each snippet runs in a new vm context. A returned promise
+# is awaited; timers still pending afterwards are not.
+NODE_WORKER = r'''
+const fs = require('fs'), vm = require('vm'), readline = require('readline');
+const [requestFd, responseFd] = process.argv.slice(-2).map(Number);
+const requests = readline.createInterface({input: fs.createReadStream(null, {fd: requestFd})});
+const argv = process.argv.slice(0, 1);
+requests.on('line', async (message) => {
+  requests.pause();
+  const job = JSON.parse(message);
+  process.argv = argv.concat(['<snippet>'], job.args);
+  const context = {
+    console, require, process, Buffer, URL, TextEncoder, TextDecoder,
+    setTimeout, setInterval, setImmediate, clearTimeout, clearInterval, clearImmediate,
+    module: {exports: {}}, __filename: '<snippet>', __dirname: process.cwd(),
+  };
+  context.global = context;
+  context.globalThis = context;
+  let returncode = 0;
+  try {
+    const value = vm.runInNewContext(job.code, context, {filename: '<snippet>'});
+    if (value && typeof value.then === 'function') await value;
+  } catch (e) {
+    process.stderr.write(((e && e.stack) || String(e)) + '\n');
+    returncode = 1;
+  }
+  fs.writeSync(responseFd, JSON.stringify({returncode, rss: process.memoryUsage().rss}) + '\n');
+  requests.resume();
+});
+'''
+
+
+class InterpreterWorker:
+    """A pre-started interpreter that runs snippets sent over a private pipe.
+
+    Snippet output travels on the worker's ordinary stdout/stderr pipes, so
+    child processes and C extensions are captured too; completion is
+    signalled separately on a response pipe.
+    """
+
+    COMMANDS = {
+        "python": ["python", "-u", "-c", PYTHON_WORKER],
+        "javascript": ["node", "-e", NODE_WORKER],
+    }
+
+    def __init__(self, language: str, workspace: Optional[Path] = None):
+        """Start a worker.
+
+        Args:
+            language: One of ``COMMANDS``.
+            workspace: Working directory for the worker.
+        """
+        if sys.platform == "win32":
+            raise OSError("Warm interpreter workers require a POSIX platform")
+
+        command = list(self.COMMANDS[language])
+        binary = shutil.which(command[0])
+        if not binary:
+            raise FileNotFoundError(f"{language} not found in PATH")
+
+        request_r, self._request_w = os.pipe()
+        self._response_r, response_w = os.pipe()
+        command[0] = binary
+        command += [str(request_r), str(response_w)]
+
+        self.language = language
+        self._closed = False
+        self.runs = 0
+        self.rss = 0
+        self.process = subprocess.Popen(
+            command,
+            cwd=str(workspace or Path.cwd()),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            pass_fds=(request_r, response_w),
+            start_new_session=True  # Create process group for killing children
+        )
+        os.close(request_r)
+        os.close(response_w)
+
+        for pipe in (self.process.stdout, self.process.stderr):
+            os.set_blocking(pipe.fileno(), False)
+        self._buffers = {"stdout": bytearray(), "stderr": bytearray()}
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self.process.poll() is None
+
+    def run(self,
+            code: str,
+            args: Optional[List[str]] = None,
+            timeout: Optional[float] = None) -> Generator[Dict[str, str], None, Dict[str, Any]]:
+        """Run a snippet, yielding output chunks and returning the result dict."""
+        self.runs += 1
+        request = json.dumps({"code": code, "args": list(args or [])}) + "\n"
+        os.write(self._request_w, request.encode("utf-8"))
+
+        capture = OutputCapture()
+        deadline = time.monotonic() + timeout if timeout else None
+        response = bytearray()
+        selector = selectors.DefaultSelector()
+        selector.register(self.process.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(self.process.stderr, selectors.EVENT_READ, "stderr")
+        selector.register(self._response_r, selectors.EVENT_READ, "response")
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self.close()
+                    raise TimeoutError(f"Snippet timed out after {timeout} seconds")
+
+                done = None
+                for key, _ in selector.select(remaining):
+                    if key.data == "response":
+                        data = os.read(key.fd, READ_CHUNK_SIZE)
+                        if not data:
+                            # The snippet killed the interpreter (os._exit, process.exit)
+                            done = {"returncode": self.process.wait()}
+                            break
+                        response.extend(data)
+                        if b"\n" in response:
+                            done = json.loads(response.split(b"\n", 1)[0])
+                            break
+                    else:
+                        for line in self._read_lines(key.data):
+                            capture.append(key.data, line)
+                            yield {"type": key.data, "line": line}
+
+                if done is not None:
+                    break
+        finally:
+            selector.close()
+
+        # Output written before the response is already in the pipes; collect it
+        for stream_name in ("stdout", "stderr"):
+            lines = self._read_lines(stream_name)
+            buffer = self._buffers[stream_name]
+            if buffer:
+                lines.append(_decode(bytes(buffer)).rstrip())
+                buffer.clear()
+            for line in lines:
+                capture.append(stream_name, line)
+                yield {"type": stream_name, "line": line}
+
+        self.rss = done.get("rss", 0)
+        returncode = done["returncode"]
+        return {
+            "command": f"<{self.language} worker {self.process.pid}>",
+            "stdout": capture.lines("stdout"),
+            "stderr": capture.lines("stderr"),
+            "returncode": returncode,
+            "success": returncode == 0
+        }
+
+    def _read_lines(self, stream_name: str) -> List[str]:
+        """Read whatever is available on a pipe without blocking."""
+        pipe = self.process.stdout if stream_name == "stdout" else self.process.stderr
+        lines = []
+        while True:
+            try:
+                data = os.read(pipe.fileno(), READ_CHUNK_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            lines.extend(_drain_lines(self._buffers[stream_name], data))
+        return lines
+
+    def close(self) -> None:
+        """Stop the worker and its children."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.alive:
+            try:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                self.process.kill()
+            self.process.wait()
+        for fd in (self._request_w, self._response_r):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.process.stdout.close()
+        self.process.stderr.close()
+
+
+class InterpreterPool:
+    """Pool of warm Python and Node interpreters for repeated snippet runs.
+
+    Workers are started ahead of use and replaced as soon as one is retired,
+    so a snippet normally finds an interpreter that has already booted. A
+    worker is retired after ``max_runs`` snippets or once its peak RSS
+    passes ``max_rss_mb``.
+    """
+
+    LANGUAGES = tuple(InterpreterWorker.COMMANDS)
+
+    def __init__(self,
+                 workspace: Optional[Path] = None,
+                 size: int = 2,
+                 max_runs: int = 100,
+                 max_rss_mb: int = 512,
+                 timeout: Optional[float] = None):
+        """Initialize pool.
+
+        Args:
+            workspace: Working directory for workers.
+            size: Idle workers kept ready per language.
+            max_runs: Snippets a worker runs before it is replaced.
+            max_rss_mb: Peak RSS after which a worker is replaced.
+            timeout: Per-snippet timeout in seconds (None for no limit).
+        """
+        self.workspace = workspace or Path.cwd()
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.timeout = timeout
+        self._idle: Dict[str, List[InterpreterWorker]] = {lang: [] for lang in self.LANGUAGES}
+        self._lock = threading.Lock()
+
+    def supports(self, language: str) -> bool:
+        return language in self._idle
+
+    def warm(self, language: str) -> None:
+        """Start workers until ``size`` are idle for ``language``."""
+        with self._lock:
+            idle = self._idle[language]
+            while len(idle) < self.size:
+                idle.append(InterpreterWorker(language, self.workspace))
+
+    def run(self,
+            code: str,
+            language: str,
+            args: Optional[List[str]] = None) -> Generator[Dict[str, str], None, Dict[str, Any]]:
+        """Run a snippet on a warm worker, yielding chunks and returning the result dict."""
+        worker = self._checkout(language)
+        try:
+            result = yield from worker.run(code, args, timeout=self.timeout)
+        except BaseException:
+            worker.close()
+            raise
+        finally:
+            self._checkin(worker)
+        return result
+
+    def close(self) -> None:
+        """Stop all idle workers."""
+        with self._lock:
+            for idle in self._idle.values():
+                for worker in idle:
+                    worker.close()
+                idle.clear()
+
+    def __enter__(self) -> "InterpreterPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _checkout(self, language: str) -> InterpreterWorker:
+        with self._lock:
+            idle = self._idle[language]
+            while idle:
+                worker = idle.pop(0)
+                if worker.alive:
+                    return worker
+                worker.close()
+        return InterpreterWorker(language, self.workspace)
+
+    def _checkin(self, worker: InterpreterWorker) -> None:
+        retire = (not worker.alive
+                  or worker.runs >= self.max_runs
+                  or worker.rss >= self.max_rss)
+        if retire:
+            worker.close()
+        else:
+            with self._lock:
+                self._idle[worker.language].append(worker)
+        # Keep replacements booting in the background
+        self.warm(worker.language)
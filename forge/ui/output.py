@@ -0,0 +1,270 @@
+"""Incremental live rendering of command output for FORGE."""
+
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from rich.console import Console, RenderableType
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.text import Text
+
+# Lines that open or close a fenced Markdown code block
+FENCES = ("```", "~~~")
+
+# Colors used for each output stream
+STREAM_STYLES = {
+    "stdout": "green",
+    "stderr": "red",
+}
+
+
+class OutputViewport:
+    """Show the tail of a command's output in a live panel.
+
+    Incoming lines are only queued; a ticker thread applies them in one batch
+    per refresh, so rendering cost does not grow with total output. The panel
+    holds the last ``height`` lines and lines that scroll out of it are
+    printed above the live region, leaving the full output in the terminal.
+    """
+
+    def __init__(self,
+                 console: Console,
+                 title: str = "Output",
+                 height: int = 20,
+                 refresh_per_second: float = 10):
+        """Initialize viewport.
+
+        Args:
+            console: Console to render on.
+            title: Panel title.
+            height: Number of lines kept in the live panel.
+            refresh_per_second: How often queued lines are rendered.
+        """
+        self.console = console
+        self.title = title
+        self.height = max(1, height)
+        self.interval = 1.0 / refresh_per_second
+        self.line_count = 0
+        self._pending: List[Text] = []
+        self._viewport: deque = deque()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._ticker: Optional[threading.Thread] = None
+        self._live = Live(console=console, auto_refresh=False, transient=True)
+
+    def __enter__(self) -> "OutputViewport":
+        self._live.start()
+        self._ticker = threading.Thread(target=self._tick, daemon=True)
+        self._ticker.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def add(self, chunk: Dict[str, str]) -> None:
+        """Queue a ``{"type", "line"}`` chunk for the next refresh."""
+        self.add_line(chunk["line"], chunk["type"])
+
+    def add_line(self, line: str, stream_name: str = "stdout") -> None:
+        """Queue a single line for the next refresh."""
+        text = Text(line, style=STREAM_STYLES.get(stream_name, ""))
+        with self._lock:
+            self._pending.append(text)
+
+    def close(self) -> None:
+        """Stop live rendering and print whatever is still in the viewport."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._ticker:
+            self._ticker.join()
+
+        with self._lock:
+            finished = self._apply_pending()
+            finished.extend(self._viewport)
+            self._viewport.clear()
+
+        self._live.stop()
+        self._print(finished)
+
+    def _tick(self) -> None:
+        """Render queued lines once per refresh interval."""
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                if not self._pending:
+                    continue
+                finished = self._apply_pending()
+                panel = self._panel()
+            self._print(finished)
+            self._live.update(panel, refresh=True)
+
+    def _apply_pending(self) -> List[Text]:
+        """Move queued lines into the viewport, returning lines pushed out of it."""
+        finished = []
+        for text in self._pending:
+            if len(self._viewport) == self.height:
+                finished.append(self._viewport.popleft())
+            self._viewport.append(text)
+        self.line_count += len(self._pending)
+        self._pending = []
+        return finished
+
+    def _panel(self) -> Panel:
+        return Panel(
+            Text("\n").join(self._viewport),
+            title=f"{self.title} ({self.line_count} lines)",
+            border_style="blue"
+        )
+
+    def _print(self, lines: List[Text]) -> None:
+        if lines:
+            self.console.print(Text("\n").join(lines))
+
+
+class StreamRenderer:
+    """Render a streamed LLM response as it arrives.
+
+    Tokens are only queued; a ticker thread appends them in one batch per
+    refresh. Finished blocks - paragraphs, or whole fenced code blocks, in
+    Markdown mode; lines otherwise - are printed once above the live region,
+    which only re-renders the block still being written. Each refresh
+    therefore costs the size of that block rather than of the whole answer.
+    When the console is not a terminal, tokens are written straight through.
+    """
+
+    def __init__(self,
+                 console: Console,
+                 markdown: bool = True,
+                 style: str = "",
+                 refresh_per_second: float = 10):
+        """Initialize renderer.
+
+        Args:
+            console: Console to render on.
+            markdown: Render the response as Markdown (else as plain text).
+            style: Style of plain text.
+            refresh_per_second: How often queued tokens are rendered.
+        """
+        self.console = console
+        self.markdown = markdown
+        self.style = style
+        self.interval = 1.0 / refresh_per_second
+        self.live = console.is_terminal
+        self._pieces: List[str] = []
+        self._pending: List[str] = []
+        self._tail = ""
+        self._scanned = 0
+        self._in_fence = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._ticker: Optional[threading.Thread] = None
+        self._live = Live(console=console, auto_refresh=False, transient=True) if self.live else None
+
+    def __enter__(self) -> "StreamRenderer":
+        if self.live:
+            self._live.start()
+            self._ticker = threading.Thread(target=self._tick, daemon=True)
+            self._ticker.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def text(self) -> str:
+        """Everything written so far."""
+        return "".join(self._pieces)
+
+    def write(self, token: str) -> None:
+        """Queue a token for the next refresh (or write it out when not live)."""
+        self._pieces.append(token)
+        if not self.live:
+            self.console.file.write(token)
+            self.console.file.flush()
+            return
+        with self._lock:
+            self._pending.append(token)
+
+    def feed(self, stream: Iterable) -> str:
+        """Write the content of every chunk of a chat completion stream.
+
+        Returns:
+            The full response text.
+        """
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                self.write(chunk.choices[0].delta.content)
+        return self.text
+
+    def close(self) -> None:
+        """Stop live rendering and print the block still being written."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if not self.live:
+            if self._pieces and not self._pieces[-1].endswith("\n"):
+                self.console.file.write("\n")
+            self.console.file.flush()
+            return
+        self._ticker.join()
+
+        with self._lock:
+            finished = self._apply_pending()
+            if self._tail:
+                finished.append(self._tail)
+            self._tail = ""
+
+        self._live.stop()
+        self._print(finished)
+
+    def _tick(self) -> None:
+        """Render queued tokens once per refresh interval."""
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                if not self._pending:
+                    continue
+                finished = self._apply_pending()
+                tail = self._render(self._tail)
+            self._print(finished)
+            self._live.update(tail, refresh=True)
+
+    def _apply_pending(self) -> List[str]:
+        """Append queued tokens to the trailing block, returning blocks it completed."""
+        self._tail += "".join(self._pending)
+        self._pending = []
+
+        finished = []
+        while True:
+            end = self._tail.find("\n", self._scanned)
+            if end == -1:
+                break
+            line = self._tail[self._scanned:end]
+            self._scanned = end + 1
+            if not self.markdown:
+                complete = True
+            elif line.lstrip().startswith(FENCES):
+                self._in_fence = not self._in_fence
+                complete = not self._in_fence
+            else:
+                complete = not self._in_fence and not line.strip() and bool(self._tail[:end].strip())
+            if complete:
+                finished.append(self._tail[:self._scanned])
+                self._tail = self._tail[self._scanned:]
+                self._scanned = 0
+        return finished
+
+    def _render(self, block: str) -> RenderableType:
+        if self.markdown:
+            return Markdown(block)
+        return Text(block.rstrip("\n"), style=self.style)
+
+    def _print(self, blocks: List[str]) -> None:
+        for block in blocks:
+            if self.markdown and not block.strip():
+                continue
+            self.console.print(self._render(block))
+            if self.markdown:
+                # Blocks end at a blank line (or a closing fence); keep paragraphs apart
+                self.console.print()
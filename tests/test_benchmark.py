@@ -0,0 +1,46 @@
+"""Test the FORGE command benchmark."""
+
+import pytest
+
+from forge.core.benchmark import CommandBenchmark, summarize, compare
+
+
+def test_summarize_statistics_and_outliers():
+    """Test summary statistics and modified Z-score outlier detection."""
+    stats = summarize([1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 5.0])
+    
+    assert stats["median"] == 1.0
+    assert stats["min"] == 0.9
+    assert stats["max"] == 5.0
+    assert stats["outliers"] == 1
+    assert stats["stddev"] > 0
+
+
+def test_compare_ranks_against_fastest():
+    """Test slower commands are expressed as a ratio of the fastest."""
+    comparisons = compare([
+        {"command": "slow", "mean": 2.0, "stddev": 0.0},
+        {"command": "fast", "mean": 1.0, "stddev": 0.0},
+    ])
+    
+    assert comparisons == [{"command": "slow", "fastest": "fast", "ratio": 2.0, "ratio_stddev": 0.0}]
+
+
+def test_benchmark_runs_and_warmups():
+    """Test the benchmark performs warmup plus timed runs and records usage."""
+    phases = []
+    benchmark = CommandBenchmark(runs=3, warmup=2)
+    result = benchmark.run("echo hi", on_run=lambda phase, index: phases.append(phase))
+    
+    assert phases == ["warmup", "warmup", "timed", "timed", "timed"]
+    assert len(result["times"]) == 3
+    assert result["exit_codes"] == [0, 0, 0]
+
+
+def test_benchmark_stops_on_failure():
+    """Test a failing command aborts the benchmark unless failures are ignored."""
+    with pytest.raises(RuntimeError):
+        CommandBenchmark(runs=2, warmup=0).run("exit 1")
+    
+    result = CommandBenchmark(runs=2, warmup=0, ignore_failure=True).run("exit 1")
+    assert result["exit_codes"] == [1, 1]
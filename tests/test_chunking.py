@@ -0,0 +1,82 @@
+"""Test chunked map-reduce questions over large files."""
+
+from forge.core.chunking import NOT_RELEVANT, ChunkedAsk, chunk_text, rank_chunks
+
+
+class FakeClient:
+    """Answers map calls from a table and records every request."""
+    
+    def __init__(self, answers):
+        self.answers = answers
+        self.chats = []
+        self.streams = []
+    
+    def chat(self, messages, **kwargs):
+        self.chats.append(messages)
+        content = messages[-1]["content"]
+        return next((answer for marker, answer in self.answers.items() if marker in content), NOT_RELEVANT)
+    
+    def stream_chat(self, messages, **kwargs):
+        self.streams.append(messages)
+        return iter(())
+
+
+def _python_source(functions=20):
+    return "".join(
+        f"def function_{n}(value):\n    # helper number {n}\n    return value + {n}\n\n\n"
+        for n in range(functions)
+    )
+
+
+def test_python_chunks_break_between_definitions():
+    """Test Python is cut only at def boundaries and the chunks cover every line."""
+    source = _python_source()
+    chunks = chunk_text(source, "py", max_chars=200)
+    
+    assert len(chunks) > 1
+    assert "".join(chunk.text for chunk in chunks) == source
+    assert all(chunk.text.lstrip().startswith("def ") for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_line == previous.end_line + 1
+
+
+def test_text_chunks_split_at_blank_lines_and_cut_oversized_blocks():
+    """Test prose is cut between paragraphs, and a paragraph too large is cut by lines."""
+    text = "alpha\nbeta\n\ngamma\ndelta\n\n" + "long line\n" * 50
+    chunks = chunk_text(text, "txt", max_chars=60)
+    
+    assert "".join(chunk.text for chunk in chunks) == text
+    assert chunks[0].text == "alpha\nbeta\n\ngamma\ndelta\n\n"
+    assert all(len(chunk.text) <= 60 for chunk in chunks)
+    
+    # Broken Python falls back to blank-line blocks
+    assert "".join(chunk.text for chunk in chunk_text("def (:\n\nx\n", "py", 4)) == "def (:\n\nx\n"
+
+
+def test_rank_chunks_prefers_matching_identifiers():
+    """Test BM25 ranking matches snake_case and camelCase parts of the question."""
+    chunks = chunk_text(_python_source() + "def parseConfigFile(path):\n    return path\n", "py", 200)
+    
+    score, best = rank_chunks(chunks, "Where is the config file parsed?")[0]
+    assert score > 0
+    assert "parseConfigFile" in best.text
+
+
+def test_chunked_ask_filters_irrelevant_answers_before_reduce():
+    """Test only relevant partial answers reach the reduce prompt, in file order."""
+    source = _python_source()
+    client = FakeClient({"function_3(": "function_3 adds 3", "function_15(": "function_15 adds 15"})
+    seen = []
+    
+    asker = ChunkedAsk(client, max_chunk_chars=200, top_k=100, workers=3)
+    asker.ask("mod.py", source, "what does each helper add?", "py", on_answer=lambda chunk, answer: seen.append(answer))
+    
+    assert len(client.chats) == len(seen) == len(chunk_text(source, "py", 200))
+    notes = client.streams[0][-1]["content"]
+    assert notes.index("function_3 adds 3") < notes.index("function_15 adds 15")
+    assert NOT_RELEVANT not in notes
+    
+    # A file that fits in one chunk skips the map pass
+    client = FakeClient({})
+    ChunkedAsk(client).ask("mod.py", source, "what does it do?", "py")
+    assert not client.chats and len(client.streams) == 1
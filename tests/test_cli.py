@@ -3,6 +3,7 @@
 import pytest
 import tempfile
 import os
+import json
 import uuid
 from pathlib import Path
 from click.testing import CliRunner
@@ -134,3 +135,70 @@ def test_config_list_all():
         
         # Check masking
         assert all_config['deepseek']['api_key'] == '***SET***'
+
+
+def test_run_parallel():
+    """Test run parallel reports each job and fails if any job fails."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ['run', 'parallel', '--jobs', '2', 'echo one', 'exit 3'])
+    assert result.exit_code == 1
+    assert 'Summary' in result.output
+    assert '1 of 2 commands failed' in result.output
+
+
+def test_run_cmd_json():
+    """Test run cmd --json prints the result with resource usage."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ['run', 'cmd', '--json', 'echo hello'])
+    assert result.exit_code == 0
+    data = json.loads(result.output)
+    assert data['stdout'] == ['hello']
+    assert 'wall_time' in data['resources']
+
+
+def test_fs_ls_depth_and_limit(tmp_path, monkeypatch):
+    """Test fs ls renders the tree incrementally and honors --max-depth and --limit."""
+    for name in ("a/b/c.txt", "a/d.txt", "e.txt"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x")
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    
+    result = runner.invoke(cli, ['fs', 'ls', '-L', '2'])
+    assert result.exit_code == 0
+    assert "│   ├── 📁 b/" in result.output
+    assert "└── 📄 d.txt" in result.output
+    assert "c.txt" not in result.output
+    
+    result = runner.invoke(cli, ['fs', 'ls', '-r', '--limit', '2'])
+    assert "stopped after 2 entries" in result.output
+    assert "d.txt" not in result.output
+
+
+def test_fs_commands_only_use_an_existing_index(tmp_path, monkeypatch):
+    """Test fs commands leave no index behind until fs index builds one."""
+    (tmp_path / "a.txt").write_text("x")
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    
+    for args in (['ls'], ['ls', '-r'], ['info', '.'], ['search', '*.txt']):
+        assert runner.invoke(cli, ['fs', *args]).exit_code == 0
+    assert not (tmp_path / ".forge").exists()
+    
+    assert runner.invoke(cli, ['fs', 'index']).exit_code == 0
+    (tmp_path / "b.txt").write_text("y")
+    result = runner.invoke(cli, ['fs', 'info', '--json', '.'])
+    assert json.loads(result.output)["files"] == 2
+
+
+def test_fs_cp_and_rm_fail_when_globs_match_nothing(tmp_path, monkeypatch):
+    """Test fs cp and fs rm exit non-zero when their globs expand to no paths."""
+    (tmp_path / "a.txt").write_text("x")
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    
+    for args in (['cp', '*.nomatch', 'dest'], ['rm', '-f', '*.nomatch']):
+        result = runner.invoke(cli, ['fs', *args])
+        assert result.exit_code != 0
+        assert "no paths matched" in result.output
+    assert (tmp_path / "a.txt").exists() and not (tmp_path / "dest").exists()
@@ -0,0 +1,97 @@
+"""Test the FORGE diff engine."""
+
+import difflib
+import random
+
+import pytest
+
+from forge.core import diff
+from forge.core.filesystem import FileSystemTool
+
+
+def _lcs_length(a, b):
+    """Longest common subsequence length, by dynamic programming."""
+    row = [0] * (len(b) + 1)
+    for x in a:
+        previous = 0
+        for j, y in enumerate(b):
+            current = row[j + 1]
+            row[j + 1] = previous + 1 if x == y else max(row[j + 1], row[j])
+            previous = current
+    return row[-1]
+
+
+@pytest.mark.parametrize("algorithm", list(diff.ALGORITHMS))
+def test_opcodes_transform_a_into_b(algorithm):
+    """Test every backend yields contiguous opcodes that rebuild b, and Myers is minimal."""
+    rng = random.Random(7)
+    for _ in range(300):
+        a = [rng.randint(0, 5) for _ in range(rng.randint(0, 30))]
+        b = [rng.randint(0, 5) for _ in range(rng.randint(0, 30))]
+        
+        rebuilt, matched, position = [], 0, (0, 0)
+        for tag, i1, i2, j1, j2 in diff.opcodes(a, b, algorithm):
+            assert (i1, j1) == position
+            position = (i2, j2)
+            if tag == "equal":
+                assert a[i1:i2] == b[j1:j2]
+                matched += i2 - i1
+            rebuilt += b[j1:j2]
+        
+        assert position == (len(a), len(b))
+        assert rebuilt == b
+        if algorithm == "myers":
+            assert matched == _lcs_length(a, b)
+
+
+@pytest.mark.parametrize("algorithm", list(diff.ALGORITHMS))
+def test_scattered_edits_give_proportional_stat(algorithm, monkeypatch):
+    """Test many scattered edits past the Myers cost cap are still reported line by line."""
+    monkeypatch.setattr(diff, "MYERS_MAX_COST", 8)
+    rng = random.Random(11)
+    a = [f"line {i}\n".encode() for i in range(4000)]
+    b = list(a)
+    for position in rng.sample(range(len(a)), 200):
+        b[position] = b"changed\n"
+    
+    stat = diff.diff_stat(a, b, algorithm)
+    assert 200 <= stat["insertions"] == stat["deletions"] <= 210
+
+
+def test_unified_output_matches_difflib():
+    """Test hunk grouping and headers match difflib.unified_diff for the same alignment."""
+    rng = random.Random(3)
+    for _ in range(300):
+        a = [f"{rng.choice('abcde')}\n".encode() for _ in range(rng.randint(0, 40))]
+        b = list(a)
+        for _ in range(rng.randint(0, 5)):
+            b.insert(rng.randint(0, len(b)), b"z\n")
+        for context in (0, 1, 3):
+            ours = list(diff.unified_diff(a, b, "x", "y", context, algorithm="difflib"))
+            expected = difflib.unified_diff(
+                [line.decode()[:-1] for line in a], [line.decode()[:-1] for line in b],
+                "x", "y", n=context, lineterm=""
+            )
+            assert ours == list(expected)
+
+
+def test_missing_final_newline_is_a_change():
+    """Test a dropped trailing newline is reported like git does."""
+    lines = list(diff.unified_diff(diff.split_lines(b"a\nb\n"), diff.split_lines(b"a\nb")))
+    
+    assert lines[2:] == ["@@ -1,2 +1,2 @@", " a", "-b", "+b", "\\ No newline at end of file"]
+
+
+def test_diff_files_stat_and_identical_fast_path(tmp_path, monkeypatch):
+    """Test stats count changed lines and equal files skip the line diff entirely."""
+    (tmp_path / "a.txt").write_text("1\n2\n3\n4\n")
+    (tmp_path / "b.txt").write_text("1\nX\n3\n4\n5\n")
+    (tmp_path / "c.txt").write_text("1\n2\n3\n4\n")
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    assert tool.diff_stat("a.txt", "b.txt") == {"insertions": 2, "deletions": 1}
+    assert "-2\n+X" in tool.diff_files("a.txt", "b.txt")
+    
+    monkeypatch.setattr(diff, "unified_diff", lambda *args, **kwargs: pytest.fail("diffed identical files"))
+    assert tool.diff_files("a.txt", "c.txt") == ""
+    assert tool.diff_stat("a.txt", "c.txt") == {"insertions": 0, "deletions": 0}
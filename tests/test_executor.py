@@ -0,0 +1,252 @@
+"""Test the FORGE command executor."""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from forge.core.executor import (
+    CommandExecutor, AsyncCommandExecutor, OutputCapture, CodeRunner, RuntimeProbeCache, CompileCache
+)
+
+
+def _collect(executor, command, capture=None):
+    """Run a streaming command, returning its chunks and final result."""
+    chunks = []
+    output = executor.run(command, stream=True, capture=capture)
+    while True:
+        try:
+            chunks.append(next(output))
+        except StopIteration as done:
+            return chunks, done.value
+
+
+def test_run_streams_both_pipes():
+    """Test stdout and stderr lines are delivered with their stream type."""
+    executor = CommandExecutor()
+    chunks, result = _collect(executor, "echo out; echo err 1>&2")
+    
+    assert {"type": "stdout", "line": "out"} in chunks
+    assert {"type": "stderr", "line": "err"} in chunks
+    assert result["stdout"] == ["out"]
+    assert result["stderr"] == ["err"]
+    assert result["success"] is True
+
+
+def test_run_flushes_trailing_partial_line():
+    """Test output without a final newline is not lost."""
+    executor = CommandExecutor()
+    chunks, result = _collect(executor, "printf 'a\\nb'")
+    
+    assert [c["line"] for c in chunks] == ["a", "b"]
+
+
+def test_run_does_not_deadlock_on_full_stderr():
+    """Test a flood of stderr larger than a pipe buffer still completes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        script = Path(tmpdir) / "flood.py"
+        script.write_text(
+            "import sys\n"
+            "for i in range(5000):\n"
+            "    sys.stderr.write('e' * 100 + '\\n')\n"
+            "print('done')\n"
+        )
+        executor = CommandExecutor(workspace=Path(tmpdir))
+        chunks, result = _collect(executor, f"{sys.executable} flood.py")
+    
+    assert len(result["stderr"]) == 5000
+    assert result["stdout"] == ["done"]
+
+
+def test_run_command_returns_result():
+    """Test run_command returns the final result dict."""
+    executor = CommandExecutor()
+    result = executor.run_command("exit 3", stream=False)
+    
+    assert result["returncode"] == 3
+    assert result["success"] is False
+
+
+def test_run_reports_resource_usage():
+    """Test results include wall/CPU time, peak RSS and bytes per stream."""
+    executor = CommandExecutor()
+    result = executor.run_command("printf 'abc\\n'; printf 'de\\n' 1>&2", stream=False)
+    usage = result["resources"]
+    
+    assert usage["stdout_bytes"] == 4
+    assert usage["stderr_bytes"] == 3
+    assert usage["wall_time"] > 0
+    if sys.platform != "win32":
+        assert usage["user_time"] >= 0 and usage["sys_time"] >= 0
+        assert usage["max_rss"] > 0
+
+
+def test_run_captured_timeout():
+    """Test a captured run is killed once it exceeds the timeout."""
+    executor = CommandExecutor(timeout=0.3)
+    with pytest.raises(TimeoutError):
+        executor.run_command("sleep 5", stream=False)
+
+
+def test_output_capture_line_limit():
+    """Test the capture keeps only the newest lines and counts the rest."""
+    capture = OutputCapture(max_lines=3)
+    for i in range(10):
+        capture.append("stdout", str(i))
+    
+    assert capture.lines("stdout") == ["7", "8", "9"]
+    assert capture.dropped == {"stdout": 7, "stderr": 0}
+
+
+def test_output_capture_byte_limit():
+    """Test the capture evicts old lines once over the byte budget."""
+    capture = OutputCapture(max_bytes=10)
+    for line in ["aaaa", "bbbb", "cccc"]:
+        capture.append("stderr", line)
+    
+    assert capture.lines("stderr") == ["bbbb", "cccc"]
+    assert capture.dropped["stderr"] == 1
+
+
+def test_run_with_bounded_capture_and_spill():
+    """Test a bounded capture reports dropped lines and spills the full log."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        log_file = Path(tmpdir) / "full.log"
+        executor = CommandExecutor()
+        capture = OutputCapture(max_lines=5, spill_path=log_file)
+        chunks, result = _collect(executor, "seq 1 100", capture)
+        
+        assert result["stdout"] == ["96", "97", "98", "99", "100"]
+        assert result["dropped"]["stdout"] == 95
+        assert result["log_file"] == str(log_file)
+        assert len(log_file.read_text().splitlines()) == 100
+
+
+def test_async_stream_chunks():
+    """Test the async executor yields the same chunk format."""
+    async def collect():
+        executor = AsyncCommandExecutor()
+        return [chunk async for chunk in executor.stream("echo out; echo err 1>&2")]
+    
+    chunks = asyncio.run(collect())
+    assert {"type": "stdout", "line": "out"} in chunks
+    assert {"type": "stderr", "line": "err"} in chunks
+
+
+def test_async_gather_runs_concurrently():
+    """Test gather overlaps commands and keeps results in order."""
+    executor = AsyncCommandExecutor(max_concurrency=4)
+    commands = [f"sleep 0.3; echo {i}" for i in range(4)]
+    
+    start = time.monotonic()
+    results = asyncio.run(executor.gather(commands))
+    elapsed = time.monotonic() - start
+    
+    assert [r["stdout"] for r in results] == [["0"], ["1"], ["2"], ["3"]]
+    assert all(r["success"] for r in results)
+    assert elapsed < 1.0
+
+
+def test_async_run_timeout():
+    """Test the async executor kills commands that exceed the timeout."""
+    executor = AsyncCommandExecutor(timeout=0.2)
+    with pytest.raises(TimeoutError):
+        asyncio.run(executor.run("sleep 5"))
+
+
+def test_runtime_probe_cache(tmp_path, monkeypatch):
+    """Test version probes are cached until the runtime binary changes."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    binary = bin_dir / "fakelang"
+    binary.write_text(f"#!/bin/sh\necho x >> {calls}\necho 'fakelang 1.0'\n")
+    binary.chmod(0o755)
+    
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setitem(CodeRunner.LANGUAGE_CONFIGS, "fakelang", {
+        "extension": ".fake",
+        "run_cmd": "fakelang {file}",
+        "version_cmd": "fakelang --version"
+    })
+    cache_path = tmp_path / "runtimes.json"
+    
+    assert CodeRunner(probe_cache=RuntimeProbeCache(cache_path)).check_dependencies("fakelang") == (True, "fakelang 1.0")
+    # A fresh runner reads the persisted probe instead of spawning the binary
+    assert CodeRunner(probe_cache=RuntimeProbeCache(cache_path)).check_dependencies("fakelang") == (True, "fakelang 1.0")
+    assert len(calls.read_text().splitlines()) == 1
+    
+    # Changing the binary invalidates the entry
+    stat = binary.stat()
+    os.utime(binary, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    CodeRunner(probe_cache=RuntimeProbeCache(cache_path)).check_dependencies("fakelang")
+    assert len(calls.read_text().splitlines()) == 2
+
+
+def test_probe_runtimes_do_not_share_an_executor(tmp_path, monkeypatch):
+    """Test concurrent probes report their own runtime and leave the runner's executor alone."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    languages = {}
+    for name in ("slowlang", "fastlang"):
+        binary = bin_dir / name
+        binary.write_text(f"#!/bin/sh\n{'sleep 0.3' if name == 'slowlang' else ''}\necho '{name} 2.0'\n")
+        binary.chmod(0o755)
+        languages[name] = {"extension": f".{name}", "run_cmd": f"{name} {{file}}", "version_cmd": f"{name} --version"}
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    
+    runner = CodeRunner(probe_cache=RuntimeProbeCache(tmp_path / "runtimes.json"))
+    runner.LANGUAGE_CONFIGS = languages
+    
+    assert runner.probe_runtimes(refresh=True) == {"slowlang": (True, "slowlang 2.0"), "fastlang": (True, "fastlang 2.0")}
+    assert runner.executor.process is None and runner.executor.result is None
+
+
+def test_runtime_probe_missing_binary(tmp_path):
+    """Test a runtime that is not on PATH is reported without probing."""
+    runner = CodeRunner(probe_cache=RuntimeProbeCache(tmp_path / "runtimes.json"))
+    runner.LANGUAGE_CONFIGS = dict(runner.LANGUAGE_CONFIGS, nolang={
+        "extension": ".no",
+        "run_cmd": "forge-no-such-binary {file}",
+        "version_cmd": "forge-no-such-binary --version"
+    })
+    
+    assert runner.check_dependencies("nolang") == (False, "nolang not found in PATH")
+
+
+@pytest.mark.skipif(not shutil.which("gcc"), reason="gcc not installed")
+def test_compile_cache_reuses_binary(tmp_path):
+    """Test an unchanged C source is compiled once and then served from the cache."""
+    runner = CodeRunner(
+        probe_cache=RuntimeProbeCache(tmp_path / "runtimes.json"),
+        compile_cache=CompileCache(tmp_path / "build")
+    )
+    source = '#include <stdio.h>\nint main(void) { puts("hi"); return 0; }\n'
+    
+    first = runner.run_code(source, language="c", stream=False)
+    second = runner.run_code(source, language="c", stream=False)
+    changed = runner.run_code(source.replace("hi", "bye"), language="c", stream=False)
+    
+    assert (first["stdout"], first["compile_cache"]) == (["hi"], "miss")
+    assert (second["stdout"], second["compile_cache"]) == (["hi"], "hit")
+    assert (changed["stdout"], changed["compile_cache"]) == (["bye"], "miss")
+
+
+def test_compile_cache_evicts_least_recently_used(tmp_path):
+    """Test eviction drops the oldest entries once over the size limit."""
+    cache = CompileCache(tmp_path, max_bytes=150)
+    for i, key in enumerate(["a", "b", "c"]):
+        build_dir = cache.reserve(key)
+        (build_dir / CompileCache.BINARY_NAME).write_bytes(b"x" * 60)
+        cache.commit(key, build_dir)
+        os.utime(tmp_path / key, (i, i))
+    cache.evict()
+    
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") is not None
+    assert cache.lookup("c") is not None
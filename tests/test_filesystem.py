@@ -0,0 +1,389 @@
+"""Test the FORGE file system tool."""
+
+import errno
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from forge.core import filesystem
+from forge.core.filesystem import (
+    DirectoryWalker, FileSystemTool, FileWatcher, IgnoreRules, LineIndexCache, LineReader, _merge_change
+)
+
+
+def _tree(root: Path, files):
+    """Create files (relative paths) under root."""
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{name}\n")
+
+
+def _names(root: Path, paths):
+    return sorted(p.relative_to(root).as_posix() for p in paths)
+
+
+def test_recursive_listing_honors_ignore_files(tmp_path):
+    """Test .gitignore/.forgeignore patterns, negation and nested rules."""
+    _tree(tmp_path, [
+        "a.py", "a.log", "keep.log", "build/out.o",
+        "src/b.py", "src/gen/c.py", "src/sub/d.tmp",
+        ".git/config", "docs/e.md",
+    ])
+    (tmp_path / ".gitignore").write_text("*.log\n!keep.log\nbuild/\n")
+    (tmp_path / ".forgeignore").write_text("/docs\n")
+    (tmp_path / "src" / ".gitignore").write_text("gen\n**/*.tmp\n")
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    names = _names(tmp_path, tool.list_directory(".", recursive=True))
+    
+    assert names == [".forgeignore", ".gitignore", "a.py", "keep.log", "src", "src/.gitignore", "src/b.py", "src/sub"]
+
+
+def test_recursive_listing_without_ignore(tmp_path):
+    """Test respect_ignore=False lists ignored files but still skips .git."""
+    _tree(tmp_path, ["a.log", ".git/config"])
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    names = _names(tmp_path, tool.list_directory(".", recursive=True, respect_ignore=False))
+    
+    assert names == [".gitignore", "a.log"]
+
+
+def test_ignore_rules_apply_from_repository_root(tmp_path):
+    """Test walking a subdirectory still applies the repository's ignore files."""
+    _tree(tmp_path, [".git/HEAD", "pkg/mod.py", "pkg/mod.pyc"])
+    (tmp_path / ".gitignore").write_text("*.pyc\n")
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    assert _names(tmp_path, tool.list_directory("pkg", recursive=True)) == ["pkg/mod.py"]
+
+
+def test_walker_applies_ignore_rules_under_symlinked_root(tmp_path):
+    """Test a root reached through a symlink still honors its .gitignore."""
+    _tree(tmp_path / "real", ["a.txt", "b.log", "sub/c.log", "sub/d.txt"])
+    (tmp_path / "real" / ".gitignore").write_text("*.log\n")
+    (tmp_path / "link").symlink_to(tmp_path / "real")
+    
+    walked = {item.entry.path for item in DirectoryWalker(tmp_path / "link")}
+    
+    assert walked == {str(tmp_path.resolve() / "real" / name) for name in (".gitignore", "a.txt", "sub", "sub/d.txt")}
+
+
+def test_ignore_pattern_anchoring():
+    """Test anchored, directory-only and double-star patterns."""
+    rules = IgnoreRules("/r", ["/top", "dir/", "a/**/z", "docs/*.md"])
+    
+    assert rules.ignored("/r/top", False)
+    assert not rules.ignored("/r/x/top", False)
+    assert rules.ignored("/r/x/dir", True)
+    assert not rules.ignored("/r/x/dir", False)
+    assert rules.ignored("/r/a/z", False)
+    assert rules.ignored("/r/a/b/c/z", False)
+    assert rules.ignored("/r/docs/x.md", False)
+    assert not rules.ignored("/r/docs/sub/x.md", False)
+
+
+def test_walk_ordered_and_depth_limited(tmp_path):
+    """Test the single-threaded walk is depth-first pre-order and honors max_depth."""
+    _tree(tmp_path, ["a/x/deep.txt", "a/y.txt", "b.txt"])
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    items = [(i.entry.name, i.depth) for i in tool.walk(".", threads=1)]
+    shallow = [i.entry.name for i in tool.walk(".", threads=1, max_depth=2)]
+    
+    assert items == [("a", 1), ("x", 2), ("deep.txt", 3), ("y.txt", 2), ("b.txt", 1)]
+    assert shallow == ["a", "x", "y.txt", "b.txt"]
+
+
+def test_tree_lists_directories_first_with_last_flags(tmp_path):
+    """Test the tree is depth-first, directories before files, and marks each directory's last entry."""
+    _tree(tmp_path, ["b.txt", "a/z.txt", "a/y/x.txt", "c/w.txt"])
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    items = [(i.entry.path.name, i.depth, i.last) for i in tool.tree(".")]
+    
+    assert items == [
+        ("a", 1, False), ("y", 2, False), ("x.txt", 3, True), ("z.txt", 2, True),
+        ("c", 1, False), ("w.txt", 2, True), ("b.txt", 1, True),
+    ]
+    assert [i.entry.path.name for i in tool.tree(".", max_depth=1)] == ["a", "c", "b.txt"]
+
+
+def test_search_files_matches_names_and_paths(tmp_path):
+    """Test name globs match at any depth and globs with '/' match relative paths."""
+    _tree(tmp_path, ["a.py", "src/b.py", "src/c.txt", "node_modules/m.py"])
+    (tmp_path / ".gitignore").write_text("node_modules/\n")
+    
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    assert _names(tmp_path, tool.search_files("*.py")) == ["a.py", "src/b.py"]
+    assert _names(tmp_path, tool.search_files("src/*")) == ["src/b.py", "src/c.txt"]
+    assert len(tool.search_files("*.py", respect_ignore=False)) == 3
+
+
+def test_list_directory_errors(tmp_path):
+    """Test missing paths and files are rejected."""
+    (tmp_path / "f").write_text("x")
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    with pytest.raises(FileNotFoundError):
+        tool.list_directory("missing")
+    with pytest.raises(NotADirectoryError):
+        tool.list_directory("f")
+
+
+def test_search_content_context_and_spans(tmp_path):
+    """Test matches carry line numbers, highlight spans and non-overlapping context."""
+    (tmp_path / "a.txt").write_text("one\nfoo two\nthree\nfoo foo\nfive\nsix\n")
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    matches = list(tool.search_content("foo", context=1))
+    
+    assert [m.line_number for m in matches] == [2, 4]
+    assert matches[0].before == [(1, "one")]
+    assert matches[0].after == [(3, "three")]
+    assert matches[1].before == []
+    assert matches[1].spans == [(0, 3), (4, 7)]
+    assert matches[1].after == [(5, "five")]
+
+
+def test_search_content_skips_binary_and_honors_options(tmp_path):
+    """Test binary files are skipped and literal, case and glob options apply."""
+    (tmp_path / "bin.dat").write_bytes(b"\0\x01needle")
+    (tmp_path / "a.py").write_text("Needle-x\n")
+    (tmp_path / "b.txt").write_text("needle\n")
+    (tmp_path / "empty.txt").write_text("")
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    assert [m.path.name for m in tool.search_content("needle")] == ["b.txt"]
+    assert [m.path.name for m in tool.search_content("needle", glob="*.py", ignore_case=True)] == ["a.py"]
+    assert list(tool.search_content("e.x", literal=True)) == []
+    assert len(list(tool.search_content("e.x"))) == 1
+    assert tool.search_files("Needle", content_search=True) == [tmp_path / "a.py"]
+
+
+def test_search_content_max_count(tmp_path):
+    """Test the search stops after max_count matching lines across files."""
+    for i in range(5):
+        (tmp_path / f"{i}.txt").write_text("hit\nhit\n")
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    assert len(list(tool.search_content("hit", max_count=3))) == 3
+
+
+def test_merge_change_coalesces_events():
+    """Test per-path events within a batch collapse to their net effect."""
+    assert _merge_change(None, "modified") == "modified"
+    assert _merge_change("created", "modified") == "created"
+    assert _merge_change("created", "deleted") is None
+    assert _merge_change("deleted", "created") == "modified"
+    assert _merge_change("modified", "deleted") == "deleted"
+
+
+@pytest.mark.parametrize("backend", [
+    pytest.param("inotify", marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")),
+    "poll",
+])
+def test_watcher_reports_debounced_batch(tmp_path, backend):
+    """Test a burst of changes arrives as one coalesced batch, without ignored paths."""
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    
+    def burst():
+        time.sleep(0.3)
+        (tmp_path / "a.txt").write_text("1")
+        (tmp_path / "a.txt").write_text("2")
+        (tmp_path / "b.log").write_text("ignored")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "c.txt").write_text("c")
+        (tmp_path / "tmp").write_text("short-lived")
+        (tmp_path / "tmp").unlink()
+    
+    with FileWatcher(tmp_path, debounce=0.5, poll_interval=0.2, backend=backend) as watcher:
+        assert watcher.backend == backend
+        writer = threading.Thread(target=burst)
+        writer.start()
+        batch = next(iter(watcher))
+        writer.join()
+    
+    assert [(e.path.relative_to(tmp_path).as_posix(), e.kind) for e in batch] == [
+        ("a.txt", "created"), ("sub", "created"), ("sub/c.txt", "created"),
+    ]
+
+
+@pytest.mark.parametrize("backend", [
+    pytest.param("inotify", marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")),
+    "poll",
+])
+def test_watcher_follows_renamed_directories(tmp_path, backend):
+    """Test writes under a renamed directory are reported at its new path, and not at all once moved out."""
+    root = tmp_path / "root"
+    _tree(root, ["sub/deep/a.txt", "gone/b.txt"])
+    
+    def batch_after(change):
+        writer = threading.Thread(target=lambda: (time.sleep(0.3), change()))
+        writer.start()
+        batch = next(batches)
+        writer.join()
+        return {(e.path.relative_to(root).as_posix(), e.kind) for e in batch}
+    
+    with FileWatcher(root, debounce=0.5, poll_interval=0.2, backend=backend) as watcher:
+        batches = iter(watcher)
+        batch_after(lambda: (root / "sub").rename(root / "moved"))
+        batch_after(lambda: (root / "gone").rename(tmp_path / "outside"))
+        
+        def write():
+            (tmp_path / "outside" / "b.txt").write_text("outside")
+            (root / "moved" / "deep" / "c.txt").write_text("c")
+        
+        assert batch_after(write) == {("moved/deep/c.txt", "created")}
+
+
+@pytest.mark.parametrize("content, head, tail, total", [
+    (b"", [], [], 0),
+    (b"a", ["a"], ["a"], 1),
+    (b"a\n", ["a"], ["a"], 1),
+    (b"a\n\nc", ["a", "", "c"], ["", "c"], 3),
+    (b"a\r\nb\n", ["a", "b"], ["a", "b"], 2),
+])
+def test_line_reader_edges(tmp_path, content, head, tail, total):
+    """Test windows at the file boundaries, with and without a final newline."""
+    path = tmp_path / "f.txt"
+    path.write_bytes(content)
+    
+    with LineReader(path) as reader:
+        assert reader.head(3) == head
+        assert reader.tail(2) == tail
+        assert reader.lines(1) == reader.head(10)
+        assert reader.lines(total + 1, 5) == []
+        assert reader.total_lines == total
+
+
+def test_line_reader_seeks_through_sparse_index(tmp_path, monkeypatch):
+    """Test line ranges resolve through block checkpoints and the cached index."""
+    monkeypatch.setattr(filesystem, "LINE_INDEX_BLOCK_SIZE", 64)
+    monkeypatch.setattr(filesystem, "LINE_INDEX_CACHE_MIN", 0)
+    path = tmp_path / "big.txt"
+    path.write_text("".join(f"line {i} {'x' * (i % 13)}\n" for i in range(1, 2001)))
+    cache = LineIndexCache(tmp_path / "cache")
+    
+    with LineReader(path, cache=cache) as reader:
+        assert reader.lines(1500, 2) == ["line 1500 " + "x" * (1500 % 13), "line 1501 " + "x" * (1501 % 13)]
+        assert reader.total_lines is None
+        assert reader.tail(1) == ["line 2000 " + "x" * (2000 % 13)]
+        assert reader.remaining_bytes(1999, 2) == 0
+    
+    with LineReader(path, cache=cache) as reader:
+        assert len(reader._offsets) > 1
+        assert [line.split()[1] for line in reader.lines(7, 3)] == ["7", "8", "9"]
+        assert reader.lines(2000) == ["line 2000 " + "x" * (2000 % 13)]
+        assert reader.total_lines == 2000
+
+
+def test_line_reader_rejects_binary(tmp_path):
+    """Test binary files are refused instead of decoded."""
+    (tmp_path / "b.bin").write_bytes(b"\x00\x01\x02")
+    
+    with pytest.raises(ValueError):
+        FileSystemTool(workspace=tmp_path).open_lines("b.bin")
+
+
+def test_copy_tree_preserves_tree_and_skips_unchanged(tmp_path):
+    """Test bulk copies keep contents, links and mtimes, and --update skips unchanged files."""
+    src = tmp_path / "src"
+    _tree(src, [f"d{i}/f{j}.txt" for i in range(3) for j in range(20)] + [".git/HEAD"])
+    (src / "link").symlink_to("d0/f0.txt")
+    os.utime(src / "d1" / "f1.txt", ns=(1_000_000_123, 1_000_000_123))
+    tool = FileSystemTool(workspace=tmp_path)
+    seen = []
+    
+    stats = tool.copy_tree("src", "dst", threads=4, on_progress=seen.append)
+    
+    assert stats["files"] == 61 and stats["links"] == 1 and stats["skipped"] == 0
+    assert seen[-1].files_done == seen[-1].total_files == 61
+    assert seen[-1].bytes_done == seen[-1].total_bytes == stats["bytes"]
+    assert (tmp_path / "dst" / "d2" / "f19.txt").read_text() == "d2/f19.txt\n"
+    assert os.readlink(tmp_path / "dst" / "link") == "d0/f0.txt"
+    assert (tmp_path / "dst" / "d1" / "f1.txt").stat().st_mtime_ns == 1_000_000_123
+    
+    (src / "d0" / "f0.txt").write_text("changed\n")
+    again = tool.copy_tree("src", "dst", skip_unchanged=True, checksum=True)
+    
+    assert (again["files"], again["skipped"]) == (1, 60)
+    assert (tmp_path / "dst" / "d0" / "f0.txt").read_text() == "changed\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "sendfile"), reason="needs os.sendfile")
+def test_copy_file_data_falls_back_when_unsupported(tmp_path, monkeypatch):
+    """Test an unsupported fast path falls through to the next mechanism."""
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, "cross-device")
+    
+    source = tmp_path / "a.bin"
+    source.write_bytes(os.urandom(300_000))
+    monkeypatch.setattr(filesystem, "fcntl", None)
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    
+    assert filesystem.copy_file_data(source, tmp_path / "b.bin") == "sendfile"
+    assert (tmp_path / "b.bin").read_bytes() == source.read_bytes()
+    
+    monkeypatch.setattr(os, "sendfile", unsupported)
+    assert filesystem.copy_file_data(source, tmp_path / "c.bin") == "read"
+    assert (tmp_path / "c.bin").read_bytes() == source.read_bytes()
+    
+    # BSD and macOS sendfile only writes to sockets
+    def not_a_socket(*args):
+        raise OSError(errno.ENOTSOCK, "not a socket")
+    
+    monkeypatch.setattr(os, "sendfile", not_a_socket)
+    assert filesystem.copy_file_data(source, tmp_path / "d.bin") == "read"
+    
+    monkeypatch.undo()
+    monkeypatch.setattr(filesystem.sys, "platform", "darwin")
+    assert filesystem.copy_file_data(source, tmp_path / "e.bin") == "read"
+    assert (tmp_path / "e.bin").read_bytes() == source.read_bytes()
+
+
+def test_move_across_filesystems_copies_then_removes(tmp_path, monkeypatch):
+    """Test a move that cannot rename copies the tree and deletes the source."""
+    _tree(tmp_path, ["src/a.txt", "src/sub/b.txt"])
+    (tmp_path / "into").mkdir()
+    
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, "cross-device")
+    
+    monkeypatch.setattr(os, "rename", cross_device)
+    FileSystemTool(workspace=tmp_path).move_file("src", "into")
+    
+    assert not (tmp_path / "src").exists()
+    assert (tmp_path / "into" / "src" / "sub" / "b.txt").read_text() == "src/sub/b.txt\n"
+
+
+def test_batch_operations_keep_order_and_report_errors(tmp_path):
+    """Test batch APIs expand globs, keep input order and record per-path failures."""
+    _tree(tmp_path, [f"src/{name}.txt" for name in "dcba"] + ["src/sub/e.py"])
+    tool = FileSystemTool(workspace=tmp_path)
+    
+    read = tool.read_many(["src/*.txt", "missing.txt", "src/a.txt"], threads=3)
+    
+    assert [r.path.name for r in read] == ["a.txt", "b.txt", "c.txt", "d.txt", "missing.txt"]
+    assert read[0].value == ("src/a.txt\n", "txt")
+    assert isinstance(read[4].error, FileNotFoundError) and not read[4].ok
+    
+    stats = list(tool.stat_many(["src/**/*.py", "src"], stream=True))
+    assert [(r.path.name, r.value["type"]) for r in stats] == [("e.py", "file"), ("src", "directory")]
+    
+    copied = tool.copy_many(["src/a.txt", "src/sub"], "out")
+    assert all(r.ok for r in copied)
+    assert (tmp_path / "out" / "sub" / "e.py").exists()
+    
+    deleted = tool.delete_many(["src/*.txt", "src/sub"])
+    assert [r.ok for r in deleted] == [True, True, True, True, False]
+    assert isinstance(deleted[-1].error, OSError)
+    assert sorted(p.name for p in (tmp_path / "src").iterdir()) == ["sub"]
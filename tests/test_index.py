@@ -0,0 +1,173 @@
+"""Test the FORGE workspace index."""
+
+import os
+import re
+import shutil
+from pathlib import Path
+
+from forge.core.filesystem import FileSystemTool
+from forge.core.index import WorkspaceIndex, TrigramIndex, hash_file, plan_query
+
+
+def _tree(root: Path, files):
+    """Create files (relative paths) under root."""
+    for name in files:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"{name}\n")
+
+
+def _bump(path: Path):
+    """Move a directory's mtime forward so the change is visible at any resolution."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_index_matches_walker(tmp_path):
+    """Test index-backed listings and searches agree with walking the tree."""
+    workspace = tmp_path / "ws"
+    _tree(workspace, ["a.py", "a.log", "src/b.py", "src/.hidden/c.py", "build/x.o"])
+    (workspace / ".gitignore").write_text("*.log\nbuild/\n")
+    
+    walked = FileSystemTool(workspace=workspace)
+    with WorkspaceIndex(workspace, path=tmp_path / "index.db") as index:
+        indexed = FileSystemTool(workspace=workspace, index=index)
+        
+        for kwargs in ({}, {"show_hidden": False}):
+            assert sorted(indexed.list_directory(".", recursive=True, **kwargs)) == \
+                sorted(walked.list_directory(".", recursive=True, **kwargs))
+        assert sorted(indexed.search_files("*.py")) == sorted(walked.search_files("*.py"))
+        assert sorted(indexed.search_files("*.py", "src")) == sorted(walked.search_files("*.py", "src"))
+        for kwargs in ({}, {"show_hidden": False}, {"max_depth": 1}):
+            shape = lambda tool: [(i.entry.path, i.depth, i.last) for i in tool.tree(".", **kwargs)]
+            assert shape(indexed) == shape(walked)
+        assert not index.covers(workspace / "build")
+
+
+def test_index_skips_its_own_directory(tmp_path):
+    """Test the default index location under .forge is not indexed."""
+    _tree(tmp_path, ["a.py"])
+    
+    with WorkspaceIndex(tmp_path) as index:
+        tool = FileSystemTool(workspace=tmp_path, index=index)
+        
+        assert (tmp_path / ".forge" / "index").is_dir()
+        assert tool.list_directory(".", recursive=True) == [tmp_path / "a.py"]
+
+
+def test_index_refresh_is_incremental(tmp_path):
+    """Test only directories whose mtime or ignore files changed are rescanned."""
+    _tree(tmp_path, ["a/one.txt", "b/two.txt", "b/c/three.txt"])
+    db = tmp_path / ".forge" / "index" / "files.db"
+    
+    with WorkspaceIndex(tmp_path, path=db) as index:
+        first = index.refresh()
+    assert first["rescanned"] == 4
+    assert first["added"] == 6
+    
+    (tmp_path / "a" / "new.txt").write_text("new")
+    shutil.rmtree(tmp_path / "b" / "c")
+    _bump(tmp_path / "a")
+    _bump(tmp_path / "b")
+    with WorkspaceIndex(tmp_path, path=db) as index:
+        second = index.refresh()
+        names = sorted(p.relative_to(tmp_path).as_posix() for p in index.files(tmp_path, re.compile(".*")))
+    
+    assert second["rescanned"] == 2
+    assert second["added"] == 1
+    assert second["removed"] == 1
+    assert names == ["a/new.txt", "a/one.txt", "b/two.txt"]
+    
+    (tmp_path / "a" / ".gitignore").write_text("one.txt\n")
+    with WorkspaceIndex(tmp_path, path=db) as index:
+        third = index.refresh()
+        assert third["removed"] == 1
+        assert index.refresh()["rescanned"] == 0
+
+
+def test_index_summary_and_verify(tmp_path):
+    """Test file hashes, directory totals and in-place rewrites."""
+    _tree(tmp_path, ["d/f.txt", "d/g.txt"])
+    tool_index = WorkspaceIndex(tmp_path)
+    tool = FileSystemTool(workspace=tmp_path, index=tool_index)
+    
+    info = tool.get_file_info("d/f.txt")
+    assert info["hash"] == hash_file(tmp_path / "d" / "f.txt")
+    assert tool.get_file_info("d")["files"] == 2
+    
+    (tmp_path / "d" / "f.txt").write_text("rewritten in place, longer\n")
+    assert tool_index.refresh(verify=True)["updated"] == 1
+    assert tool.get_file_info("d/f.txt")["hash"] == hash_file(tmp_path / "d" / "f.txt")
+    assert tool.get_file_info("d")["total_size"] == (tmp_path / "d" / "f.txt").stat().st_size + 8
+    tool_index.close()
+
+
+def test_index_root_summary_counts_new_files(tmp_path):
+    """Test the workspace root's summary reflects files created after the index was opened."""
+    _tree(tmp_path, ["a.txt"])
+    with WorkspaceIndex(tmp_path) as index:
+        index.refresh()
+    
+    with WorkspaceIndex(tmp_path) as index:
+        _tree(tmp_path, ["b.txt", "sub/c.txt"])
+        summary = index.summary(tmp_path)
+    
+    assert summary == {"files": 3, "total_size": sum(len(f"{n}\n") for n in ("a.txt", "b.txt", "sub/c.txt"))}
+
+
+def test_plan_query_requires_trigrams():
+    """Test regexes reduce to required trigrams, or None when nothing is required."""
+    assert plan_query("hello")[0] == "grams"
+    assert plan_query("a(bc|de)f") is None
+    assert plan_query("foo(bar|qux)")[0] == "and"
+    assert plan_query("foo|ba") is None
+    assert plan_query(".*") is None
+    assert plan_query("x?yz") is None
+    assert plan_query("a.b", literal=True) == ("grams", {(ord("a") << 16) | (ord(".") << 8) | ord("b")})
+    assert plan_query("héllo", ignore_case=True) is None
+
+
+def test_trigram_index_narrows_candidates(tmp_path):
+    """Test only files containing the query's trigrams are candidates."""
+    workspace = tmp_path / "ws"
+    _tree(workspace, ["a.txt", "b.txt", "sub/c.txt"])
+    (workspace / "a.txt").write_text("def handle_request(): pass\n")
+    (workspace / "b.txt").write_text("def handle_response(): pass\n")
+    (workspace / "bin.dat").write_bytes(b"\0handle_request")
+    
+    with WorkspaceIndex(workspace, path=tmp_path / "index.db") as index:
+        trigrams = TrigramIndex(index)
+        assert trigrams.candidates("handle", workspace) is None
+        
+        trigrams.update()
+        names = lambda paths: sorted(p.name for p in paths)
+        assert names(trigrams.candidates("handle_req", workspace)) == ["a.txt"]
+        assert names(trigrams.candidates("HANDLE_(REQ|RESP)", workspace, ignore_case=True)) == ["a.txt", "b.txt"]
+        assert names(trigrams.candidates("x", workspace)) == ["a.txt", "b.txt", "c.txt"]
+        assert names(trigrams.candidates("handle", workspace / "sub")) == []
+        
+        tool = FileSystemTool(workspace=workspace, index=index, content_index=trigrams)
+        assert [m.path.name for m in tool.search_content("handle_re(q|s)", glob="a*")] == ["a.txt"]
+
+
+def test_trigram_index_updates_incrementally(tmp_path):
+    """Test changed, added and removed files are reflected and segments are merged."""
+    workspace = tmp_path / "ws"
+    _tree(workspace, ["a.txt", "b.txt"])
+    
+    with WorkspaceIndex(workspace, path=tmp_path / "index.db") as index:
+        trigrams = TrigramIndex(index, max_segments=2)
+        assert trigrams.update()["indexed"] == 2
+        
+        # Rewritten in place: the directory mtime does not change
+        (workspace / "a.txt").write_text("needle in a haystack\n")
+        (workspace / "b.txt").unlink()
+        (workspace / "c.txt").write_text("another needle\n")
+        _bump(workspace)
+        stats = trigrams.update()
+        assert stats == {"indexed": 2, "removed": 1, "segments": 2}
+        assert sorted(p.name for p in trigrams.candidates("needle", workspace)) == ["a.txt", "c.txt"]
+        
+        (workspace / "c.txt").write_text("no match any more\n")
+        assert trigrams.update()["segments"] == 1
+        assert [p.name for p in trigrams.candidates("needle", workspace)] == ["a.txt"]
@@ -0,0 +1,231 @@
+"""Test the DeepSeek clients and their response cache."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from forge.config import Config
+from forge.core.llm import (
+    AsyncDeepSeekClient, DeepSeekClient, DeepSeekError, HTTPSettings, ResponseCache, TokenBucket, close_clients, get_client
+)
+
+
+class FakeCompletions:
+    """Stands in for ``OpenAI().chat.completions`` and counts requests."""
+    
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.calls = 0
+    
+    def create(self, model, messages, temperature, max_tokens, stream):
+        self.calls += 1
+        if not stream:
+            message = SimpleNamespace(content="".join(self.pieces))
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(
+                delta=SimpleNamespace(content=piece),
+                finish_reason="stop" if index == len(self.pieces) - 1 else None
+            )])
+            for index, piece in enumerate(self.pieces)
+        )
+
+
+def _client(cache, pieces=("Hel", "lo")):
+    client = DeepSeekClient(api_key="test", cache=cache)
+    completions = FakeCompletions(list(pieces))
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def _text(stream):
+    return "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+
+
+def test_cached_stream_replays_as_chunks(tmp_path):
+    """Test a streamed response is stored once read and replayed to stream_chat and chat."""
+    client, completions = _client(ResponseCache(tmp_path / "llm.db"))
+    messages = [{"role": "user", "content": "hi"}]
+    
+    assert _text(client.stream_chat(messages)) == "Hello"
+    replay = list(client.stream_chat(messages))
+    
+    assert _text(replay) == "Hello"
+    assert replay[-1].choices[0].finish_reason == "stop"
+    assert client.chat(messages) == "Hello"
+    assert completions.calls == 1
+    
+    # Any change to the request is a different entry
+    client.stream_chat(messages, temperature=0.2)
+    assert completions.calls == 2
+
+
+def test_abandoned_stream_is_not_cached(tmp_path):
+    """Test a stream the caller stops reading is not stored."""
+    client, completions = _client(ResponseCache(tmp_path / "llm.db"))
+    messages = [{"role": "user", "content": "hi"}]
+    
+    next(iter(client.stream_chat(messages)))
+    _text(client.stream_chat(messages))
+    
+    assert completions.calls == 2
+
+
+def test_cache_expires_and_evicts_least_recently_used(tmp_path):
+    """Test entries past their TTL are dropped and the size limit evicts by last use."""
+    cache = ResponseCache(tmp_path / "llm.db", ttl=60, max_bytes=100)
+    client, completions = _client(cache, ["x" * 40])
+    
+    for prompt in ("a", "b"):
+        client.chat([{"role": "user", "content": prompt}])
+    client.chat([{"role": "user", "content": "a"}])
+    client.chat([{"role": "user", "content": "c"}])
+    assert completions.calls == 3
+    
+    client.chat([{"role": "user", "content": "b"}])
+    assert completions.calls == 4
+    
+    cache.ttl = -1
+    client.chat([{"role": "user", "content": "c"}])
+    assert completions.calls == 5
+    
+    cache.close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint replaying scripted failures, then echoing the prompt."""
+    
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.times.append(time.monotonic())
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            status, headers = server.script.pop(0) if server.script else (200, {})
+        time.sleep(server.latency)
+        
+        if status == 200:
+            body = {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": request["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                    "role": "assistant", "content": "echo: " + request["messages"][-1]["content"]
+                }}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        else:
+            body = {"error": {"message": f"status {status}", "type": "stub"}}
+        payload = json.dumps(body).encode()
+        
+        self.send_response(status)
+        for name, value in dict(headers, **{"Content-Type": "application/json"}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with server.lock:
+            server.active -= 1
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    monkeypatch.delenv("FORGE_LLM_CACHE", raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.script, server.times, server.active, server.peak, server.latency = [], [], 0, 0, 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _async_client(server, **kwargs):
+    return AsyncDeepSeekClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1", backoff=0.01, **kwargs)
+
+
+def test_async_chat_retries_rate_limits_and_server_errors(stub_server):
+    """Test 429 and 5xx responses are retried, waiting at least Retry-After."""
+    stub_server.script = [(429, {"Retry-After": "0.3"}), (503, {})]
+    
+    async def ask():
+        async with _async_client(stub_server) as client:
+            return await client.chat([{"role": "user", "content": "hi"}])
+    
+    assert asyncio.run(ask()) == "echo: hi"
+    times = stub_server.times
+    assert len(times) == 3
+    assert times[1] - times[0] >= 0.3
+
+
+def test_async_chat_raises_client_errors_without_retrying(stub_server):
+    """Test a 400 fails at once with a DeepSeekError carrying the status."""
+    stub_server.script = [(400, {})]
+    
+    async def ask():
+        async with _async_client(stub_server) as client:
+            return await client.chat([{"role": "user", "content": "hi"}])
+    
+    with pytest.raises(DeepSeekError) as error:
+        asyncio.run(ask())
+    assert error.value.status_code == 400
+    assert len(stub_server.times) == 1
+
+
+def test_batch_chat_runs_concurrently_in_order(stub_server):
+    """Test batch_chat overlaps requests up to the limit and keeps results in order."""
+    stub_server.latency = 0.2
+    stub_server.script = [(200, {}), (500, {})]
+    prompts = [[{"role": "user", "content": str(i)}] for i in range(6)]
+    
+    async def ask():
+        async with _async_client(stub_server, max_concurrency=3) as client:
+            return await client.batch_chat(prompts)
+    
+    assert asyncio.run(ask()) == [f"echo: {i}" for i in range(6)]
+    assert stub_server.peak == 3
+
+
+def test_token_bucket_paces_after_a_burst():
+    """Test a bucket allows a minute's worth at once, then spaces reservations out."""
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+    
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    
+    now[0] = 10.0
+    bucket.refund(2)
+    assert bucket.reserve(12) == pytest.approx(2.0)
+
+
+def test_get_client_is_shared_and_reads_request_defaults(tmp_path):
+    """Test clients come from a per-process registry and default to the configured model."""
+    path = tmp_path / "config.toml"
+    path.write_text('[deepseek]\nmodel = "deepseek-coder"\ntemperature = 0.1\nmax_connections = 3\nhttp2 = "false"\n')
+    config = Config(path)
+    
+    client = get_client(api_key="test", config=config)
+    assert get_client(api_key="test", config=config) is client
+    assert get_client(api_key="other", config=config) is not client
+    assert DeepSeekClient(api_key="test", config=config).client._client is client.client._client
+    assert HTTPSettings.from_config(config)[2:] == (3, 10, 60.0, False)
+    
+    requests = []
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: requests.append(kwargs) or iter(())
+    )))
+    client.stream_chat([{"role": "user", "content": "hi"}], max_tokens=10)
+    assert (requests[0]["model"], requests[0]["temperature"], requests[0]["max_tokens"]) == ("deepseek-coder", 0.1, 10)
+    
+    close_clients()
+    assert get_client(api_key="test", config=config) is not client
@@ -0,0 +1,53 @@
+"""Test the FORGE terminal renderers."""
+
+import io
+from types import SimpleNamespace
+
+from rich.console import Console
+
+from forge.ui.output import OutputViewport, StreamRenderer
+
+
+def test_output_viewport_prints_every_line_in_order():
+    """Test lines scrolled out of the viewport and the final tail are all printed."""
+    buffer = io.StringIO()
+    console = Console(file=buffer, width=80)
+    
+    with OutputViewport(console, height=5, refresh_per_second=100) as viewport:
+        for i in range(50):
+            viewport.add({"type": "stdout" if i % 2 else "stderr", "line": f"line {i}"})
+    
+    lines = buffer.getvalue().splitlines()
+    assert lines == [f"line {i}" for i in range(50)]
+    assert viewport.line_count == 50
+
+
+def test_stream_renderer_prints_finished_blocks_once():
+    """Test Markdown blocks are printed as they complete, keeping fenced code whole."""
+    text = "# Title\n\nFirst para\ncontinued.\n\n```python\nx = 1\n\ny = 2\n```\n\n- a\n- b\n"
+    console = Console(file=io.StringIO(), width=60, force_terminal=True)
+    printed = []
+    
+    with StreamRenderer(console, refresh_per_second=1000) as renderer:
+        renderer._print = printed.extend
+        for i in range(0, len(text), 2):
+            renderer.write(text[i:i + 2])
+    
+    assert renderer.text == text
+    assert [block.strip() for block in printed if block.strip()] == [
+        "# Title", "First para\ncontinued.", "```python\nx = 1\n\ny = 2\n```", "- a\n- b"
+    ]
+
+
+def test_stream_renderer_writes_through_when_not_a_terminal():
+    """Test tokens go straight to a non-terminal console, ending with a newline."""
+    buffer = io.StringIO()
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        for token in ("**Hello**", " world", None)
+    ]
+    
+    with StreamRenderer(Console(file=buffer)) as renderer:
+        assert renderer.feed(chunks) == "**Hello** world"
+    
+    assert buffer.getvalue() == "**Hello** world\n"
@@ -0,0 +1,67 @@
+"""Test the FORGE warm interpreter pool."""
+
+import shutil
+
+import pytest
+
+from forge.core.executor import CodeRunner, _finish
+from forge.core.workers import InterpreterPool
+
+
+def test_pool_runs_snippets_in_fresh_namespaces():
+    """Test snippets stream output and do not see each other's globals."""
+    with InterpreterPool(size=1) as pool:
+        chunks = []
+        output = pool.run("import sys\nx = 1\nprint('out', sys.argv[1:])\nprint('err', file=sys.stderr)", "python", ["a"])
+        while True:
+            try:
+                chunks.append(next(output))
+            except StopIteration as done:
+                result = done.value
+                break
+        second = _finish(pool.run("print(x)", "python"))
+    
+    assert {"type": "stdout", "line": "out ['a']"} in chunks
+    assert {"type": "stderr", "line": "err"} in chunks
+    assert result["success"] is True
+    assert second["returncode"] == 1
+    assert second["stderr"][-1] == "NameError: name 'x' is not defined"
+    assert not any("<string>" in line for line in second["stderr"])
+
+
+def test_pool_recycles_workers():
+    """Test a worker is replaced after max_runs snippets and on hard exits."""
+    with InterpreterPool(size=1, max_runs=2) as pool:
+        pids = [_finish(pool.run("import os; print(os.getpid())", "python"))["stdout"][0] for _ in range(3)]
+        crashed = _finish(pool.run("import os; os._exit(3)", "python"))
+        after = _finish(pool.run("print('alive')", "python"))
+    
+    assert pids[0] == pids[1] != pids[2]
+    assert crashed["returncode"] == 3
+    assert after["stdout"] == ["alive"]
+
+
+def test_pool_timeout():
+    """Test a runaway snippet is killed after the timeout."""
+    with InterpreterPool(size=1, timeout=0.3) as pool:
+        with pytest.raises(TimeoutError):
+            _finish(pool.run("while True: pass", "python"))
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="node not installed")
+def test_pool_runs_javascript():
+    """Test Node snippets run on a warm worker."""
+    with InterpreterPool(size=1) as pool:
+        result = _finish(pool.run("console.log(1 + 1)", "javascript"))
+    
+    assert result["stdout"] == ["2"]
+
+
+def test_code_runner_uses_pool():
+    """Test CodeRunner routes supported languages through the pool."""
+    with InterpreterPool(size=1) as pool:
+        runner = CodeRunner(interpreter_pool=pool)
+        result = runner.run_code("print(6 * 7)", language="python", stream=False)
+    
+    assert result["stdout"] == ["42"]
+    assert result["command"].startswith("<python worker")